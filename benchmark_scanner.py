@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the NPM Package Compromise Detector
+Generates synthetic inputs of increasing size and reports how scan time scales
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from npm_package_compromise_detector_2025 import (
+    InventoryStore, NodeModulesResolver, NPMCompromiseDetector2025, normalize_version
+)
+
+try:
+    import resource  # Unix only; peak RSS is left out of the report without it
+except ImportError:
+    resource = None
+
+# Hit-dense minified line: every source indicator category matches several times
+HIT_DENSE_LINE = ('var a=fetch(x);eval(y);window.ethereum;localStorage.getItem("wallet");'
+                  '"npmjs.help";String.fromCharCode(1);')
+
+
+def make_detector() -> NPMCompromiseDetector2025:
+    """Create a detector without the load banner cluttering benchmark output"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return NPMCompromiseDetector2025()
+
+
+def write_synthetic_lockfile(directory: str, package_count: int) -> str:
+    """Write a lockfile v3 with package_count unique clean packages"""
+    packages = {"": {"name": "bench", "version": "1.0.0"}}
+    for i in range(package_count):
+        packages[f"node_modules/bench-pkg-{i}"] = {"version": f"1.0.{i % 50}"}
+    lock_path = os.path.join(directory, 'package-lock.json')
+    with open(lock_path, 'w', encoding='utf-8') as f:
+        json.dump({"name": "bench", "lockfileVersion": 3, "packages": packages}, f)
+    return lock_path
+
+
+def write_synthetic_yarn_lock(directory: str, package_count: int) -> str:
+    """Write a yarn v1 lockfile with package_count unique clean packages"""
+    lock_path = os.path.join(directory, 'yarn.lock')
+    with open(lock_path, 'w', encoding='utf-8') as f:
+        f.write("# yarn lockfile v1\n\n")
+        for i in range(package_count):
+            f.write(f'"bench-pkg-{i}@^1.0.0":\n  version "1.0.{i % 50}"\n'
+                    f'  resolved "https://registry.yarnpkg.com/bench-pkg-{i}/-/bench-pkg-{i}-1.0.0.tgz"\n\n')
+    return lock_path
+
+
+def write_synthetic_node_modules(directory: str, package_count: int):
+    """Install package_count packages flat in node_modules, each depending on the next"""
+    def write_manifest(package_dir: str, name: str, dependencies: Dict[str, str]):
+        os.makedirs(package_dir, exist_ok=True)
+        with open(os.path.join(package_dir, 'package.json'), 'w', encoding='utf-8') as f:
+            json.dump({"name": name, "version": "1.0.0", "dependencies": dependencies}, f)
+
+    write_manifest(directory, 'bench', {"bench-pkg-0": "^1.0.0"})
+    for i in range(package_count):
+        dependencies = {f"bench-pkg-{i + 1}": "^1.0.0"} if i + 1 < package_count else {}
+        write_manifest(os.path.join(directory, 'node_modules', f"bench-pkg-{i}"), f"bench-pkg-{i}", dependencies)
+
+
+def bench_track_package(size: int) -> float:
+    """Time track_package over size unique packages"""
+    detector = make_detector()
+    start = time.perf_counter()
+    for i in range(size):
+        detector.track_package(f"bench-pkg-{i}", "1.0.0", 'lock_file_v2_v3', 'package-lock.json', 1)
+        detector.track_safe_package(f"bench-pkg-{i}", "1.0.0", [], 'safe_lock_file_v2_v3', 'package-lock.json', 1)
+    return time.perf_counter() - start
+
+
+def bench_lockfile_scan(size: int) -> float:
+    """Time a full package-lock.json scan of size packages"""
+    detector = make_detector()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lock_path = write_synthetic_lockfile(temp_dir, size)
+        start = time.perf_counter()
+        detector.scan_lock_file(lock_path)
+        return time.perf_counter() - start
+
+
+def bench_lockfile_scan_cached(size: int) -> float:
+    """Time a package-lock.json scan of size packages served from a warm scan cache"""
+    detector = make_detector()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lock_path = write_synthetic_lockfile(temp_dir, size)
+        detector.enable_scan_cache(db_path=os.path.join(temp_dir, 'scan_cache.sqlite'))
+        detector.scan_lock_file(lock_path)
+        detector.reset_scan_state()
+        start = time.perf_counter()
+        detector.scan_lock_file(lock_path)
+        return time.perf_counter() - start
+
+
+def bench_yarn_lock_scan(size: int) -> float:
+    """Time a full yarn.lock scan of size packages"""
+    detector = make_detector()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        lock_path = write_synthetic_yarn_lock(temp_dir, size)
+        start = time.perf_counter()
+        detector.scan_lock_file(lock_path)
+        return time.perf_counter() - start
+
+
+def bench_node_modules_resolve(size: int) -> float:
+    """Time NodeModulesResolver.resolve over an installed tree of size packages"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_synthetic_node_modules(temp_dir, size)
+        start = time.perf_counter()
+        NodeModulesResolver().resolve(temp_dir)
+        return time.perf_counter() - start
+
+
+def bench_lifecycle_scripts(size: int) -> float:
+    """Time the lifecycle-script scan of an installed tree of size packages, 1 in 100 with a postinstall"""
+    detector = make_detector()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        write_synthetic_node_modules(temp_dir, size)
+        for i in range(0, size, 100):
+            manifest_path = os.path.join(temp_dir, 'node_modules', f"bench-pkg-{i}", 'package.json')
+            with open(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump({"name": f"bench-pkg-{i}", "version": "1.0.0",
+                           "scripts": {"postinstall": "node-gyp rebuild"}}, f)
+        start = time.perf_counter()
+        detector.lifecycle_scanner.scan(temp_dir)
+        return time.perf_counter() - start
+
+
+def bench_source_scan(size: int) -> float:
+    """Time a source scan of size small .js files through the threaded scanner"""
+    detector = make_detector()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source_files = []
+        for i in range(size):
+            source_path = os.path.join(temp_dir, f"bench-{i}.js")
+            with open(source_path, 'w', encoding='utf-8') as f:
+                f.write("module.exports = function add(a, b) { return a + b; };\n" * 40)
+            source_files.append(source_path)
+        start = time.perf_counter()
+        detector.scan_source_batch(source_files)
+        return time.perf_counter() - start
+
+
+def bench_large_source_scan(size: int) -> float:
+    """Time the memory-mapped scan of one minified bundle of size hit-dense ~100-byte segments"""
+    detector = make_detector()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        bundle_path = os.path.join(temp_dir, 'bundle.min.js')
+        with open(bundle_path, 'w', encoding='utf-8') as f:
+            # Written in blocks so building the input does not raise the peak RSS being measured
+            for block_start in range(0, size, 10000):
+                f.write(HIT_DENSE_LINE * min(10000, size - block_start))
+        start = time.perf_counter()
+        detector.source_scanner.scan(bundle_path, None)
+        return time.perf_counter() - start
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, or None where resource is unavailable"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KB elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def bench_compromise_lookup(size: int) -> float:
+    """Time check_package_compromise over size names, 1 in 1000 monitored"""
+    detector = make_detector()
+    monitored = sorted(detector.compromised_packages)
+    queries = [
+        (monitored[i % len(monitored)], "^1.0.0") if i % 1000 == 0 else (f"bench-pkg-{i}", "^1.0.0")
+        for i in range(size)
+    ]
+    check = detector.check_package_compromise
+    start = time.perf_counter()
+    for package_name, version in queries:
+        check(package_name, version)
+    return time.perf_counter() - start
+
+
+def bench_range_evaluation(size: int) -> float:
+    """Time admitted_versions over size monitored packages with distinct ranges"""
+    detector = make_detector()
+    monitored = sorted(detector.compromised_packages)
+    operators = ['^', '~', '>=', '']
+    queries = [
+        (monitored[i % len(monitored)], f"{operators[i % len(operators)]}{i % 7}.{i % 13}.{i % 5}")
+        for i in range(size)
+    ]
+    admitted_versions = detector.range_engine.admitted_versions
+    start = time.perf_counter()
+    for package_name, range_spec in queries:
+        admitted_versions(package_name, range_spec)
+    return time.perf_counter() - start
+
+
+def bench_inventory_rematch(size: int) -> float:
+    """Time rematch_inventory over a stored inventory of size rows in 100 repos, 1 in 1000 monitored"""
+    detector = make_detector()
+    monitored = sorted(detector.compromised_packages)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        inventory = InventoryStore(os.path.join(temp_dir, 'inventory.sqlite'))
+        per_repo = max(1, size // 100)
+        for repo_index in range(0, size, per_repo):
+            inventory.replace_repository(f"https://github.com/bench/repo-{repo_index}", [
+                ('package-lock.json', monitored[i % len(monitored)] if i % 1000 == 0 else f"bench-pkg-{i}",
+                 "1.0.0", None, 1, 'lock_file_v2_v3')
+                for i in range(repo_index, min(size, repo_index + per_repo))
+            ])
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            detector.rematch_inventory(inventory)
+        return time.perf_counter() - start
+
+
+def bench_inventory_lookup(size: int) -> float:
+    """Time size exact package@version lookups against a 300k-row inventory of 1000 repos"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        inventory = InventoryStore(os.path.join(temp_dir, 'inventory.sqlite'))
+        for repo_index in range(1000):
+            inventory.replace_repository(f"https://github.com/bench/repo-{repo_index}", [
+                ('package-lock.json', f"@bench-{i % 50}/pkg-{i}", f"1.0.{repo_index % 7}", None, 1, 'lock_file_v2_v3')
+                for i in range(300)
+            ])
+        queries = [(f"@bench-{i % 50}/pkg-{i % 300}", f"1.0.{i % 7}") for i in range(size)]
+        start = time.perf_counter()
+        for package, version in queries:
+            inventory.lookup(package, version)
+        return time.perf_counter() - start
+
+
+def bench_normalize_version(size: int) -> float:
+    """Time normalize_version over size specs drawn from a fleet-like pool of 500 ranges"""
+    operators = ['^', '~', '>=', '']
+    pool = [f"{operators[i % len(operators)]}{i % 9}.{i % 17}.{i % 5}" for i in range(500)]
+    specs = [pool[(i * 7919) % len(pool)] for i in range(size)]
+    start = time.perf_counter()
+    for spec in specs:
+        normalize_version(spec)
+    return time.perf_counter() - start
+
+
+BENCHMARKS: Dict[str, Callable[[int], float]] = {
+    'track_package': bench_track_package,
+    'lockfile_scan': bench_lockfile_scan,
+    'lockfile_scan_cached': bench_lockfile_scan_cached,
+    'yarn_lock_scan': bench_yarn_lock_scan,
+    'node_modules_resolve': bench_node_modules_resolve,
+    'lifecycle_scripts': bench_lifecycle_scripts,
+    'compromise_lookup': bench_compromise_lookup,
+    'source_scan': bench_source_scan,
+    'large_source_scan': bench_large_source_scan,
+    'range_evaluation': bench_range_evaluation,
+    'normalize_version': bench_normalize_version,
+    'inventory_rematch': bench_inventory_rematch,
+    'inventory_lookup': bench_inventory_lookup,
+}
+
+
+def run_scaling(name: str, sizes: List[int]) -> List[str]:
+    """Run one benchmark at each size and report per-item cost"""
+    lines = [f"{name}:"]
+    baseline = None
+    for size in sizes:
+        elapsed = BENCHMARKS[name](size)
+        per_item_us = elapsed / size * 1_000_000
+        if baseline is None:
+            baseline = per_item_us
+        peak_rss = peak_rss_mb()
+        lines.append(f"  n={size:>7}  total={elapsed:8.3f}s  per-item={per_item_us:7.2f}us  "
+                     f"rate={size / elapsed:>12,.0f}/s  ratio={per_item_us / baseline:5.2f}x"
+                     + (f"  peak_rss={peak_rss:7.1f}MB" if peak_rss is not None else ''))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='NPM Package Compromise Detector benchmarks')
+    parser.add_argument('benchmarks', nargs='*', default=list(BENCHMARKS),
+                        help=f'Benchmarks to run (default: all of {", ".join(BENCHMARKS)})')
+    parser.add_argument('--sizes', default='5000,10000,20000,40000',
+                        help='Comma-separated input sizes (default: 5000,10000,20000,40000)')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    print("⏱️  NPM Package Compromise Detector - Benchmarks")
+    print("   Per-item ratio staying near 1.0x as n grows means linear scaling")
+    print("   peak_rss is the process high-water mark, so a flat column means memory does not grow with n")
+    print("=" * 70)
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            print(f"❌ Unknown benchmark: {name}")
+            return 1
+        print('\n'.join(run_scaling(name, sizes)))
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
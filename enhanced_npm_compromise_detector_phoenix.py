@@ -9,11 +9,14 @@ Date: September 2025
 Updated: Enhanced with Phoenix API integration for asset and finding management
 """
 
+import io
 import json
 import os
 import re
 import sys
 import subprocess
+import threading
+import time
 from pathlib import Path
 from typing import Dict, List, Set, Tuple, Optional, Any
 import argparse
@@ -26,8 +29,31 @@ import configparser
 import uuid
 from urllib.parse import urlparse
 import base64
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+
+from npm_package_compromise_detector_2025 import (
+    CompromiseIndex, FileWalker, FindingStore, GitChangeSet, GitRepoResolver, InventoryStore, PackageTracker,
+    ScanCache, SemverRangeEngine, format_incremental_stats, format_scan_cache_stats, format_version_cache_stats, inventory_rows,
+    lock_entry_key, match_inventory, run_parallel_scan, iter_package_lock_entries, iter_yarn_lock_entries, normalize_version, open_text,
+    package_name_from_lock_path, version_cache_stats
+)
+from git_mirror_store import GitBlobReader, GitMirrorStore
+
+class EnhancedNPMCompromiseDetectorPhoenix(PackageTracker):
+    # Files a manifests-only checkout materialises; everything else stays unfetched
+    MANIFEST_PATTERNS = ('**/package.json', '**/package-lock.json', '**/yarn.lock', '**/pnpm-lock.yaml')
+    # Files a checkout scan picks up, read straight from git objects with --git-objects
+    GIT_OBJECT_FILES = ('package.json', 'package-lock.json')
+    CLONE_STRATEGIES = ('manifests', 'shallow', 'full')
+    # Per-file scan state collected by ScanResult, and settings copied into pool workers
+    SCAN_STATE_LISTS = ('scanned_files', 'file_repositories', 'all_scanned_libraries', 'clean_libraries',
+                        'compromised_libraries')
+    SCAN_STATE_COUNTERS = ('dependency_stats', 'scan_cache_stats')
+    WORKER_SETTINGS = ('full_tree_analysis', 'include_node_modules', 'max_depth', 'follow_symlinks',
+                       'import_all_libraries', 'additional_vuln_tags', 'additional_asset_tags',
+                       'debug_mode', 'detail_log', 'scan_cache_path', 'lock_baselines')
 
-class EnhancedNPMCompromiseDetectorPhoenix:
     def __init__(self, config_file: str = None, phoenix_config_file: str = None):
         """Initialize the detector with compromised package data and Phoenix API configuration"""
         self.config_file = config_file or "compromised_packages_2025.json"
@@ -37,11 +63,7 @@ class EnhancedNPMCompromiseDetectorPhoenix:
         self.load_compromise_data()
         
         # Initialize all attributes first
-        self.findings = []
-        self.scanned_files = []
-        self.scanned_packages = []
-        self.package_sources = {}
-        self.safe_packages = []
+        self.reset_scan_state()
         self.phoenix_assets = []  # Assets to be imported to Phoenix
         self.phoenix_findings = []  # Findings to be imported to Phoenix
         self.debug_mode = False  # Debug mode flag
@@ -53,20 +75,27 @@ class EnhancedNPMCompromiseDetectorPhoenix:
         self.cloned_repositories = []  # Track repositories that were cloned
         self.found_repositories = []   # Track repositories that were found locally
         self.processed_repositories = []  # Track all processed repositories with details
-        self.all_scanned_libraries = []  # Track all libraries found during scan
-        self.clean_libraries = []     # Track clean libraries
-        self.compromised_libraries = []  # Track compromised libraries
+        self.repository_timings = []  # Per-repository acquisition and scan times from process_repository_list
+        self.repository_acquisition = None  # Wall time and concurrency limits of the last acquisition run
+        self.clone_jobs = 8  # Repositories cloned or located concurrently
+        self.clone_jobs_per_host = 4  # Concurrent clones against any single git host
+        self.clone_strategy = 'manifests'  # manifests: shallow+blobless+sparse, shallow: depth 1, full: complete clone
+        self.mirror_store = None  # Persistent bare mirrors; checkouts become worktrees when set
+        self.git_object_scan = False  # Read manifests from mirror objects instead of any checkout
+        self.scan_all_refs = False  # With git_object_scan, scan every branch and tag rather than HEAD
+        self.ref_history = []  # Compromised package@version per repository, with the refs it appears in
         
-        self.dependency_stats = {
-            'direct_dependencies': 0,
-            'transitive_dependencies': 0,
-            'lock_file_packages': 0,
-            'tree_resolved_packages': 0,
-            'safe_packages_found': 0,
-            'compromised_packages_found': 0,
-            'potentially_compromised_found': 0
-        }
         self.full_tree_analysis = False
+        self.include_node_modules = False  # Installed-package mode: also walk into nested node_modules
+        self.max_depth = None  # Directory depth limit for the filesystem walker
+        self.follow_symlinks = False
+        self.jobs = 1  # Worker processes for per-file scanning
+        self.scan_cache_path = None  # SQLite lockfile scan cache, opened lazily per process
+        self._scan_cache = None
+        self.rematch_stats = None  # Set when findings come from a stored inventory instead of a scan
+        self.lock_baselines = {}  # Lock file path -> entry keys at the --since base; those entries are skipped
+        self.incremental_stats = None  # Set when only files changed since a git ref were scanned
+        self.repo_resolver = GitRepoResolver()  # Cached .git lookups shared by all repo URL helpers
         self.enable_phoenix_import = False
         self.import_all_libraries = False  # Import all libraries including clean ones
         self.light_scan_mode = False
@@ -98,6 +127,32 @@ class EnhancedNPMCompromiseDetectorPhoenix:
         self.load_github_token()
         self.load_tag_config()
         
+    def reset_scan_state(self):
+        """Clear findings, tracked packages, library lists and counters"""
+        self.findings = FindingStore()
+        self.scanned_files = []
+        self.file_repositories = []  # (file_path, repo_url) for each processed file
+        self.reset_package_tracking()
+        self.all_scanned_libraries = []  # Track all libraries found during scan
+        self.clean_libraries = []     # Track clean libraries
+        self.compromised_libraries = []  # Track compromised libraries
+        self.dependency_stats = {
+            'direct_dependencies': 0,
+            'transitive_dependencies': 0,
+            'lock_file_packages': 0,
+            'tree_resolved_packages': 0,
+            'safe_packages_found': 0,
+            'compromised_packages_found': 0,
+            'potentially_compromised_found': 0,
+            'range_admits_compromised_found': 0,
+            'unchanged_lock_entries_skipped': 0
+        }
+        self.scan_cache_stats = {'hits': 0, 'misses': 0, 'stored': 0}
+
+    def worker_factory(self):
+        """Picklable callable that builds an equivalent detector in a worker process"""
+        return partial(type(self), config_file=self.config_file, phoenix_config_file=self.phoenix_config_file)
+
     def load_phoenix_config(self) -> Dict:
         """Load Phoenix API configuration from embedded credentials, environment variables, or .config file"""
         config = {}
@@ -269,36 +324,14 @@ additional_asset_tags = npm-project,dependency-scan
                 # Default to a generic pattern - user can override
                 return f"https://github.com/unknown-org/{repo_name}"
                 
-        # Pattern 2: Look for .git directory
-        current_path = path.parent
-        while current_path != current_path.parent:  # Stop at root
-            git_dir = current_path / '.git'
-            if git_dir.exists():
-                # Try to read origin URL from git config
-                try:
-                    result = subprocess.run(
-                        ['git', 'remote', 'get-url', 'origin'],
-                        cwd=current_path,
-                        capture_output=True,
-                        text=True,
-                        timeout=10
-                    )
-                    if result.returncode == 0:
-                        origin_url = result.stdout.strip()
-                        # Convert SSH to HTTPS if needed
-                        if origin_url.startswith('git@github.com:'):
-                            origin_url = origin_url.replace('git@github.com:', 'https://github.com/')
-                            if origin_url.endswith('.git'):
-                                origin_url = origin_url[:-4]
-                        return origin_url
-                except Exception:
-                    pass
-                    
-                # Fallback: use directory name
-                repo_name = current_path.name
-                return f"https://github.com/unknown-org/{repo_name}"
-                
-            current_path = current_path.parent
+        # Pattern 2: Look for .git directory (or worktree/submodule .git file) and read origin from its config
+        repo_root = self.repo_resolver.find_root(str(path.parent))
+        if repo_root:
+            origin_url = self.repo_resolver.remote_url(repo_root[0])
+            if origin_url:
+                return self.repo_resolver.https_url(origin_url)
+            # Fallback: use directory name
+            return f"https://github.com/unknown-org/{os.path.basename(repo_root[0])}"
             
         # Pattern 3: Extract from path structure
         path_parts = path.parts
@@ -672,6 +705,10 @@ additional_asset_tags = npm-project,dependency-scan
             print(f"❌ Error loading compromise data: {str(e)}")
             self._load_default_data()
             
+        # Compile the immutable lookup index used by check_package_compromise
+        self.compromise_index = CompromiseIndex(self.compromised_packages, self.potentially_compromised)
+        self.range_engine = SemverRangeEngine(self.compromise_index)
+            
     def _load_default_data(self):
         """Load default compromise data if config file is not available"""
         self.compromised_packages = {
@@ -718,6 +755,60 @@ additional_asset_tags = npm-project,dependency-scan
         """Enable or disable full dependency tree analysis"""
         self.full_tree_analysis = enable
         
+    def enable_scan_cache(self, enable: bool = True, db_path: str = ScanCache.DEFAULT_PATH):
+        """Enable or disable serving unchanged lock files from the on-disk scan cache"""
+        self.scan_cache_path = db_path if enable else None
+        self._scan_cache = None
+
+    def get_scan_cache(self) -> Optional[ScanCache]:
+        """The scan cache for this process, or None when caching is disabled"""
+        if self.scan_cache_path and self._scan_cache is None:
+            self._scan_cache = ScanCache(self.scan_cache_path)
+        return self._scan_cache
+
+    def enable_mirror_cache(self, enable: bool = True, root: str = GitMirrorStore.DEFAULT_ROOT):
+        """Enable or disable acquiring repositories through persistent bare mirrors"""
+        self.mirror_store = GitMirrorStore(root) if enable else None
+
+    def enable_git_object_scan(self, enable: bool = True, all_refs: bool = False):
+        """Enable or disable scanning manifests straight from git objects of a bare mirror (no checkout)"""
+        self.git_object_scan = enable
+        self.scan_all_refs = enable and all_refs
+        if enable and not self.mirror_store:
+            self.enable_mirror_cache()
+
+    def enable_installed_package_scan(self, enable: bool = True):
+        """Enable or disable scanning node_modules nested inside node_modules (installed-package mode)"""
+        self.include_node_modules = enable
+
+    def get_file_walker(self) -> FileWalker:
+        """Build a filesystem walker from the detector's prune settings"""
+        return FileWalker(
+            include_node_modules=self.include_node_modules,
+            max_depth=self.max_depth,
+            follow_symlinks=self.follow_symlinks
+        )
+
+    def find_npm_files(self, directory: str, include_yarn_lock: bool = True) -> List[str]:
+        """Find package.json and lock files under a directory in a single walk"""
+        walked = self.get_file_walker().walk(directory)
+        npm_files = walked['package_json'] + walked['package_lock']
+        if include_yarn_lock:
+            npm_files += walked['yarn_lock']
+        return npm_files
+
+    def find_changed_npm_files(self, directory: str, since_ref: str) -> Optional[List[str]]:
+        """Package files changed since since_ref, recording lock file baselines; None when git cannot tell"""
+        changes = GitChangeSet(directory, since_ref)
+        error = changes.load(self.include_node_modules)
+        if error:
+            print(f"⚠️  Cannot diff {directory} against {since_ref}: {error}")
+            return None
+        self.lock_baselines.update(changes.baselines)
+        self.incremental_stats = {'ref': since_ref, 'base': changes.base, 'files': len(changes.changed_files)}
+        print(f"🔀 {len(changes.changed_files)} npm manifests and lock files changed since {since_ref} ({changes.base[:12]})")
+        return changes.changed_files
+
     def enable_phoenix_integration(self, enable: bool = True):
         """Enable or disable Phoenix API integration"""
         self.enable_phoenix_import = enable
@@ -785,32 +876,10 @@ additional_asset_tags = npm-project,dependency-scan
             # Convert to absolute path
             abs_path = os.path.abspath(file_path)
             
-            # Look for .git directory in the path hierarchy
-            current_path = abs_path
-            while current_path and current_path != '/':
-                git_dir = os.path.join(current_path, '.git')
-                if os.path.exists(git_dir):
-                    # Try to get remote URL from git config
-                    try:
-                        result = subprocess.run(
-                            ['git', 'remote', 'get-url', 'origin'],
-                            cwd=current_path,
-                            capture_output=True,
-                            text=True,
-                            timeout=10
-                        )
-                        if result.returncode == 0:
-                            remote_url = result.stdout.strip()
-                            # Convert SSH to HTTPS format
-                            if remote_url.startswith('git@github.com:'):
-                                remote_url = remote_url.replace('git@github.com:', 'https://github.com/')
-                                if remote_url.endswith('.git'):
-                                    remote_url = remote_url[:-4]
-                            return remote_url
-                    except (subprocess.TimeoutExpired, subprocess.SubprocessError):
-                        pass
-                    break
-                current_path = os.path.dirname(current_path)
+            # Read origin from the config of the enclosing repository (cached per directory)
+            remote_url = self.repo_resolver.remote_url(abs_path)
+            if remote_url:
+                return self.repo_resolver.https_url(remote_url)
             
             # Fallback: try to infer from path patterns
             if '/GitHub/' in abs_path or '/github/' in abs_path:
@@ -837,50 +906,24 @@ additional_asset_tags = npm-project,dependency-scan
         
     def normalize_version(self, version: str) -> str:
         """Normalize version string by removing prefixes like ^, ~, >=, etc."""
-        if not version:
-            return ""
-        # Remove common npm version prefixes
-        cleaned = re.sub(r'^[^\d]*', '', str(version))
-        # Handle version ranges like "1.0.0 - 2.0.0"
-        if ' - ' in cleaned:
-            cleaned = cleaned.split(' - ')[0]
-        # Handle || operators
-        if ' || ' in cleaned:
-            cleaned = cleaned.split(' || ')[0]
-        return cleaned.strip()
+        return normalize_version(version)
         
     def check_package_compromise(self, package_name: str, version: str) -> Tuple[bool, str, List[str]]:
         """
         Check if a package version is compromised
         Returns: (is_compromised, severity, compromised_versions_list)
         """
-        normalized_version = self.normalize_version(version)
-        
-        # Check exact compromised packages with versions
-        if package_name in self.compromised_packages:
-            pkg_data = self.compromised_packages[package_name]
-            compromised_versions = pkg_data.get('compromised_versions', [])
-            
-            if normalized_version in compromised_versions:
-                return True, 'CRITICAL', compromised_versions
-            else:
-                # Package is in our list but version is different - could be safe
-                return False, 'INFO', compromised_versions
-                
-        # Check potentially compromised packages (no specific version)
-        if package_name in self.potentially_compromised:
-            return True, 'HIGH', []
-            
-        return False, '', []
+        return self.compromise_index.check(package_name, version)
 
-    def process_package_file(self, file_path: str, repo_url: str = None) -> Dict:
-        """Process a single package file and create Phoenix asset with findings"""
+    def process_package_file(self, file_path: str, repo_url: str = None, stream: Optional[io.TextIOBase] = None) -> Dict:
+        """Process a single package file, or stream holding its contents, and create Phoenix asset with findings"""
         # Track this file as scanned
         self.scanned_files.append(file_path)
         
         # Extract repository URL if not provided
         if not repo_url:
             repo_url = self.get_repo_url_from_path(file_path)
+        self.file_repositories.append((file_path, repo_url))
             
         # Create Phoenix asset
         asset = self.create_phoenix_asset(file_path, repo_url)
@@ -891,9 +934,10 @@ additional_asset_tags = npm-project,dependency-scan
         
         # Scan the file for compromised packages
         if file_path.endswith('package.json'):
-            findings = self.scan_package_json(file_path)
+            # A streamed file has no path on disk to resolve its repository from
+            findings = self.scan_package_json(file_path, stream, repo_url if stream else None)
         elif file_path.endswith('package-lock.json') or file_path.endswith('yarn.lock'):
-            findings = self.scan_lock_file(file_path)
+            findings = self.scan_lock_file(file_path, stream)
         else:
             findings = []
             
@@ -909,6 +953,9 @@ additional_asset_tags = npm-project,dependency-scan
             
             if severity == 'INFO':
                 is_safe = True
+            if finding.get('admitted_compromised_versions'):
+                # A safe floor does not make the declared range safe
+                is_compromised, is_safe, severity = True, False, 'HIGH'
                 
             # Create Phoenix finding
             phoenix_finding = self.create_phoenix_finding(
@@ -920,22 +967,15 @@ additional_asset_tags = npm-project,dependency-scan
             
             # Add to findings list for reporting (with repo and file info)
             if is_compromised or is_safe:
-                # Create unique identifier to prevent duplicates
-                finding_id = f"{package_name}@{version}:{file_path}:{dep_type}"
-                
-                # Check if we already have this finding
-                existing_finding = any(
-                    f.get('details', {}).get('package') == package_name and
-                    f.get('details', {}).get('version') == version and
-                    f.get('file') == file_path and
-                    f.get('details', {}).get('dependency_type') == dep_type
-                    for f in self.findings
-                )
+                # Check if we already have this finding (indexed lookup)
+                existing_finding = self.findings.contains(package_name, version, file_path, dep_type)
                 
                 if not existing_finding:
                     report_finding = {
                         'severity': severity or 'INFO',
-                        'message': f"Safe version detected: {package_name}@{version}" if is_safe else f"Compromised package detected: {package_name}@{version}",
+                        'message': f"Safe version detected: {package_name}@{version}" if is_safe else (
+                            f"Declared range admits compromised version: {package_name}@{version}"
+                            if finding.get('admitted_compromised_versions') else f"Compromised package detected: {package_name}@{version}"),
                         'file': file_path,
                         'repo_url': repo_url,
                         'details': {
@@ -980,6 +1020,85 @@ additional_asset_tags = npm-project,dependency-scan
         
         return asset
         
+    def save_inventory(self, inventory: InventoryStore) -> int:
+        """Replace the stored inventory of every repository processed in this run"""
+        files_by_repo = {}
+        for file_path, repo_url in self.file_repositories:
+            # Files without a known remote are grouped by their local directory
+            repo = repo_url or os.path.abspath(os.path.dirname(file_path))
+            files_by_repo.setdefault(repo, set()).add(file_path)
+        return sum(
+            inventory.replace_repository(repo, inventory_rows(self, file_paths))
+            for repo, file_paths in files_by_repo.items()
+        )
+
+    def rematch_inventory(self, inventory: InventoryStore) -> List[Dict]:
+        """Re-run the matching stage over a stored inventory, returning Phoenix assets for the verdicts"""
+        total_rows, repo_count = inventory.counts()
+        monitored_rows = 0
+        assets = {}
+        rows = inventory.iter_rows(self.compromise_index.monitored_names)
+        
+        for row, severity, compromised_versions, admitted_versions in match_inventory(
+                self.compromise_index, self.range_engine, rows):
+            monitored_rows += 1
+            package_name, dep_type, file_path = row['package'], row['dependency_type'], row['file']
+            version = row['declared'] if admitted_versions else row['version']
+            repo_url = row['repo'] if '://' in row['repo'] or row['repo'].startswith('git@') else None
+            is_safe = severity == 'INFO'
+            self.track_package(package_name, row['version'], dep_type, file_path, row['depth'], row['declared'])
+            
+            asset_key = (row['repo'], file_path)
+            if asset_key not in assets:
+                assets[asset_key] = self.create_phoenix_asset(file_path, repo_url)
+            assets[asset_key]['findings'].append(self.create_phoenix_finding(
+                package_name, version, severity, compromised_versions, is_safe, file_path, repo_url, dep_type
+            ))
+            
+            if is_safe:
+                message = f"Safe version detected: {package_name}@{version}"
+                self.track_safe_package(package_name, version, compromised_versions, f'safe_{dep_type}',
+                                        file_path, row['depth'])
+            elif admitted_versions:
+                message = f"Declared range admits compromised version: {package_name}@{version}"
+                self.dependency_stats['range_admits_compromised_found'] += 1
+            elif severity == 'CRITICAL':
+                message = f"Compromised package detected: {package_name}@{version}"
+                self.dependency_stats['compromised_packages_found'] += 1
+            else:
+                message = f"Potentially compromised package detected: {package_name}@{version}"
+                self.dependency_stats['potentially_compromised_found'] += 1
+                
+            if not self.findings.contains(package_name, version, file_path, dep_type):
+                self.findings.append({
+                    'severity': severity,
+                    'message': message,
+                    'file': file_path,
+                    'repo_url': repo_url,
+                    'details': {
+                        'package': package_name,
+                        'version': version if not is_safe else None,
+                        'safe_version': version if is_safe else None,
+                        'dependency_type': dep_type,
+                        'compromised_versions': compromised_versions
+                    }
+                })
+                
+        self.rematch_stats = {
+            'rows': total_rows,
+            'repositories': repo_count,
+            'monitored_rows': monitored_rows,
+            'path': inventory.db_path
+        }
+        return list(assets.values())
+        
+    def process_package_files(self, package_files: List[Tuple[str, Optional[str]]]) -> List[Dict]:
+        """Process (file_path, repo_url) pairs, on a process pool when jobs > 1"""
+        if self.jobs > 1 and len(package_files) > 1:
+            print(f"⚙️  Processing {len(package_files)} files with {self.jobs} worker processes")
+            return run_parallel_scan(self, 'process_package_file', package_files, self.jobs)
+        return [self.process_package_file(file_path, repo_url) for file_path, repo_url in package_files]
+        
     def _add_installed_software_to_asset(self, asset: Dict, file_path: str):
         """Add installed software information to asset based on package file"""
         try:
@@ -1003,19 +1122,24 @@ additional_asset_tags = npm-project,dependency-scan
         except Exception as e:
             print(f"⚠️  Could not extract installed software from {file_path}: {str(e)}")
 
-    def scan_package_json(self, file_path: str) -> List[Dict]:
-        """Scan package.json for compromised packages"""
+    def scan_package_json(self, file_path: str, stream: Optional[io.TextIOBase] = None,
+                          repo_url: Optional[str] = None) -> List[Dict]:
+        """Scan package.json (read from stream when given) for compromised packages"""
         findings = []
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
+            with open_text(file_path, stream) as f:
                 package_data = json.load(f)
+            repo_url = repo_url or self.get_repo_url_from_path(file_path)
                 
             # Check direct dependencies
             for dep_type in ['dependencies', 'devDependencies', 'peerDependencies', 'optionalDependencies']:
                 if dep_type in package_data:
                     for package_name, version in package_data[dep_type].items():
                         clean_version = self.normalize_version(version)
+                        self.track_package(package_name, clean_version, f'direct_{dep_type}', file_path, depth=0,
+                                           declared_version=version)
+                        self.dependency_stats['direct_dependencies'] += 1
                         
                         # Track all scanned libraries
                         library_info = {
@@ -1025,12 +1149,16 @@ additional_asset_tags = npm-project,dependency-scan
                             'type': dep_type,
                             'file': file_path,
                             'status': 'clean',  # Default to clean, will be updated if compromised
-                            'repo_url': self.get_repo_url_from_path(file_path) if hasattr(self, 'get_repo_url_from_path') else 'unknown'
+                            'repo_url': repo_url
                         }
                         self.all_scanned_libraries.append(library_info)
                         
                         # Check if package is compromised
                         is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, clean_version)
+                        # Even when the range floor is safe, the range itself may admit a compromised release
+                        admitted_versions = [] if is_compromised and severity == 'CRITICAL' else self.range_engine.admitted_versions(package_name, version)
+                        if admitted_versions:
+                            severity = 'HIGH'
                         
                         if is_compromised or (package_name in self.compromised_packages):
                             # Update status to compromised
@@ -1045,7 +1173,8 @@ additional_asset_tags = npm-project,dependency-scan
                                 'type': dep_type,
                                 'file': file_path,
                                 'severity': severity,
-                                'compromised_versions': compromised_versions
+                                'compromised_versions': compromised_versions,
+                                'admitted_compromised_versions': admitted_versions
                             })
                         else:
                             # This is a clean library
@@ -1065,6 +1194,20 @@ additional_asset_tags = npm-project,dependency-scan
                                 }
                             )
                             self.dependency_stats['compromised_packages_found'] += 1
+                        elif admitted_versions:
+                            self.log_finding(
+                                'HIGH',
+                                f'Declared range admits compromised version: {package_name}@{version} (admits: {", ".join(admitted_versions)})',
+                                file_path,
+                                {
+                                    'package': package_name,
+                                    'version': version,
+                                    'dependency_type': dep_type,
+                                    'admitted_compromised_versions': admitted_versions,
+                                    'compromised_versions': compromised_versions
+                                }
+                            )
+                            self.dependency_stats['range_admits_compromised_found'] += 1
                         elif is_compromised and severity == 'INFO':
                             self.log_finding(
                                 'INFO',
@@ -1084,42 +1227,51 @@ additional_asset_tags = npm-project,dependency-scan
             
         return findings
         
-    def scan_lock_file(self, file_path: str) -> List[Dict]:
+    def scan_lock_file(self, file_path: str, stream: Optional[io.TextIOBase] = None) -> List[Dict]:
+        """Scan package-lock.json or yarn.lock for compromised packages, through the scan cache if enabled"""
+        scan_cache = self.get_scan_cache()
+        # The cache is keyed on file contents on disk; streamed blobs are already deduplicated by object id,
+        # and results filtered against a --since baseline are not the file's full results
+        if scan_cache is None or stream is not None or file_path in self.lock_baselines:
+            return self._scan_lock_file(file_path, stream)
+        return scan_cache.scan(self, '_scan_lock_file', file_path)
+
+    def _scan_lock_file(self, file_path: str, stream: Optional[io.TextIOBase] = None) -> List[Dict]:
         """Scan package-lock.json or yarn.lock for compromised packages"""
         findings = []
         
         try:
             if file_path.endswith('package-lock.json'):
-                findings.extend(self._scan_package_lock(file_path))
+                findings.extend(self._scan_package_lock(file_path, stream))
             elif file_path.endswith('yarn.lock'):
-                findings.extend(self._scan_yarn_lock(file_path))
+                findings.extend(self._scan_yarn_lock(file_path, stream))
                 
         except Exception as e:
             self.log_finding('ERROR', f'Failed to scan lock file {file_path}: {str(e)}', file_path)
             
         return findings
         
-    def _scan_package_lock(self, file_path: str) -> List[Dict]:
-        """Scan package-lock.json specifically"""
+    def _scan_package_lock(self, file_path: str, stream: Optional[io.TextIOBase] = None) -> List[Dict]:
+        """Scan package-lock.json specifically, streaming entries with bounded memory"""
         findings = []
+        baseline = self.lock_baselines.get(file_path)
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lock_data = json.load(f)
-            
         # Check packages in lockfile v2/v3 format
-        if 'packages' in lock_data:
-            for package_path, package_info in lock_data['packages'].items():
+        for section, package_path, package_info, depth in iter_package_lock_entries(file_path, stream):
+            if baseline is not None and lock_entry_key(section, package_path, package_info, depth) in baseline:
+                self.dependency_stats['unchanged_lock_entries_skipped'] += 1
+                continue
+            if section == 'packages':
                 if package_path.startswith('node_modules/'):
-                    # Handle scoped packages correctly
-                    path_parts = package_path.replace('node_modules/', '').split('/')
-                    if path_parts[0].startswith('@'):
-                        package_name = '/'.join(path_parts[:2])  # @scope/name
-                    else:
-                        package_name = path_parts[0]
+                    # Nested and scoped packages: name follows the last node_modules/
+                    package_name = package_name_from_lock_path(package_path)
                         
                     version = package_info.get('version', '')
                     
                     if version:
+                        self.track_package(package_name, version, 'lock_file_v2_v3', file_path, depth)
+                        self.dependency_stats['lock_file_packages'] += 1
+                        
                         # Check if package is compromised
                         is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, version)
                         
@@ -1159,50 +1311,66 @@ additional_asset_tags = npm-project,dependency-scan
                                         'path': package_path
                                     }
                                 )
-                                self.dependency_stats['safe_packages_found'] += 1
+                                self.track_safe_package(
+                                    package_name, version, compromised_versions,
+                                    'safe_lock_file_v2_v3', file_path, depth
+                                )
                                 
         return findings
 
-    def _scan_yarn_lock(self, file_path: str) -> List[Dict]:
-        """Scan yarn.lock file"""
+    def _scan_yarn_lock(self, file_path: str, stream: Optional[io.TextIOBase] = None) -> List[Dict]:
+        """Scan yarn.lock file (v1 and Berry) in a single streaming pass"""
         findings = []
+        seen_entries = set()
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Parse yarn.lock format for our compromised packages
-        all_packages = {**self.compromised_packages}
-        for pkg_name in self.potentially_compromised:
-            all_packages[pkg_name] = {"compromised_versions": [], "safe_version": "unknown"}
+        baseline = self.lock_baselines.get(file_path)
+        for package_name, version in iter_yarn_lock_entries(file_path, stream):
+            if (package_name, version) in seen_entries:
+                continue
+            seen_entries.add((package_name, version))
+            if baseline is not None and (package_name, version) in baseline:
+                self.dependency_stats['unchanged_lock_entries_skipped'] += 1
+                continue
             
-        for package_name, pkg_data in all_packages.items():
-            compromised_versions = pkg_data.get('compromised_versions', [])
+            self.track_package(package_name, version, 'yarn_lock', file_path, depth=0)
+            self.dependency_stats['lock_file_packages'] += 1
             
-            # Look for package entries in yarn.lock
-            escaped_name = re.escape(package_name)
+            # Check if package is compromised
+            is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, version)
             
-            if compromised_versions:
-                # Check for specific compromised versions
-                for comp_version in compromised_versions:
-                    pattern = rf'^{escaped_name}@.*?:\s*\n(?:\s+.*\n)*?\s+version\s+"?{re.escape(comp_version)}"?'
-                    matches = re.findall(pattern, content, re.MULTILINE)
-                    
-                    if matches:
-                        findings.append({
+            if is_compromised or (package_name in self.compromised_packages):
+                findings.append({
+                    'package': package_name,
+                    'version': version,
+                    'file': file_path,
+                    'severity': severity,
+                    'compromised_versions': compromised_versions
+                })
+                
+                # Log finding
+                if severity == 'CRITICAL':
+                    self.log_finding(
+                        'CRITICAL',
+                        f'Compromised package in yarn.lock: {package_name}@{version}',
+                        file_path,
+                        {'package': package_name, 'version': version}
+                    )
+                    self.dependency_stats['compromised_packages_found'] += 1
+                elif severity == 'INFO':
+                    self.log_finding(
+                        'INFO',
+                        f'Safe version in yarn.lock: {package_name}@{version} (compromised: {", ".join(compromised_versions)})',
+                        file_path,
+                        {
                             'package': package_name,
-                            'version': comp_version,
-                            'file': file_path,
-                            'severity': 'CRITICAL',
+                            'safe_version': version,
                             'compromised_versions': compromised_versions
-                        })
-                        
-                        self.log_finding(
-                            'CRITICAL',
-                            f'Compromised package in yarn.lock: {package_name}@{comp_version}',
-                            file_path,
-                            {'package': package_name, 'version': comp_version}
-                        )
-                        self.dependency_stats['compromised_packages_found'] += 1
+                        }
+                    )
+                    self.track_safe_package(
+                        package_name, version, compromised_versions,
+                        'safe_yarn_lock', file_path, depth=0
+                    )
                         
         return findings
 
@@ -1552,20 +1720,18 @@ additional_asset_tags = npm-project,dependency-scan
                     continue
                 
                 # Find package files in the folder
-                package_files = []
-                for pattern in ['package.json', 'package-lock.json']:
-                    package_files.extend(Path(folder_path).rglob(pattern))
+                package_files = self.find_npm_files(folder_path, include_yarn_lock=False)
                     
                 if not package_files:
                     print(f"📦 No NPM files found in {folder_path}")
                     continue
                     
-                for package_file in package_files:
-                    # Get repository URL for this local folder
-                    repo_url = self.get_repo_url_from_path(str(package_file.parent))
-                    asset = self.process_package_file(str(package_file), repo_url)
-                    if asset:
-                        assets.append(asset)
+                # Get repository URL for this local folder
+                package_files = [
+                    (package_file, self.get_repo_url_from_path(os.path.dirname(package_file)))
+                    for package_file in package_files
+                ]
+                assets.extend(asset for asset in self.process_package_files(package_files) if asset)
                         
         except Exception as e:
             print(f"❌ Error processing folder list: {str(e)}")
@@ -1590,20 +1756,18 @@ additional_asset_tags = npm-project,dependency-scan
                 continue
             
             # Find package files in the folder
-            package_files = []
-            for pattern in ['package.json', 'package-lock.json']:
-                package_files.extend(Path(folder_path).rglob(pattern))
+            package_files = self.find_npm_files(folder_path, include_yarn_lock=False)
                 
             if not package_files:
                 print(f"📦 No NPM files found in {folder_path}")
                 continue
                 
-            for package_file in package_files:
-                # Get repository URL for this local folder
-                repo_url = self.get_repo_url_from_path(str(package_file.parent))
-                asset = self.process_package_file(str(package_file), repo_url)
-                if asset:
-                    assets.append(asset)
+            # Get repository URL for this local folder
+            package_files = [
+                (package_file, self.get_repo_url_from_path(os.path.dirname(package_file)))
+                for package_file in package_files
+            ]
+            assets.extend(asset for asset in self.process_package_files(package_files) if asset)
                     
         return assets
 
@@ -1621,32 +1785,209 @@ additional_asset_tags = npm-project,dependency-scan
                 
             print(f"📋 Processing {len(repos)} repositories from {repo_list_file}")
             
-            for repo_url in repos:
-                print(f"\n🔄 Processing repository: {repo_url}")
-                
-                if self.light_scan_mode:
+            if self.light_scan_mode:
+                for repo_url in repos:
+                    print(f"\n🔄 Processing repository: {repo_url}")
                     # Light scan mode - download only NPM files
                     repo_assets = self.light_scan_repository(repo_url)
                     assets.extend(repo_assets)
-                else:
-                    # Full scan mode - clone or find the repository
-                    repo_path = self._get_or_clone_repository(repo_url)
-                    
-                    if repo_path:
-                        # Find package files in the repository
-                        package_files = []
-                        for pattern in ['package.json', 'package-lock.json']:
-                            package_files.extend(Path(repo_path).rglob(pattern))
-                            
-                        for package_file in package_files:
-                            asset = self.process_package_file(str(package_file), repo_url)
-                            assets.append(asset)
+            else:
+                # Full scan mode - clone or find repositories concurrently, scan each as it lands
+                assets.extend(self.acquire_and_scan_repositories(repos))
                         
         except Exception as e:
             print(f"❌ Error processing repository list: {str(e)}")
             
         return assets
         
+    @staticmethod
+    def repository_host(repo_url: str) -> str:
+        """Host a repository URL is fetched from ('local' for paths)"""
+        scp_match = re.match(r'^[\w.-]+@([\w.-]+):', repo_url)
+        if scp_match:
+            return scp_match.group(1)
+        return urlparse(repo_url).hostname or 'local'
+
+    def _acquire_repository(self, repo_url: str, host_slots: Dict[str, threading.BoundedSemaphore],
+                            name_locks: Dict[str, threading.Lock]) -> Tuple[Optional[str], float]:
+        """Clone or locate a repository while holding a slot for its host; returns (path, seconds)"""
+        repo_name = repo_url.split('/')[-1].replace('.git', '')
+        # Repositories sharing a name share a checkout path, so they are acquired one after another
+        with host_slots[self.repository_host(repo_url)], name_locks[repo_name]:
+            start = time.perf_counter()
+            if self.git_object_scan:
+                repo_path = self._update_mirror(repo_url)
+            else:
+                repo_path = self._get_or_clone_repository(repo_url)
+            return repo_path, time.perf_counter() - start
+
+    def acquire_and_scan_repositories(self, repos: List[str]) -> List[Dict]:
+        """Clone or locate repositories on a bounded pool and scan each checkout as soon as it is ready"""
+        assets = []
+        repos = list(dict.fromkeys(repos))
+        host_slots = {
+            host: threading.BoundedSemaphore(max(1, self.clone_jobs_per_host))
+            for host in {self.repository_host(repo_url) for repo_url in repos}
+        }
+        name_locks = {repo_url.split('/')[-1].replace('.git', ''): threading.Lock() for repo_url in repos}
+        workers = max(1, min(self.clone_jobs, len(repos)))
+        print(f"⚙️  Acquiring {len(repos)} repositories, {workers} at a time ({self.clone_jobs_per_host} per host)")
+        
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._acquire_repository, repo_url, host_slots, name_locks): repo_url
+                for repo_url in repos
+            }
+            # Scanning stays on this thread, overlapping with the clones still in flight
+            for future in as_completed(futures):
+                repo_url = futures[future]
+                try:
+                    repo_path, acquire_seconds = future.result()
+                except Exception as e:
+                    print(f"❌ Error acquiring repository {repo_url}: {str(e)}")
+                    repo_path, acquire_seconds = None, 0.0
+                    
+                print(f"\n🔄 Processing repository: {repo_url}")
+                timing = {
+                    'url': repo_url,
+                    'host': self.repository_host(repo_url),
+                    'status': 'scanned' if repo_path else 'failed',
+                    'acquire_seconds': acquire_seconds,
+                    'scan_seconds': 0.0,
+                    'files': 0
+                }
+                if repo_path and self.git_object_scan:
+                    scan_start = time.perf_counter()
+                    file_count, repo_assets = self.scan_repository_objects(repo_url, repo_path)
+                    assets.extend(repo_assets)
+                    timing['scan_seconds'] = time.perf_counter() - scan_start
+                    timing['files'] = file_count
+                elif repo_path:
+                    scan_start = time.perf_counter()
+                    # Find package files in the repository
+                    package_files = self.find_npm_files(repo_path, include_yarn_lock=False)
+                    assets.extend(self.process_package_files(
+                        [(package_file, repo_url) for package_file in package_files]
+                    ))
+                    timing['scan_seconds'] = time.perf_counter() - scan_start
+                    timing['files'] = len(package_files)
+                self.repository_timings.append(timing)
+                
+        self.repository_acquisition = {
+            'wall_seconds': time.perf_counter() - start,
+            'workers': workers,
+            'per_host': self.clone_jobs_per_host
+        }
+        return assets
+        
+    def _update_mirror(self, repo_url: str) -> Optional[str]:
+        """Fetch or create the blobless mirror of repo_url for a git object scan; returns its path"""
+        scope = "every branch and tag" if self.scan_all_refs else "HEAD"
+        print(f"📥 Updating mirror of {repo_url} (scanning {scope} from git objects)")
+        mirror_path, mirror_action = self.mirror_store.update(repo_url, blobless=True)
+        if mirror_path is None:
+            print(f"❌ Failed to mirror repository: {mirror_action}")
+            return None
+        self.found_repositories.append({
+            'url': repo_url,
+            'name': repo_url.split('/')[-1].replace('.git', ''),
+            'local_path': mirror_path,
+            'source': 'mirror_objects',
+            'mirror_action': mirror_action
+        })
+        return mirror_path
+
+    def scan_repository_objects(self, repo_url: str, mirror_path: str) -> Tuple[int, List[Dict]]:
+        """Scan manifests of HEAD, or of every branch and tag, straight from mirror objects; returns (files, assets)
+
+        Files are labelled <repo_url>@<ref>:<path>. A path whose blob is
+        unchanged across refs is parsed once, under the oldest ref holding
+        it; the other refs only count towards ref_history.
+        """
+        refs = self.mirror_store.list_refs(mirror_path) if self.scan_all_refs else [('HEAD', 0)]
+        ref_files = [
+            (ref, timestamp, self.mirror_store.list_files(mirror_path, ref, self.GIT_OBJECT_FILES, self.include_node_modules))
+            for ref, timestamp in refs
+        ]
+        blob_refs = {}  # (path, blob id) -> first ref holding it
+        for ref, _, files in ref_files:
+            for object_id, path in files:
+                blob_refs.setdefault((path, object_id), ref)
+        fetched = self.mirror_store.fetch_missing_blobs(
+            mirror_path, [ref for ref, _ in refs], (object_id for _, object_id in blob_refs)
+        )
+        print(f"🔍 {len(blob_refs)} distinct manifests in {len(refs)} refs ({fetched} blobs fetched)")
+        
+        assets = []
+        blob_packages = {}  # (path, blob id) -> compromised package@version strings found in it
+        with GitBlobReader(mirror_path) as reader:
+            for (path, object_id), ref in blob_refs.items():
+                label = f"{repo_url}@{ref}:{path}"
+                data = reader.read(object_id)
+                if data is None:
+                    print(f"⚠️  Could not read {label} (blob {object_id})")
+                    continue
+                findings_before = len(self.findings)
+                asset = self.process_package_file(label, repo_url, io.StringIO(data.decode('utf-8', errors='replace')))
+                if repo_url and "github.com" in repo_url:
+                    branch = ref.split('/', 1)[-1]
+                    asset['attributes']['buildFile'] = f"{repo_url.replace('.git', '')}/tree/{branch}/{path}"
+                assets.append(asset)
+                blob_packages[(path, object_id)] = {
+                    f"{finding['details']['package']}@{finding['details']['version']}"
+                    for finding in self.findings[findings_before:]
+                    if finding['severity'] == 'CRITICAL' and (finding.get('details') or {}).get('version')
+                }
+                
+        if self.scan_all_refs:
+            appearances = {}  # package@version -> {ref: timestamp}, oldest ref first
+            for ref, timestamp, files in ref_files:
+                for object_id, path in files:
+                    for package_version in blob_packages.get((path, object_id), ()):
+                        appearances.setdefault(package_version, {}).setdefault(ref, timestamp)
+            for package_version, refs_seen in appearances.items():
+                first_ref, first_seen = next(iter(refs_seen.items()))
+                self.ref_history.append({
+                    'url': repo_url,
+                    'package': package_version,
+                    'first_ref': first_ref,
+                    'first_seen': first_seen,
+                    'refs': list(refs_seen)
+                })
+        return len(blob_refs), assets
+        
+    def clone_commands(self, repo_url: str, clone_path: str) -> List[List[str]]:
+        """git commands that produce a checkout of repo_url at clone_path for the configured strategy"""
+        if self.clone_strategy == 'full':
+            return [['git', 'clone', repo_url, clone_path]]
+        if self.clone_strategy == 'shallow':
+            # Latest commit only, but every file of it, for scans that read sources
+            return [['git', 'clone', '--depth', '1', repo_url, clone_path]]
+        # Blobs are fetched lazily at checkout, and the sparse checkout only asks for manifests
+        return [
+            ['git', 'clone', '--depth', '1', '--filter=blob:none', '--no-checkout', repo_url, clone_path],
+            ['git', '-C', clone_path, 'sparse-checkout', 'set', '--no-cone', *self.MANIFEST_PATTERNS],
+            ['git', '-C', clone_path, 'checkout'],
+        ]
+
+    def _checkout_from_mirror(self, repo_url: str, checkout_path: str) -> Tuple[Optional[subprocess.CompletedProcess], str]:
+        """Update the mirror of repo_url and add a worktree of HEAD; returns (result, mirror action)"""
+        # Blobs are only fetched for what a checkout materialises, so only 'full' keeps them all
+        mirror_path, action = self.mirror_store.update(repo_url, blobless=self.clone_strategy != 'full')
+        if mirror_path is None:
+            return None, action
+        sparse_patterns = self.MANIFEST_PATTERNS if self.clone_strategy == 'manifests' else None
+        return self.mirror_store.add_worktree(mirror_path, checkout_path, sparse_patterns), action
+
+    def _clone_repository(self, repo_url: str, clone_path: str) -> subprocess.CompletedProcess:
+        """Run clone_commands, stopping at the first failure; returns the last command's result"""
+        for command in self.clone_commands(repo_url, clone_path):
+            result = subprocess.run(command, capture_output=True, text=True, timeout=300)
+            if result.returncode != 0:
+                break
+        return result
+
     def _get_or_clone_repository(self, repo_url: str) -> Optional[str]:
         """Get local path for repository, clone if necessary"""
         # Extract repository name from URL
@@ -1700,23 +2041,28 @@ additional_asset_tags = npm-project,dependency-scan
             os.makedirs(os.path.dirname(clone_path), exist_ok=True)
             
         try:
-            print(f"📥 Cloning repository to {clone_path}")
-            result = subprocess.run(
-                ['git', 'clone', repo_url, clone_path],
-                capture_output=True,
-                text=True,
-                timeout=300
-            )
+            if self.mirror_store:
+                print(f"📥 Checking out {repo_url} from mirror cache to {clone_path} ({self.clone_strategy} checkout)")
+                result, mirror_action = self._checkout_from_mirror(repo_url, clone_path)
+                if result is None:
+                    print(f"❌ Failed to mirror repository: {mirror_action}")
+                    return None
+            else:
+                print(f"📥 Cloning repository to {clone_path} ({self.clone_strategy} clone)")
+                result, mirror_action = self._clone_repository(repo_url, clone_path), None
             
             if result.returncode == 0:
                 print(f"✅ Successfully cloned repository")
                 # Track cloned repository
-                self.cloned_repositories.append({
+                cloned_repository = {
                     'url': repo_url,
                     'name': repo_name,
                     'local_path': clone_path,
                     'source': 'organized_folder' if self.organize_folders else 'tmp_folder'
-                })
+                }
+                if mirror_action:
+                    cloned_repository.update(source='mirror_cache', mirror_action=mirror_action)
+                self.cloned_repositories.append(cloned_repository)
                 return clone_path
             else:
                 print(f"❌ Failed to clone repository: {result.stderr}")
@@ -1726,6 +2072,55 @@ additional_asset_tags = npm-project,dependency-scan
             
         return None
 
+    def _repository_timing_lines(self) -> List[str]:
+        """Report section with per-host and per-repository acquisition timings"""
+        timings = self.repository_timings
+        failed = sum(1 for timing in timings if timing['status'] == 'failed')
+        lines = ["REPOSITORY ACQUISITION TIMINGS:"]
+        if self.repository_acquisition:
+            lines.append(
+                f"Wall time: {self.repository_acquisition['wall_seconds']:.2f}s "
+                f"({self.repository_acquisition['workers']} workers, "
+                f"{self.repository_acquisition['per_host']} per host)"
+            )
+        lines.append(f"Repositories: {len(timings) - failed} scanned, {failed} failed")
+        lines.append(
+            f"Total acquisition time: {sum(timing['acquire_seconds'] for timing in timings):.2f}s, "
+            f"total scan time: {sum(timing['scan_seconds'] for timing in timings):.2f}s"
+        )
+        
+        hosts = {}
+        for timing in timings:
+            host_totals = hosts.setdefault(timing['host'], [0, 0.0])
+            host_totals[0] += 1
+            host_totals[1] += timing['acquire_seconds']
+        for host, (count, seconds) in sorted(hosts.items()):
+            lines.append(f"  {host}: {count} repositories, {seconds:.2f}s acquiring")
+            
+        slowest = sorted(timings, key=lambda timing: timing['acquire_seconds'] + timing['scan_seconds'], reverse=True)
+        to_show = slowest if self.detail_log else slowest[:10]
+        lines.append("Slowest repositories:" if len(to_show) < len(slowest) else "Per-repository timings:")
+        for i, timing in enumerate(to_show, 1):
+            lines.append(
+                f"{i:2d}. {timing['url']} - {timing['status']}, acquired in {timing['acquire_seconds']:.2f}s, "
+                f"scanned {timing['files']} files in {timing['scan_seconds']:.2f}s"
+            )
+        lines.append("")
+        return lines
+
+    def _ref_history_lines(self) -> List[str]:
+        """Report section listing, per compromised package@version, the oldest branch or tag holding it"""
+        lines = ["COMPROMISED VERSIONS ACROSS BRANCHES AND TAGS:"]
+        for entry in sorted(self.ref_history, key=lambda entry: (entry['url'], entry['first_seen'])):
+            first_seen = datetime.fromtimestamp(entry['first_seen']).strftime('%Y-%m-%d %H:%M')
+            refs = entry['refs'] if self.detail_log else entry['refs'][:10]
+            more = f" (+{len(entry['refs']) - len(refs)} more)" if len(refs) < len(entry['refs']) else ""
+            lines.append(f"🚨 {entry['package']} in {entry['url']}")
+            lines.append(f"    First seen: {entry['first_ref']} ({first_seen})")
+            lines.append(f"    Present in {len(entry['refs'])} refs: {', '.join(refs)}{more}")
+        lines.append("")
+        return lines
+
     def generate_report(self, output_file: str = None) -> str:
         """Generate a comprehensive security report"""
         report_lines = []
@@ -1742,6 +2137,19 @@ additional_asset_tags = npm-project,dependency-scan
         report_lines.append(f"Total packages scanned: {len(self.scanned_packages)}")
         report_lines.append(f"Clean packages found: {len(self.safe_packages)}")
         report_lines.append(f"Total findings: {len(self.findings)}")
+        cache_scope = " (main process only)" if self.jobs > 1 else ""
+        report_lines.append(f"Version cache{cache_scope}: {format_version_cache_stats(version_cache_stats(self.range_engine))}")
+        if self.scan_cache_path:
+            report_lines.append(format_scan_cache_stats(self.scan_cache_stats, self.scan_cache_path))
+        if self.rematch_stats:
+            report_lines.append(
+                f"Rematched inventory: {self.rematch_stats['rows']} entries from "
+                f"{self.rematch_stats['repositories']} repositories in {self.rematch_stats['path']} "
+                f"({self.rematch_stats['monitored_rows']} with a verdict, database {self.compromise_index.version})"
+            )
+        if self.incremental_stats:
+            report_lines.append(format_incremental_stats(
+                self.incremental_stats, self.dependency_stats['unchanged_lock_entries_skipped']))
         
         if self.light_scan_mode:
             report_lines.append(f"Scan mode: Light scan (NPM files only)")
@@ -1775,6 +2183,16 @@ additional_asset_tags = npm-project,dependency-scan
         report_lines.append("REPOSITORY PROCESSING DETAILS:")
         report_lines.append("-" * 30)
         
+        if self.mirror_store:
+            mirror_actions = [
+                repo['mirror_action'] for repo in self.cloned_repositories + self.found_repositories
+                if repo.get('mirror_action')
+            ]
+            report_lines.append(
+                f"Mirror cache: {mirror_actions.count('cloned')} cloned, {mirror_actions.count('fetched')} fetched, "
+                f"{mirror_actions.count('stale')} stale (fetch failed) in {self.mirror_store.root}"
+            )
+            
         # Show cloned repositories
         if self.cloned_repositories:
             report_lines.append("CLONED REPOSITORIES:")
@@ -1795,6 +2213,11 @@ additional_asset_tags = npm-project,dependency-scan
                 report_lines.append(f"    Source: {repo['source']}")
                 report_lines.append("")
         
+        if self.repository_timings:
+            report_lines.extend(self._repository_timing_lines())
+        if self.ref_history:
+            report_lines.extend(self._ref_history_lines())
+        
         # Library analysis summary
         if self.all_scanned_libraries:
             report_lines.append("")
@@ -1820,11 +2243,7 @@ additional_asset_tags = npm-project,dependency-scan
                     file_path = lib.get('file', 'unknown')
                     
                     # Extract repository URL from findings or try to determine from file path
-                    repo_url = None
-                    for finding in self.findings:
-                        if finding.get('file') == file_path:
-                            repo_url = finding.get('repo_url')
-                            break
+                    repo_url = self.findings.repo_url_for_file(file_path)
                     
                     if not repo_url:
                         repo_url = self.get_repo_url_from_path(file_path)
@@ -1861,11 +2280,7 @@ additional_asset_tags = npm-project,dependency-scan
                     file_path = lib.get('file', 'unknown')
                     
                     # Extract repository URL from findings or try to determine from file path
-                    repo_url = None
-                    for finding in self.findings:
-                        if finding.get('file') == file_path:
-                            repo_url = finding.get('repo_url')
-                            break
+                    repo_url = self.findings.repo_url_for_file(file_path)
                     
                     if not repo_url:
                         repo_url = self.get_repo_url_from_path(file_path)
@@ -1889,10 +2304,7 @@ additional_asset_tags = npm-project,dependency-scan
         report_lines.append("")
         
         # Summary by severity
-        severity_counts = {}
-        for finding in self.findings:
-            severity = finding['severity']
-            severity_counts[severity] = severity_counts.get(severity, 0) + 1
+        severity_counts = self.findings.severity_counts
             
         report_lines.append("SEVERITY SUMMARY:")
         report_lines.append("-" * 20)
@@ -2072,6 +2484,37 @@ def main():
                        help='Show all libraries in the report without truncation (detailed logging)')
     parser.add_argument('--use-tmp', action='store_true',
                        help='Use /tmp for repository cloning (legacy mode, not recommended)')
+    parser.add_argument('--include-node-modules', action='store_true',
+                       help='Installed-package mode: also walk into node_modules nested inside node_modules')
+    parser.add_argument('--max-depth', type=int,
+                       help='Maximum directory depth to walk (default: unlimited)')
+    parser.add_argument('--follow-symlinks', action='store_true',
+                       help='Follow symlinked directories while walking')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                       help='Process package files in N worker processes (default: 1)')
+    parser.add_argument('--clone-jobs', type=int, default=8,
+                       help='With --repo-list, clone or locate N repositories concurrently (default: 8)')
+    parser.add_argument('--clone-per-host', type=int, default=4,
+                       help='With --repo-list, at most N concurrent clones per git host (default: 4)')
+    parser.add_argument('--clone-strategy', choices=EnhancedNPMCompromiseDetectorPhoenix.CLONE_STRATEGIES,
+                       default='manifests',
+                       help='manifests: shallow, blobless, sparse checkout of npm manifests only (default); '
+                            'shallow: latest commit with all files; full: complete history')
+    parser.add_argument('--mirror-cache', nargs='?', const=GitMirrorStore.DEFAULT_ROOT, metavar='PATH',
+                       help=f'Keep bare mirrors of listed repositories and update them with git fetch '
+                            f'(default path: {GitMirrorStore.DEFAULT_ROOT})')
+    parser.add_argument('--git-objects', action='store_true',
+                       help='With --repo-list, read manifests straight from mirror git objects; no checkout is made')
+    parser.add_argument('--all-refs', action='store_true',
+                       help='With --git-objects, scan every branch and tag and report where compromised versions first appear')
+    parser.add_argument('--scan-cache', nargs='?', const=ScanCache.DEFAULT_PATH, metavar='PATH',
+                       help=f'Reuse lock file results from a SQLite cache (default path: {ScanCache.DEFAULT_PATH})')
+    parser.add_argument('--inventory', nargs='?', const=InventoryStore.DEFAULT_PATH, metavar='PATH',
+                       help=f'Save every package seen to a SQLite inventory (default path: {InventoryStore.DEFAULT_PATH})')
+    parser.add_argument('--rematch', nargs='?', const=InventoryStore.DEFAULT_PATH, metavar='PATH',
+                       help='Match a stored inventory against the current database instead of scanning')
+    parser.add_argument('--since', metavar='REF',
+                       help='For a directory target, only scan package files changed since REF, matching only new lock file entries')
     
     # Import all libraries option
     parser.add_argument('--import-all', action='store_true',
@@ -2140,6 +2583,22 @@ def main():
     if args.import_all:
         detector.enable_import_all(True)
         
+    if args.include_node_modules:
+        detector.enable_installed_package_scan(True)
+        print("📦 Installed-package mode enabled (scanning nested node_modules)")
+    detector.max_depth = args.max_depth
+    detector.follow_symlinks = args.follow_symlinks
+    detector.jobs = max(1, args.jobs)
+    detector.clone_jobs = max(1, args.clone_jobs)
+    detector.clone_jobs_per_host = max(1, args.clone_per_host)
+    detector.clone_strategy = args.clone_strategy
+    if args.mirror_cache:
+        detector.enable_mirror_cache(root=args.mirror_cache)
+    if args.git_objects or args.all_refs:
+        detector.enable_git_object_scan(all_refs=args.all_refs)
+    if args.scan_cache:
+        detector.enable_scan_cache(db_path=args.scan_cache)
+        
     # Handle additional tags
     vuln_tags = []
     asset_tags = []
@@ -2157,7 +2616,11 @@ def main():
     print()
     
     # Process based on input type
-    if args.folders:
+    if args.rematch:
+        # Matching stage only: no cloning or file reads, the stored inventory stands in for the scan
+        print(f"🔁 Rematching inventory: {os.path.abspath(args.rematch)}")
+        detector.phoenix_assets = detector.rematch_inventory(InventoryStore(args.rematch))
+    elif args.folders:
         # Multiple folders specified directly
         assets = detector.process_multiple_folders(args.folders)
         detector.phoenix_assets = assets
@@ -2176,18 +2639,20 @@ def main():
             asset = detector.process_package_file(args.target, args.repo_url)
             detector.phoenix_assets = [asset]
         else:
-            # Directory - find all package files
-            directory_path = Path(args.target)
-            package_files = []
-            
-            # Find package.json and lock files
-            for pattern in ['package.json', 'package-lock.json', 'yarn.lock']:
-                package_files.extend(directory_path.rglob(pattern))
-            
-            for package_file in package_files:
-                asset = detector.process_package_file(str(package_file), args.repo_url)
-                detector.phoenix_assets.append(asset)
+            # Directory - only what changed since --since when git can tell, else every package file in one walk
+            package_files = detector.find_changed_npm_files(args.target, args.since) if args.since else None
+            if package_files is None:
+                package_files = detector.find_npm_files(args.target)
+            detector.phoenix_assets.extend(detector.process_package_files(
+                [(package_file, args.repo_url) for package_file in package_files]
+            ))
     
+    if args.inventory and detector.incremental_stats:
+        print("⚠️  Inventory not saved: a --since scan only covers changed files")
+    elif args.inventory and not args.rematch:
+        saved_rows = detector.save_inventory(InventoryStore(args.inventory))
+        print(f"🗃️  Saved {saved_rows} inventory entries to {args.inventory}")
+        
     # Import to Phoenix if enabled
     if detector.enable_phoenix_import:
         success = detector.import_to_phoenix()
@@ -2202,8 +2667,8 @@ def main():
             print(report)
         else:
             # Show only critical and high findings
-            critical_findings = [f for f in detector.findings if f['severity'] == 'CRITICAL']
-            high_findings = [f for f in detector.findings if f['severity'] == 'HIGH']
+            critical_findings = detector.findings.by_severity('CRITICAL')
+            high_findings = detector.findings.by_severity('HIGH')
             
             if critical_findings:
                 print("🚨 CRITICAL FINDINGS DETECTED!")
@@ -2226,7 +2691,7 @@ def main():
     detector.cleanup_cloned_repositories()
     
     # Exit with error code if critical or high findings
-    critical_count = len([f for f in detector.findings if f['severity'] in ['CRITICAL', 'HIGH']])
+    critical_count = detector.findings.count('CRITICAL', 'HIGH')
     return 1 if critical_count > 0 else 0
 
 
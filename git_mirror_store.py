@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Persistent git mirrors for the Phoenix repository scanner
+Bare mirrors kept up to date with `git fetch`, checked out into disposable
+worktrees or read straight from git objects with one `git cat-file` process
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import hashlib
+import os
+import re
+import shutil
+import subprocess
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from npm_package_compromise_detector_2025 import in_nested_node_modules
+
+
+class GitMirrorStore:
+    """Long-lived bare mirrors keyed by repository URL, checked out into cheap worktrees
+
+    A repository is cloned once with `git clone --mirror` and from then on
+    only updated with `git fetch --prune`. Mirrors may be blobless partial
+    clones: a worktree checkout then fetches just the blobs it materialises,
+    in one batch, so a sparse worktree of npm manifests costs one small
+    request. Deleting a worktree directory is enough to discard it; stale
+    worktree entries are pruned the next time the mirror is used.
+    Manifests can also be read with no worktree at all: list_files walks
+    the tree objects of any branch or tag and GitBlobReader streams blobs.
+    """
+
+    DEFAULT_ROOT = os.path.join('github-pull', 'mirrors')
+
+    def __init__(self, root: str = DEFAULT_ROOT, timeout: int = 300):
+        self.root = root
+        self.timeout = timeout
+        os.makedirs(root, exist_ok=True)
+
+    def mirror_path(self, repo_url: str) -> str:
+        """Directory of the mirror for repo_url: a readable slug plus a hash of the exact URL"""
+        slug = re.sub(r'^[a-z+]+://', '', repo_url)
+        slug = re.sub(r'^[^@/]+@', '', slug)  # Drop credentials and scp-style users
+        slug = re.sub(r'[^A-Za-z0-9._-]+', '_', slug).strip('_.')
+        if slug.endswith('.git'):
+            slug = slug[:-4]
+        digest = hashlib.sha1(repo_url.encode('utf-8')).hexdigest()[:10]
+        return os.path.join(self.root, f"{slug[-80:]}-{digest}.git")
+
+    def git(self, *args: str, input: Optional[str] = None) -> subprocess.CompletedProcess:
+        return subprocess.run(['git', *args], input=input, capture_output=True, text=True, timeout=self.timeout)
+
+    def update(self, repo_url: str, blobless: bool = True) -> Tuple[Optional[str], str]:
+        """Fetch or create the mirror of repo_url; returns (mirror path or None, 'fetched'/'cloned'/'stale'/error)"""
+        mirror_path = self.mirror_path(repo_url)
+        if os.path.exists(os.path.join(mirror_path, 'HEAD')):
+            result = self.git('-C', mirror_path, 'fetch', '--prune', '--quiet', 'origin')
+            # A mirror that failed to update is still a usable, if older, copy
+            return mirror_path, 'fetched' if result.returncode == 0 else 'stale'
+
+        # Clone next to the final path and rename, so an interrupted clone never looks like a mirror
+        partial_path = f"{mirror_path}.partial-{os.getpid()}-{threading.get_ident()}"
+        shutil.rmtree(partial_path, ignore_errors=True)
+        command = ['clone', '--mirror', '--quiet']
+        if blobless:
+            command.append('--filter=blob:none')
+        result = self.git(*command, repo_url, partial_path)
+        if result.returncode != 0:
+            shutil.rmtree(partial_path, ignore_errors=True)
+            return None, result.stderr.strip() or 'git clone --mirror failed'
+        os.replace(partial_path, mirror_path)
+        return mirror_path, 'cloned'
+
+    def add_worktree(self, mirror_path: str, worktree_path: str,
+                     sparse_patterns: Optional[Tuple[str, ...]] = None) -> subprocess.CompletedProcess:
+        """Check HEAD of a mirror out into a detached worktree, limited to sparse_patterns if given"""
+        self.git('-C', mirror_path, 'worktree', 'prune')
+        commands = [['-C', mirror_path, 'worktree', 'add', '--quiet', '--no-checkout', '--detach',
+                     os.path.abspath(worktree_path), 'HEAD']]
+        if sparse_patterns:
+            commands.append(['-C', worktree_path, 'sparse-checkout', 'set', '--no-cone', *sparse_patterns])
+        commands.append(['-C', worktree_path, 'checkout', '--quiet'])
+        for command in commands:
+            result = self.git(*command)
+            if result.returncode != 0:
+                break
+        return result
+
+    def list_refs(self, mirror_path: str) -> List[Tuple[str, int]]:
+        """Branches and tags of a mirror as (ref name without refs/, creation timestamp), oldest first"""
+        result = self.git('-C', mirror_path, 'for-each-ref', '--format=%(creatordate:unix) %(refname)',
+                          'refs/heads', 'refs/tags')
+        refs = []
+        for line in result.stdout.splitlines():
+            timestamp, refname = line.split(' ', 1)
+            refs.append((refname[len('refs/'):], int(timestamp or 0)))
+        return sorted(refs, key=lambda ref: ref[1])
+
+    def list_files(self, mirror_path: str, ref: str, names: Tuple[str, ...],
+                   include_node_modules: bool = False) -> List[Tuple[str, str]]:
+        """(blob id, path) of every file at ref whose base name is in names, read from the tree objects"""
+        result = self.git('-C', mirror_path, 'ls-tree', '-r', '-z', '--full-tree', ref)
+        files = []
+        for entry in result.stdout.split('\0'):
+            if not entry:
+                continue
+            info, path = entry.split('\t', 1)
+            _, object_type, object_id = info.split()
+            parts = path.split('/')
+            if object_type != 'blob' or parts[-1] not in names:
+                continue
+            if not include_node_modules and in_nested_node_modules(parts):
+                continue
+            files.append((object_id, path))
+        return files
+
+    def fetch_missing_blobs(self, mirror_path: str, refs: List[str], object_ids: Iterable[str]) -> int:
+        """Fetch the blobs among object_ids that a blobless mirror lacks, in one request; returns the count"""
+        promisor = self.git('-C', mirror_path, 'config', '--get', 'remote.origin.promisor')
+        if promisor.stdout.strip() != 'true':
+            return 0
+        # Without this, `cat-file --batch` would lazily fetch each missing blob in its own round trip
+        listed = self.git('-C', mirror_path, 'rev-list', '--objects', '--missing=print', '--no-walk', '--stdin',
+                          input='\n'.join(refs) + '\n')
+        missing = {line[1:].split(' ', 1)[0] for line in listed.stdout.splitlines() if line.startswith('?')}
+        wanted = [object_id for object_id in dict.fromkeys(object_ids) if object_id in missing]
+        if wanted:
+            self.git('-C', mirror_path, '-c', 'fetch.negotiationAlgorithm=noop', 'fetch', '--quiet', '--no-tags',
+                     '--no-write-fetch-head', '--recurse-submodules=no', '--filter=blob:none', '--stdin', 'origin',
+                     input='\n'.join(wanted) + '\n')
+        return len(wanted)
+
+
+class GitBlobReader:
+    """Reads blobs by object id through one long-lived `git cat-file --batch` process
+
+    Each read is a line written to the process and a sized response read
+    back, so thousands of manifests cost one git process instead of one
+    `git show` each, and nothing is written to a working tree.
+    """
+
+    def __init__(self, git_dir: str):
+        self.process = subprocess.Popen(['git', '-C', git_dir, 'cat-file', '--batch'],
+                                        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+
+    def read(self, object_id: str) -> Optional[bytes]:
+        """Contents of a blob named by id or <rev>:<path>, or None if there is no such object"""
+        try:
+            self.process.stdin.write(object_id.encode('utf-8') + b'\n')
+            self.process.stdin.flush()
+        except OSError:
+            return None
+        header = self.process.stdout.readline().split()
+        if len(header) != 3:
+            return None  # '<id> missing', or the process has exited
+        data = self.process.stdout.read(int(header[2]))
+        self.process.stdout.read(1)  # Trailing newline after each object
+        return data
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+    def __enter__(self) -> 'GitBlobReader':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
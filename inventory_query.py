@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Fleet inventory query tool for the NPM Package Compromise Detector
+Answers "which repositories contain package X at version Y?" from the inventory
+saved by `--inventory` scans, without rescanning anything
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from npm_package_compromise_detector_2025 import InventoryStore
+
+
+def parse_package_spec(spec: str) -> Tuple[str, Optional[str]]:
+    """Split 'name@version' into (name, version); scoped names keep their leading @"""
+    at_index = spec.rfind('@')
+    if at_index > 0:
+        return spec[:at_index], spec[at_index + 1:] or None
+    return spec, None
+
+
+def merge_index(index: Dict[str, Dict[str, List[Dict]]], hits: Dict[str, Dict[str, List[Dict]]]):
+    """Add a lookup result to index version by version, skipping locations it already lists"""
+    for package, versions in hits.items():
+        for version, locations in versions.items():
+            merged = index.setdefault(package, {}).setdefault(version, [])
+            seen = {tuple(sorted(location.items())) for location in merged}
+            for location in locations:
+                key = tuple(sorted(location.items()))
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(location)
+
+
+def format_index(index: Dict[str, Dict[str, List[Dict]]]) -> List[str]:
+    """Human-readable lines for a {package: {version: [locations]}} lookup result"""
+    lines = []
+    for package, versions in index.items():
+        location_count = sum(len(locations) for locations in versions.values())
+        lines.append(f"📦 {package} ({len(versions)} versions, {location_count} locations)")
+        for version, locations in versions.items():
+            repo_count = len({location['repo'] for location in locations})
+            lines.append(f"   {version} ({repo_count} repositories)")
+            for location in locations:
+                declared = f" declared {location['declared']}" if location['declared'] not in (None, version) else ""
+                lines.append(f"      {location['repo']}  {location['file']}  "
+                             f"depth {location['depth']}  {location['dependency_type']}{declared}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query the fleet package inventory')
+    parser.add_argument('packages', nargs='*',
+                        help='Packages to look up as name or name@version (e.g. @ctrl/tinycolor@4.1.2)')
+    parser.add_argument('--prefix', action='append', default=[],
+                        help='Look up every package whose name starts with PREFIX (e.g. @nativescript-community/)')
+    parser.add_argument('--db', default=InventoryStore.DEFAULT_PATH,
+                        help=f'Inventory database (default: {InventoryStore.DEFAULT_PATH})')
+    parser.add_argument('--json', action='store_true',
+                        help='Print results as JSON')
+    args = parser.parse_args()
+
+    if not args.packages and not args.prefix:
+        parser.error('give at least one package or --prefix')
+    if not os.path.exists(args.db):
+        print(f"❌ Inventory not found: {args.db} (run a scan with --inventory first)")
+        return 2
+
+    inventory = InventoryStore(args.db)
+    start = time.perf_counter()
+    index = {}
+    for spec in args.packages:
+        package, version = parse_package_spec(spec)
+        merge_index(index, inventory.lookup(package, version))
+    for prefix in args.prefix:
+        merge_index(index, inventory.lookup_prefix(prefix))
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(index, indent=2))
+    elif index:
+        print('\n'.join(format_index(index)))
+        print(f"\n⏱️  {len(index)} packages found in {elapsed_ms:.1f} ms")
+    else:
+        print(f"✅ No matching packages in {args.db} ({elapsed_ms:.1f} ms)")
+
+    return 0 if index else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
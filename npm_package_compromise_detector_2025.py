@@ -9,29 +9,2002 @@ Date: September 2025
 Updated: Extended package list for 2025 compromise detection
 """
 
+import contextlib
+import hashlib
+import io
 import json
+import mmap
 import os
 import re
+import sqlite3
 import sys
 import subprocess
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Optional, Any
+from typing import Dict, Iterable, Iterator, List, Set, TextIO, Tuple, Optional, Any
 import argparse
 from datetime import datetime
 import tempfile
 import shutil
+import zlib
+from bisect import bisect_left, bisect_right
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache, partial
+
+
+class PackageRegistry:
+    """Insertion-ordered package store with constant-time keyed deduplication
+
+    Behaves like the plain lists it replaces (iteration, len, truthiness) so
+    report code can keep looping over it, but membership checks go through a
+    dict instead of a linear scan.
+    """
+
+    def __init__(self, key_fields: Tuple[str, ...]):
+        self.key_fields = key_fields
+        self._entries = {}
+
+    def make_key(self, entry: Dict) -> Tuple:
+        """Build the dedup key for an entry from the configured fields"""
+        return tuple(entry.get(field) for field in self.key_fields)
+
+    def add(self, entry: Dict) -> bool:
+        """Add an entry unless one with the same key exists. Returns True if added."""
+        key = self.make_key(entry)
+        if key in self._entries:
+            return False
+        self._entries[key] = entry
+        return True
+
+    def get(self, key: Tuple, default: Any = None) -> Any:
+        return self._entries.get(key, default)
+
+    def __contains__(self, key: Tuple) -> bool:
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FindingStore:
+    """Ordered list of findings with a duplicate-check index and severity counters
+
+    Findings are indexed on (package, version, file, dependency_type) so
+    duplicate checks are O(1), and per-severity counts are maintained on
+    append so callers never need to re-filter the whole list.
+    """
+
+    def __init__(self):
+        self._findings = []
+        self._index = set()
+        self._repo_url_by_file = {}
+        self.severity_counts = {}
+
+    @staticmethod
+    def index_key(finding: Dict) -> Tuple:
+        details = finding.get('details') or {}
+        return (details.get('package'), details.get('version'),
+                finding.get('file'), details.get('dependency_type'))
+
+    def append(self, finding: Dict):
+        self._findings.append(finding)
+        self._index.add(self.index_key(finding))
+        severity = finding.get('severity')
+        self.severity_counts[severity] = self.severity_counts.get(severity, 0) + 1
+        file_path = finding.get('file')
+        if file_path not in self._repo_url_by_file:
+            self._repo_url_by_file[file_path] = finding.get('repo_url')
+
+    def contains(self, package: str, version: str, file_path: str, dependency_type: str) -> bool:
+        """Check whether a finding with these details has already been recorded"""
+        return (package, version, file_path, dependency_type) in self._index
+
+    def repo_url_for_file(self, file_path: str) -> Optional[str]:
+        """Repository URL of the first finding recorded for a file, if any"""
+        return self._repo_url_by_file.get(file_path)
+
+    def count(self, *severities: str) -> int:
+        """Number of findings with any of the given severities"""
+        return sum(self.severity_counts.get(severity, 0) for severity in severities)
+
+    def by_severity(self, severity: str) -> List[Dict]:
+        """Findings with the given severity, in recorded order"""
+        if not self.severity_counts.get(severity):
+            return []
+        return [f for f in self._findings if f.get('severity') == severity]
+
+    def __iter__(self):
+        return iter(self._findings)
+
+    def __len__(self) -> int:
+        return len(self._findings)
+
+    def __getitem__(self, index):
+        return self._findings[index]
+
+
+def in_nested_node_modules(parts: List[str]) -> bool:
+    """True if a file path, split into parts, lies in a node_modules nested inside another node_modules"""
+    return parts[:-1].count('node_modules') > 1
+
+
+class FileWalker:
+    """Single-pass os.scandir walker that classifies NPM manifests, lock files and sources
+
+    Replaces one rglob traversal per file pattern with a single pruned walk.
+    By default .git is skipped, and so are node_modules directories nested
+    inside another node_modules: a project's own installed packages are
+    scanned, their vendored dependency trees are not. Set
+    include_node_modules to walk every node_modules as well.
+    """
+
+    SOURCE_EXTENSIONS = ('.js', '.ts', '.jsx', '.tsx', '.mjs', '.cjs')
+
+    def __init__(self, skip_git: bool = True, include_node_modules: bool = False,
+                 max_depth: Optional[int] = None, follow_symlinks: bool = False):
+        self.skip_git = skip_git
+        self.include_node_modules = include_node_modules
+        self.max_depth = max_depth
+        self.follow_symlinks = follow_symlinks
+
+    def should_descend(self, name: str, depth: int, in_node_modules: bool = False) -> bool:
+        """Apply prune rules to a subdirectory found at the given depth, possibly below a node_modules"""
+        if self.max_depth is not None and depth >= self.max_depth:
+            return False
+        if self.skip_git and name == '.git':
+            return False
+        if name == 'node_modules' and in_node_modules and not self.include_node_modules:
+            return False
+        return True
+
+    def walk(self, root: str) -> Dict[str, List[str]]:
+        """Walk root once and return file paths grouped by kind, in deterministic name order"""
+        result = {'package_json': [], 'package_lock': [], 'yarn_lock': [], 'source': []}
+        visited = set()
+        stack = [(str(root), 0, False)]
+
+        while stack:
+            directory, depth, in_node_modules = stack.pop()
+            try:
+                if self.follow_symlinks:
+                    stat = os.stat(directory)
+                    if (stat.st_dev, stat.st_ino) in visited:
+                        continue
+                    visited.add((stat.st_dev, stat.st_ino))
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                continue
+
+            subdirectories = []
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=self.follow_symlinks):
+                        if self.should_descend(entry.name, depth, in_node_modules):
+                            below_node_modules = in_node_modules or entry.name == 'node_modules'
+                            subdirectories.append((entry.path, depth + 1, below_node_modules))
+                        continue
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+
+                name = entry.name
+                if name == 'package.json':
+                    result['package_json'].append(entry.path)
+                elif name == 'package-lock.json':
+                    result['package_lock'].append(entry.path)
+                elif name == 'yarn.lock':
+                    result['yarn_lock'].append(entry.path)
+                elif name.endswith(self.SOURCE_EXTENSIONS):
+                    result['source'].append(entry.path)
+
+            # Push in reverse so directories are visited in name order
+            stack.extend(reversed(subdirectories))
+
+        return result
+
+
+class NodeModulesResolver:
+    """Builds the installed dependency tree by reading node_modules/**/package.json directly
+
+    Produces the shape of `npm list --json --all` ({'dependencies': {name:
+    {'version', 'dependencies'}}}) without spawning npm or changing the
+    working directory, so it is safe to call from threads. Manifests are
+    read on a thread pool; each requirement is then resolved with Node's
+    rule (nearest node_modules walking up from the requiring package).
+    Every installed directory is expanded once; later references to it are
+    listed with their version only, like npm's "deduped" entries.
+    """
+
+    DEPENDENCY_FIELDS = ('dependencies', 'optionalDependencies', 'peerDependencies')
+    ROOT_DEPENDENCY_FIELDS = ('dependencies', 'devDependencies', 'optionalDependencies', 'peerDependencies')
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+
+    @staticmethod
+    def find_package_dirs(project_dir: str) -> List[str]:
+        """Every installed package directory under project_dir/node_modules, nested ones included"""
+        package_dirs = []
+        visited = set()
+        stack = [os.path.join(project_dir, 'node_modules')]
+
+        while stack:
+            modules_dir = stack.pop()
+            try:
+                with os.scandir(modules_dir) as it:
+                    entries = sorted(it, key=lambda entry: entry.name)
+            except OSError:
+                continue
+            # Most packages have no nested node_modules, so resolve links only once one exists
+            real_dir = os.path.realpath(modules_dir)
+            if real_dir in visited:
+                continue
+            visited.add(real_dir)
+
+            for entry in entries:
+                # .bin, .package-lock.json, .cache and friends are not packages
+                if entry.name.startswith('.') or not entry.is_dir():
+                    continue
+                if entry.name.startswith('@'):
+                    try:
+                        with os.scandir(entry.path) as scope_it:
+                            candidates = sorted(child.path for child in scope_it if child.is_dir())
+                    except OSError:
+                        continue
+                else:
+                    candidates = [entry.path]
+                for package_dir in candidates:
+                    package_dirs.append(package_dir)
+                    stack.append(os.path.join(package_dir, 'node_modules'))
+
+        return package_dirs
+
+    @staticmethod
+    def read_manifest(package_dir: str, fields: Tuple[str, ...] = DEPENDENCY_FIELDS) -> Optional[Dict]:
+        """Name, version and sorted dependency names from package_dir/package.json, or None"""
+        try:
+            with open(os.path.join(package_dir, 'package.json'), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict):
+            return None
+
+        requires = set()
+        for field in fields:
+            dependencies = data.get(field)
+            if isinstance(dependencies, dict):
+                requires.update(dependencies)
+        return {
+            'name': data.get('name') or '',
+            'version': data.get('version') or '',
+            'requires': sorted(requires),
+        }
+
+    @staticmethod
+    def _lookup(project_dir: str, from_dir: str, name: str, manifests: Dict[str, Dict]) -> Optional[str]:
+        """Resolve name the way Node does, from from_dir up to project_dir"""
+        name_parts = name.split('/')
+        directory = from_dir
+        while True:
+            if os.path.basename(directory) != 'node_modules':
+                candidate = os.path.join(directory, 'node_modules', *name_parts)
+                if candidate in manifests:
+                    return candidate
+            if len(directory) <= len(project_dir):
+                return None
+            directory = os.path.dirname(directory)
+
+    def resolve(self, project_dir: str) -> Dict:
+        """Installed dependency tree of project_dir, or {} if it has no readable package.json"""
+        project_dir = os.path.abspath(project_dir)
+        root_manifest = self.read_manifest(project_dir, self.ROOT_DEPENDENCY_FIELDS)
+        if root_manifest is None:
+            return {}
+
+        package_dirs = self.find_package_dirs(project_dir)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            manifests = {
+                package_dir: manifest
+                for package_dir, manifest in zip(package_dirs, executor.map(self.read_manifest, package_dirs))
+                if manifest is not None
+            }
+
+        tree = {'name': root_manifest['name'], 'version': root_manifest['version'], 'dependencies': {}}
+        expanded = set()
+        nodes = {project_dir: tree}  # Installed directory -> the node its dependencies hang off
+        stack = [(project_dir, root_manifest['requires'], tree['dependencies'])]
+        while stack:
+            from_dir, requires, target = stack.pop()
+            for name in requires:
+                package_dir = self._lookup(project_dir, from_dir, name, manifests)
+                if package_dir is None:
+                    continue  # Not installed (optional, peer or missing)
+                manifest = manifests[package_dir]
+                # Aliases (npm:real-name@x) are keyed by the real package name
+                node = {'version': manifest['version']}
+                target[manifest['name'] or name] = node
+                if package_dir not in expanded:
+                    expanded.add(package_dir)
+                    node['dependencies'] = {}
+                    nodes[package_dir] = node
+                    stack.append((package_dir, manifest['requires'], node['dependencies']))
+
+        # Installed but unreachable packages still sit on disk and can run; npm lists them as extraneous.
+        # Each hangs off the package it is nested in, so same-name copies at other paths are all kept;
+        # find_package_dirs lists parents first, so an orphaned parent already has its node.
+        for package_dir, manifest in manifests.items():
+            if package_dir in expanded or not manifest['name']:
+                continue
+            node = {'version': manifest['version'], 'extraneous': True}
+            parent_dir = package_dir
+            while parent_dir != project_dir:
+                parent_dir = self._parent_package_dir(parent_dir)
+                dependencies = nodes[parent_dir].setdefault('dependencies', {}) if parent_dir in nodes else None
+                if dependencies is not None and manifest['name'] not in dependencies:
+                    dependencies[manifest['name']] = node
+                    nodes[package_dir] = node
+                    break
+
+        return tree
+
+    @staticmethod
+    def _parent_package_dir(package_dir: str) -> str:
+        """Directory whose node_modules holds package_dir: a/node_modules/@s/b -> a"""
+        return package_dir[:package_dir.rindex(os.sep + 'node_modules' + os.sep)]
+
+
+# yarn.lock entry version line: `  version "1.2.3"` (v1) or `  version: 1.2.3` (Berry).
+# Anchored to two-space indent so nested `dependencies:` entries never match.
+YARN_VERSION_LINE = re.compile(r'^  version:?\s+"?([^"\s]+)"?\s*$')
+
+
+def parse_yarn_descriptor_name(descriptor: str) -> Optional[str]:
+    """Extract the package name from a yarn descriptor such as @scope/pkg@^1.0.0 or pkg@npm:^2"""
+    descriptor = descriptor.strip().strip('"')
+    at_index = descriptor.find('@', 1)
+    if at_index <= 0:
+        return None
+    return descriptor[:at_index]
+
+
+@contextlib.contextmanager
+def borrowed_stream(stream: TextIO):
+    """Yield stream without closing it on exit (contextlib.nullcontext needs Python 3.7)"""
+    yield stream
+
+
+def open_text(file_path: str, stream: Optional[TextIO] = None):
+    """Context manager over stream when given (e.g. a blob read from git), else over file_path opened as UTF-8"""
+    if stream is not None:
+        return borrowed_stream(stream)
+    return open(file_path, 'r', encoding='utf-8')
+
+
+def iter_yarn_lock_entries(file_path: str, stream: Optional[TextIO] = None):
+    """Stream (package_name, resolved_version) pairs from a yarn.lock (v1 or Berry)
+
+    Reads the file line by line; each entry header is a non-indented line
+    ending in ':' and the first two-space indented version line belongs to it.
+    """
+    current_name = None
+
+    with open_text(file_path, stream) as f:
+        for line in f:
+            if not line.strip() or line.startswith('#'):
+                continue
+
+            if not line[0].isspace():
+                header = line.rstrip()
+                if header.endswith(':'):
+                    first_descriptor = header[:-1].split(',')[0]
+                    current_name = parse_yarn_descriptor_name(first_descriptor)
+                else:
+                    current_name = None
+                continue
+
+            if current_name:
+                match = YARN_VERSION_LINE.match(line)
+                if match:
+                    yield current_name, match.group(1)
+                    current_name = None
+
+
+JSON_NUMBER_END = frozenset(' \t\r\n,]}')
+
+
+class StreamingJSONReader:
+    """Incremental reader for large JSON documents built from nested objects
+
+    Keeps only a sliding window of the file in memory. Callers walk objects
+    member by member with iter_object() and either descend further or
+    decode the member value with read_value(), which only materializes that
+    one value.
+    """
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Read the next chunk, dropping already-consumed input. Returns False at EOF."""
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next significant character ('' at EOF)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ''
+
+    def _expect(self, char: str):
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buf, self.pos)
+        self.pos += 1
+
+    def read_value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A number is only complete once a delimiter follows it: 1.|5 or -2.5e|10 decode
+                # as a shorter number when the chunk ends inside them
+                truncated = end == len(self.buf) or (
+                    isinstance(value, (int, float)) and self.buf[end] not in JSON_NUMBER_END)
+                if self.eof or not truncated:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+    def iter_object(self):
+        """Yield the keys of the object at the current position
+
+        After each key the caller must consume the member value, either
+        with read_value() or by iterating it with iter_object().
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                raise json.JSONDecodeError('Expecting property name', self.buf, self.pos)
+            key = self.read_value()
+            self._expect(':')
+            yield key
+            separator = self._peek()
+            self.pos += 1
+            if separator == '}':
+                return
+            if separator != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", self.buf, self.pos - 1)
+
+    def peek_type(self) -> str:
+        """Return the first character of the next value, e.g. '{' for an object"""
+        return self._peek()
+
+
+def package_name_from_lock_path(package_path: str) -> str:
+    """Package name for a lockfile v2/v3 `packages` key, e.g. node_modules/a/node_modules/@s/b -> @s/b"""
+    return package_path.rsplit('node_modules/', 1)[-1]
+
+
+def iter_package_lock_entries(file_path: str, stream: Optional[TextIO] = None):
+    """Stream entries from package-lock.json with bounded memory
+
+    Yields (section, key, package_info, depth) where section is 'packages'
+    (lockfile v2/v3, key is the node_modules path) or 'dependencies'
+    (lockfile v1, key is the package name). Nested v1 dependencies are
+    walked with an explicit stack in the same pre-order a recursive walk
+    would produce; each yielded package_info excludes its children.
+    """
+    with open_text(file_path, stream) as f:
+        reader = StreamingJSONReader(f)
+        for section in reader.iter_object():
+            if section not in ('packages', 'dependencies') or reader.peek_type() != '{':
+                reader.read_value()
+                continue
+
+            for key in reader.iter_object():
+                package_info = reader.read_value()
+                if not isinstance(package_info, dict):
+                    continue
+
+                if section == 'packages':
+                    yield section, key, package_info, key.count('/') - 1
+                    continue
+
+                stack = [(key, package_info, 0)]
+                while stack:
+                    name, info, depth = stack.pop()
+                    children = info.pop('dependencies', None)
+                    yield section, name, info, depth
+                    if isinstance(children, dict):
+                        stack.extend(
+                            (child_name, child_info, depth + 1)
+                            for child_name, child_info in reversed(list(children.items()))
+                            if isinstance(child_info, dict)
+                        )
+
+
+def lock_entry_key(section: str, key: str, package_info: Dict, depth: int) -> Tuple:
+    """Identity of a package-lock.json entry: where it sits, its version and its tarball hash"""
+    return section, key, depth, package_info.get('version', ''), package_info.get('integrity', '')
+
+
+def lock_entry_keys(file_path: str, stream: Optional[TextIO] = None) -> frozenset:
+    """Every entry of a package-lock.json (lock_entry_key) or yarn.lock ((name, version)), to tell unchanged ones apart"""
+    if file_path.endswith('yarn.lock'):
+        return frozenset(iter_yarn_lock_entries(file_path, stream))
+    return frozenset(lock_entry_key(*entry) for entry in iter_package_lock_entries(file_path, stream))
+
+
+VERSION_PREFIX = re.compile(r'^[^\d]*')
+VERSION_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def _normalize_version_cached(version: str) -> str:
+    # Remove common npm version prefixes
+    cleaned = VERSION_PREFIX.sub('', version)
+    # Handle version ranges like "1.0.0 - 2.0.0"
+    if ' - ' in cleaned:
+        cleaned = cleaned.split(' - ')[0]
+    # Handle || operators
+    if ' || ' in cleaned:
+        cleaned = cleaned.split(' || ')[0]
+    return cleaned.strip()
+
+
+def normalize_version(version: str) -> str:
+    """Normalize version string by removing prefixes like ^, ~, >=, etc."""
+    if not version:
+        return ""
+    return _normalize_version_cached(str(version))
+
+
+class GitRepoResolver:
+    """Finds the git repository owning a path and reads its remotes, without running git
+
+    Walks up from a path to the nearest `.git`, which is either a directory
+    or, for worktrees and submodules, a file containing `gitdir: <path>`.
+    Linked worktrees keep their config in the directory named by the git
+    dir's `commondir` file; submodules have their own config under
+    `.git/modules/`. Every directory on the walk is cached, so files
+    from the same repository resolve with dictionary lookups.
+    """
+
+    REMOTE_SECTION_PATTERN = re.compile(r'^\s*\[\s*remote\s+"([^"]*)"\s*\]')
+    URL_PATTERN = re.compile(r'^\s*url\s*=\s*(.*?)\s*$', re.IGNORECASE)
+
+    def __init__(self):
+        self._roots = {}  # directory -> (work tree root, git dir) or None
+        self._remotes = {}  # config path -> {remote name: url}
+
+    @staticmethod
+    def read_git_dir(dot_git: str) -> Optional[str]:
+        """The git directory a `.git` entry points to"""
+        if os.path.isdir(dot_git):
+            return dot_git
+        try:
+            with open(dot_git, 'r', encoding='utf-8') as f:
+                first_line = f.readline().strip()
+        except OSError:
+            return None
+        if not first_line.startswith('gitdir:'):
+            return None
+        git_dir = first_line[len('gitdir:'):].strip()
+        return os.path.normpath(os.path.join(os.path.dirname(dot_git), git_dir))
+
+    def find_root(self, path: str) -> Optional[Tuple[str, str]]:
+        """(work tree root, git dir) of the repository containing path, or None"""
+        directory = os.path.abspath(path)
+        if not os.path.isdir(directory):
+            directory = os.path.dirname(directory)
+            
+        visited = []
+        found = None
+        while True:
+            if directory in self._roots:
+                found = self._roots[directory]
+                break
+            visited.append(directory)
+            dot_git = os.path.join(directory, '.git')
+            if os.path.exists(dot_git):
+                git_dir = self.read_git_dir(dot_git)
+                if git_dir:
+                    found = (directory, git_dir)
+                    break
+            parent = os.path.dirname(directory)
+            if parent == directory:
+                break
+            directory = parent
+            
+        for directory in visited:
+            self._roots[directory] = found
+        return found
+
+    @staticmethod
+    def config_path(git_dir: str) -> str:
+        """Path of the config file that applies to git_dir (shared config for linked worktrees)"""
+        try:
+            with open(os.path.join(git_dir, 'commondir'), 'r', encoding='utf-8') as f:
+                common_dir = f.read().strip()
+            git_dir = os.path.normpath(os.path.join(git_dir, common_dir))
+        except OSError:
+            pass
+        return os.path.join(git_dir, 'config')
+
+    def remotes(self, config_path: str) -> Dict[str, str]:
+        """{remote name: url} parsed from a git config file"""
+        if config_path in self._remotes:
+            return self._remotes[config_path]
+        remotes = {}
+        current_remote = None
+        try:
+            with open(config_path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    stripped = line.strip()
+                    if not stripped or stripped[0] in '#;':
+                        continue
+                    if stripped.startswith('['):
+                        section = self.REMOTE_SECTION_PATTERN.match(stripped)
+                        current_remote = section.group(1) if section else None
+                        continue
+                    if current_remote is not None and current_remote not in remotes:
+                        url = self.URL_PATTERN.match(stripped)
+                        if url:
+                            remotes[current_remote] = url.group(1).strip('"')
+        except OSError:
+            pass
+        self._remotes[config_path] = remotes
+        return remotes
+
+    def remote_url(self, path: str, remote: str = 'origin') -> Optional[str]:
+        """URL of a remote of the repository containing path, or None"""
+        root = self.find_root(path)
+        if root is None:
+            return None
+        return self.remotes(self.config_path(root[1])).get(remote)
+
+    @staticmethod
+    def https_url(remote_url: str) -> str:
+        """GitHub SSH remotes rewritten as https URLs without the .git suffix"""
+        if remote_url.startswith('git@github.com:'):
+            remote_url = remote_url.replace('git@github.com:', 'https://github.com/')
+            if remote_url.endswith('.git'):
+                remote_url = remote_url[:-4]
+        return remote_url
+
+
+class GitChangeSet:
+    """npm manifests and lock files changed since a base ref, with what each lock file held at the base
+
+    The base is the merge base of the ref and HEAD, as in a pull request
+    diff, so commits that landed on the target branch meanwhile do not
+    count. The diff runs against the working tree: that is HEAD in CI and
+    also picks up uncommitted edits locally. A lock file's baseline is the
+    set of entry keys it had at the base (empty when the file is new), so
+    a scan only needs to match entries that were added or changed.
+    """
+
+    FILE_NAMES = ('package.json', 'package-lock.json', 'yarn.lock')
+
+    def __init__(self, directory: str, since_ref: str, timeout: int = 120):
+        self.directory = directory
+        self.since_ref = since_ref
+        self.timeout = timeout
+        self.base = None
+        self.changed_files = []  # Paths under directory, as a walk of it would produce them
+        self.baselines = {}  # Lock file path -> frozenset of lock_entry_keys at the base
+
+    def git(self, *args: str) -> subprocess.CompletedProcess:
+        return subprocess.run(['git', '-C', self.directory, *args], capture_output=True, text=True, timeout=self.timeout)
+
+    def load(self, include_node_modules: bool = False) -> Optional[str]:
+        """Find the changed files and read their baselines; returns an error message, or None on success"""
+        result = self.git('merge-base', self.since_ref, 'HEAD')
+        if result.returncode != 0:
+            # A shallow clone may not reach the merge base; the ref itself is the next best base
+            result = self.git('rev-parse', '--verify', '--quiet', f'{self.since_ref}^{{commit}}')
+            if result.returncode != 0:
+                return result.stderr.strip() or f'unknown revision {self.since_ref}'
+        self.base = result.stdout.strip()
+
+        result = self.git('diff', '--name-only', '-z', '--no-renames', '--diff-filter=d', '--relative', self.base)
+        if result.returncode != 0:
+            return result.stderr.strip() or 'git diff failed'
+        prefix = self.git('rev-parse', '--show-prefix').stdout.strip()
+
+        lock_files = []
+        for path in result.stdout.split('\0'):
+            parts = path.split('/')
+            if not path or parts[-1] not in self.FILE_NAMES:
+                continue
+            if not include_node_modules and in_nested_node_modules(parts):
+                continue
+            file_path = os.path.join(self.directory, *parts)
+            self.changed_files.append(file_path)
+            if parts[-1] != 'package.json':
+                lock_files.append((file_path, prefix + path))
+
+        for file_path, repo_path in lock_files:
+            data = self.read_blob(f"{self.base}:{repo_path}")
+            try:
+                self.baselines[file_path] = frozenset() if data is None else lock_entry_keys(
+                    file_path, io.StringIO(data.decode('utf-8', errors='replace')))
+            except json.JSONDecodeError:
+                self.baselines[file_path] = frozenset()  # Unreadable at the base: every entry counts as new
+        return None
+
+    def read_blob(self, spec: str) -> Optional[bytes]:
+        """Contents of <rev>:<path>, or None if the file did not exist there"""
+        result = subprocess.run(['git', '-C', self.directory, 'cat-file', 'blob', spec],
+                                capture_output=True, timeout=self.timeout)
+        return result.stdout if result.returncode == 0 else None
+
+
+def format_incremental_stats(stats: Dict[str, Any], skipped_entries: int) -> str:
+    """One report line summarising a --since scan"""
+    return (f"Incremental scan: {stats['files']} changed files since {stats['ref']} (base {stats['base'][:12]}), "
+            f"{skipped_entries} unchanged lock file entries skipped")
+
+
+class CompromiseIndex:
+    """Immutable lookup index compiled from the compromise database
+
+    Package names are held in a frozenset so the overwhelmingly common
+    clean case is rejected with one hash lookup, before any version
+    parsing. Monitored names map to frozensets of compromised versions,
+    and scoped names are also bucketed by scope (@ctrl, @crowdstrike, ...).
+    """
+
+    __slots__ = ('monitored_names', 'compromised_versions', 'version_lists',
+                 'potentially_compromised', 'scopes', 'version')
+
+    def __init__(self, compromised_packages: Dict, potentially_compromised: Set[str]):
+        version_lists = {
+            name: tuple(pkg_data.get('compromised_versions', []))
+            for name, pkg_data in compromised_packages.items()
+        }
+        self.version_lists = version_lists
+        self.compromised_versions = {name: frozenset(versions) for name, versions in version_lists.items()}
+        self.potentially_compromised = frozenset(potentially_compromised)
+        self.monitored_names = frozenset(version_lists) | self.potentially_compromised
+
+        scopes = {}
+        for name in self.monitored_names:
+            if name.startswith('@') and '/' in name:
+                scopes.setdefault(name.split('/', 1)[0], set()).add(name)
+        self.scopes = {scope: frozenset(names) for scope, names in scopes.items()}
+
+        # Content hash of what matching depends on, so cached scan results can be keyed by it
+        canonical = json.dumps([version_lists, sorted(self.potentially_compromised)], sort_keys=True)
+        self.version = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:16]
+
+    def __contains__(self, package_name: str) -> bool:
+        return package_name in self.monitored_names
+
+    def names_in_scope(self, scope: str) -> frozenset:
+        """Monitored package names under a scope such as '@ctrl'"""
+        return self.scopes.get(scope.rstrip('/'), frozenset())
+
+    def check(self, package_name: str, version: str) -> Tuple[bool, str, List[str]]:
+        """Same contract as check_package_compromise: (is_compromised, severity, compromised_versions)"""
+        if package_name not in self.monitored_names:
+            return False, '', []
+
+        versions = self.compromised_versions.get(package_name)
+        if versions is not None:
+            if normalize_version(version) in versions:
+                return True, 'CRITICAL', list(self.version_lists[package_name])
+            # Package is in our list but version is different - could be safe
+            return False, 'INFO', list(self.version_lists[package_name])
+
+        # Potentially compromised packages (no specific version)
+        return True, 'HIGH', []
+
+
+SEMVER_FULL = re.compile(r'^v?(\d+)\.(\d+)\.(\d+)(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$')
+SEMVER_PARTIAL = re.compile(
+    r'^v?(\d+|[xX*])(?:\.(\d+|[xX*])(?:\.(\d+|[xX*])(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?)?)?$'
+)
+SEMVER_OPERATOR_SPACE = re.compile(r'(<=|>=|~>|<|>|=|~|\^)\s+')
+SEMVER_HYPHEN = re.compile(r'\s+-\s+')
+SEMVER_COMPARATOR = re.compile(r'^(<=|>=|~>|<|>|=|~|\^)?(.*)$')
+
+RELEASE = (1,)
+LOWEST_PRERELEASE = (0, (0, 0))
+
+
+def encode_prerelease(prerelease: Optional[str]) -> Tuple:
+    """Order key for a prerelease tag: releases sort after any prerelease of the same version"""
+    if not prerelease:
+        return RELEASE
+    return (0,) + tuple((0, int(part)) if part.isdigit() else (1, part) for part in prerelease.split('.'))
+
+
+@lru_cache(maxsize=VERSION_CACHE_SIZE)
+def encode_version(version: str) -> Optional[Tuple]:
+    """Encode an exact semver string as a comparable tuple, or None if it is not exact semver"""
+    match = SEMVER_FULL.match(version.strip())
+    if not match:
+        return None
+    major, minor, patch, prerelease = match.groups()
+    return (int(major), int(minor), int(patch), encode_prerelease(prerelease))
+
+
+def version_cache_stats(range_engine: Optional['SemverRangeEngine'] = None) -> Dict[str, Dict[str, int]]:
+    """Hit/miss statistics for the shared version parsing caches"""
+    caches = {
+        'normalize_version': _normalize_version_cached.cache_info(),
+        'encode_version': encode_version.cache_info(),
+    }
+    if range_engine is not None:
+        caches['parse_range'] = range_engine.cache_info()
+    return {
+        name: {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'maxsize': info.maxsize}
+        for name, info in caches.items()
+    }
+
+
+def format_version_cache_stats(stats: Dict[str, Dict[str, int]]) -> str:
+    """One-line summary of version_cache_stats() for reports"""
+    parts = []
+    for name, info in stats.items():
+        lookups = info['hits'] + info['misses']
+        hit_rate = info['hits'] / lookups * 100 if lookups else 0.0
+        parts.append(f"{name} {info['hits']}/{lookups} hits ({hit_rate:.1f}%, {info['size']} cached)")
+    return ', '.join(parts)
+
+
+class SemverRangeEngine:
+    """Evaluates npm version ranges against the compromised versions of each package
+
+    Every distinct range string is parsed once into a list of intervals
+    and cached. Compromised versions are pre-encoded into sorted tuple
+    arrays, so checking a range is a couple of bisections per interval
+    instead of comparing each version one by one.
+    """
+
+    def __init__(self, compromise_index: CompromiseIndex):
+        # Bounded per-engine cache; a fleet can declare far more distinct ranges than fit in memory
+        self.parse_range = lru_cache(maxsize=VERSION_CACHE_SIZE)(self._parse_range)
+        self._encoded = {}
+        for package_name, versions in compromise_index.version_lists.items():
+            pairs = sorted((encoded, version) for version in versions
+                           for encoded in [encode_version(version)] if encoded)
+            self._encoded[package_name] = ([p[0] for p in pairs], [p[1] for p in pairs])
+
+    @staticmethod
+    def _parse_partial(text: str) -> Optional[Tuple]:
+        """Parse a possibly partial version into (major, minor, patch, prerelease); None marks a wildcard"""
+        match = SEMVER_PARTIAL.match(text)
+        if not match:
+            return None
+        parts = [None if part is None or part in 'xX*' else int(part) for part in match.groups()[:3]]
+        # Anything after a wildcard is a wildcard too (1.x.3 == 1.x.x)
+        for i in range(1, 3):
+            if parts[i - 1] is None:
+                parts[i] = None
+        return parts[0], parts[1], parts[2], match.group(4)
+
+    @staticmethod
+    def _bump(major: int, minor: Optional[int], patch: Optional[int]) -> Tuple:
+        """Exclusive upper bound just past the most specific given component"""
+        if minor is None:
+            return (major + 1, 0, 0, LOWEST_PRERELEASE)
+        if patch is None:
+            return (major, minor + 1, 0, LOWEST_PRERELEASE)
+        return (major, minor, patch + 1, LOWEST_PRERELEASE)
+
+    def _comparator_bounds(self, token: str) -> Optional[List[Tuple]]:
+        """Translate one comparator into [(bound_kind, encoded, inclusive)] constraints"""
+        operator, text = SEMVER_COMPARATOR.match(token).groups()
+        if text in ('', '*', 'x', 'X') and operator in (None, '=', '>='):
+            return []
+        parsed = self._parse_partial(text)
+        if parsed is None:
+            return None
+        major, minor, patch, prerelease = parsed
+        if major is None:
+            return [] if operator in (None, '=', '>=', '<=', '^', '~', '~>') else [('hi', (0, 0, 0, LOWEST_PRERELEASE), False)]
+
+        floor = (major, minor or 0, patch or 0, encode_prerelease(prerelease) if patch is not None else RELEASE)
+        is_exact = minor is not None and patch is not None
+
+        if operator in (None, '='):
+            if is_exact:
+                return [('lo', floor, True), ('hi', floor, True)]
+            return [('lo', (major, minor or 0, 0, LOWEST_PRERELEASE), True), ('hi', self._bump(major, minor, patch), False)]
+        if operator in ('~', '~>'):
+            upper = self._bump(major, minor, None) if minor is not None else self._bump(major, None, None)
+            return [('lo', floor, True), ('hi', upper, False)]
+        if operator == '^':
+            if major > 0 or minor is None:
+                upper = self._bump(major, None, None)
+            elif minor > 0 or patch is None:
+                upper = self._bump(major, minor, None)
+            else:
+                upper = self._bump(major, minor, patch)
+            return [('lo', floor, True), ('hi', upper, False)]
+        if operator == '>=':
+            return [('lo', floor, True)]
+        if operator == '>':
+            if is_exact:
+                return [('lo', floor, False)]
+            return [('lo', self._bump(major, minor, patch), True)]
+        if operator == '<':
+            if is_exact:
+                return [('hi', floor, False)]
+            return [('hi', (major, minor or 0, 0, LOWEST_PRERELEASE), False)]
+        if operator == '<=':
+            if is_exact:
+                return [('hi', floor, True)]
+            return [('hi', self._bump(major, minor, patch), False)]
+        return None
+
+    def _parse_range(self, range_spec: str) -> Optional[List[Tuple]]:
+        """Parse an npm range into intervals (lo, lo_inclusive, hi, hi_inclusive, prerelease_tuples)
+
+        Returns None for specs that are not semver ranges (tags, git/file/npm: specs, URLs).
+        Called through the cached parse_range attribute set up in __init__.
+        """
+        spec = range_spec.strip()
+        if ':' in spec or '/' in spec:
+            return None
+        intervals = []
+        for comparator_set in spec.split('||'):
+            interval = self._parse_comparator_set(comparator_set.strip())
+            if interval is None:
+                return None
+            intervals.append(interval)
+        return intervals
+
+    def _parse_comparator_set(self, comparator_set: str) -> Optional[Tuple]:
+        hyphen = SEMVER_HYPHEN.split(comparator_set)
+        if len(hyphen) == 2:
+            tokens = ['>=' + hyphen[0].strip(), '<=' + hyphen[1].strip()]
+        elif len(hyphen) == 1:
+            tokens = SEMVER_OPERATOR_SPACE.sub(r'\1', comparator_set).split() or ['*']
+        else:
+            return None
+
+        lo, lo_inclusive, hi, hi_inclusive = None, True, None, True
+        prerelease_tuples = set()
+        for token in tokens:
+            bounds = self._comparator_bounds(token)
+            if bounds is None:
+                return None
+            version_text = SEMVER_COMPARATOR.match(token).group(2)
+            exact = SEMVER_FULL.match(version_text)
+            if exact and exact.group(4):
+                prerelease_tuples.add(tuple(int(part) for part in exact.groups()[:3]))
+            for kind, encoded, inclusive in bounds:
+                if kind == 'lo' and (lo is None or encoded > lo or (encoded == lo and not inclusive)):
+                    lo, lo_inclusive = encoded, inclusive
+                elif kind == 'hi' and (hi is None or encoded < hi or (encoded == hi and not inclusive)):
+                    hi, hi_inclusive = encoded, inclusive
+        return lo, lo_inclusive, hi, hi_inclusive, frozenset(prerelease_tuples)
+
+    def cache_info(self):
+        """Hit/miss statistics of the range parse cache"""
+        return self.parse_range.cache_info()
+
+    def admitted_versions(self, package_name: str, range_spec: str) -> List[str]:
+        """Compromised versions of package_name that range_spec could resolve to"""
+        encoded, versions = self._encoded.get(package_name, ([], []))
+        if not encoded:
+            return []
+        intervals = self.parse_range(str(range_spec))
+        if not intervals:
+            return []
+
+        admitted = set()
+        for lo, lo_inclusive, hi, hi_inclusive, prerelease_tuples in intervals:
+            start = 0 if lo is None else (bisect_left if lo_inclusive else bisect_right)(encoded, lo)
+            end = len(encoded) if hi is None else (bisect_right if hi_inclusive else bisect_left)(encoded, hi)
+            for i in range(start, end):
+                # npm only matches prereleases when the range names the same major.minor.patch
+                if encoded[i][3] != RELEASE and encoded[i][:3] not in prerelease_tuples:
+                    continue
+                admitted.add(i)
+        return [versions[i] for i in sorted(admitted)]
+
+
+CONTEXT_MAX_LINE_WIDTH = 240
+
+
+def context_around(buffer, offset: int, context_lines: int = 2, max_line_width: int = CONTEXT_MAX_LINE_WIDTH,
+                   truncated_start: bool = False, truncated_end: bool = False):
+    """Lines around offset in a str or bytes buffer, found from the neighbouring newlines
+
+    Lines wider than max_line_width are cut to that width (centred on the hit
+    for the matching line) and marked with '...'. truncated_start/_end say
+    the buffer is a window of a larger file, so its first/last line is partial.
+    """
+    newline, ellipsis = ('\n', '...') if isinstance(buffer, str) else (b'\n', b'...')
+    offset = min(max(offset, 0), len(buffer))
+
+    line_start = buffer.rfind(newline, 0, offset) + 1
+    line_end = buffer.find(newline, offset)
+    line_end = len(buffer) if line_end < 0 else line_end
+    spans = [(line_start, line_end)]
+    for _ in range(context_lines):
+        if spans[0][0] == 0:
+            break
+        end = spans[0][0] - 1
+        spans.insert(0, (buffer.rfind(newline, 0, end) + 1, end))
+    for _ in range(context_lines):
+        if spans[-1][1] >= len(buffer):
+            break
+        start = spans[-1][1] + 1
+        end = buffer.find(newline, start)
+        spans.append((start, len(buffer) if end < 0 else end))
+
+    lines = []
+    for start, end in spans:
+        cut_left = truncated_start and start == 0
+        cut_right = truncated_end and end == len(buffer)
+        if end - start > max_line_width:
+            # Keep the hit in view on the matching line; other lines keep their beginning
+            clipped_start = start
+            if start <= offset <= end:
+                clipped_start = max(start, min(offset - max_line_width // 2, end - max_line_width))
+            clipped_end = clipped_start + max_line_width
+            cut_left = cut_left or clipped_start > start
+            cut_right = cut_right or clipped_end < end
+            start, end = clipped_start, clipped_end
+        empty = buffer[:0]
+        lines.append((ellipsis if cut_left else empty) + buffer[start:end] + (ellipsis if cut_right else empty))
+    return newline.join(lines)
+
+
+def extract_context_at(file_path: str, offset: int, context_lines: int = 2,
+                       max_line_width: int = CONTEXT_MAX_LINE_WIDTH) -> str:
+    """Context around a byte offset in a file, reading only a bounded window around it"""
+    window = (context_lines + 1) * max_line_width
+    start = max(0, offset - window)
+    try:
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            buffer = f.read(offset - start + window)
+    except OSError:
+        return ''
+    context = context_around(buffer, offset - start, context_lines, max_line_width,
+                             truncated_start=start > 0, truncated_end=len(buffer) == offset - start + window)
+    return context.decode('utf-8', errors='ignore')
+
+
+class IndicatorMatcher:
+    """Compiled matcher for every source-code indicator in the compromise database
+
+    Built once from malicious_indicators, crypto_indicators, browser_apis and
+    suspicious_patterns, and run directly on bytes. Literals are encoded and
+    found with bytes.find, crypto keywords are matched case-insensitively
+    against one lowered copy of the buffer, and patterns are precompiled
+    bytes regexes. Every hit is counted; the first few keep their byte offsets.
+    """
+
+    CATEGORIES = ('malicious_url', 'crypto_indicators', 'browser_apis', 'suspicious_patterns')
+    MAX_OFFSETS = 5  # Offsets kept per indicator; the rest are only counted
+
+    def __init__(self, malicious_indicators: Dict[str, List[str]], crypto_indicators: List[str],
+                 browser_apis: List[str], suspicious_patterns: List[str]):
+        domains = list(malicious_indicators.get('domains', []))
+        # Emails and URLs that embed a known domain would only repeat the domain hit
+        extra_terms = [
+            term for key in ('emails', 'urls') for term in malicious_indicators.get(key, [])
+            if not any(domain in term for domain in domains)
+        ]
+        self.malicious_terms = [(term, term.encode('utf-8')) for term in dict.fromkeys(domains + extra_terms)]
+        self.crypto_terms = [(term, term.lower().encode('utf-8')) for term in crypto_indicators]
+        self.browser_terms = [(term, term.encode('utf-8')) for term in browser_apis]
+        self.patterns = []
+        for pattern in suspicious_patterns:
+            try:
+                self.patterns.append((pattern, re.compile(pattern.encode('utf-8'))))
+            except re.error as e:
+                print(f"⚠️  Ignoring invalid suspicious pattern {pattern!r}: {str(e)}")
+        self.longest_literal = max(
+            [len(encoded) for _, encoded in self.malicious_terms + self.crypto_terms + self.browser_terms] or [0]
+        )
+
+    def all_hits(self, buffer, base_offset: int = 0, hits: Optional[Dict[str, Dict[str, Dict]]] = None,
+                 start: int = 0, end: Optional[int] = None) -> Dict[str, Dict[str, Dict]]:
+        """Hit count and first MAX_OFFSETS byte offsets of every indicator in buffer, grouped by category
+
+        Each indicator found maps to {'count', 'offsets', 'last'}; only the
+        count grows with the file, so memory stays flat however many hits a
+        minified bundle has. Pass the hits of earlier chunks back in to extend
+        them; base_offset is added to offsets found in this buffer. Chunks may
+        overlap, so a hit is only counted past the last one seen for its
+        indicator. start/end limit the search to buffer[start:end] without
+        copying it (bytes and mmap both take ranged find() and regex
+        pos/endpos), so a mapped file can be scanned in windows. Only the crypto
+        keywords need a lowered copy, of that window.
+        """
+        if hits is None:
+            hits = {category: {} for category in self.CATEGORIES}
+        if end is None:
+            end = len(buffer)
+
+        for category, terms in (('malicious_url', self.malicious_terms), ('browser_apis', self.browser_terms)):
+            found = hits[category]
+            for term, encoded in terms:
+                offset = buffer.find(encoded, start, end)
+                while offset >= 0:
+                    self._add_hit(found, term, base_offset + offset)
+                    offset = buffer.find(encoded, offset + 1, end)
+
+        found = hits['crypto_indicators']
+        if self.crypto_terms:
+            lowered = buffer[start:end].lower()
+            for term, encoded in self.crypto_terms:
+                offset = lowered.find(encoded)
+                while offset >= 0:
+                    self._add_hit(found, term, base_offset + start + offset)
+                    offset = lowered.find(encoded, offset + 1)
+
+        found = hits['suspicious_patterns']
+        for pattern, compiled in self.patterns:
+            for match in compiled.finditer(buffer, start, end):
+                self._add_hit(found, pattern, base_offset + match.start())
+        return hits
+
+    @classmethod
+    def _add_hit(cls, found: Dict[str, Dict], term: str, offset: int) -> None:
+        """Count a hit of term unless an overlapping chunk already counted it"""
+        hit = found.get(term)
+        if hit is None:
+            found[term] = {'count': 1, 'offsets': [offset], 'last': offset}
+        elif offset > hit['last']:
+            hit['count'] += 1
+            hit['last'] = offset
+            if len(hit['offsets']) < cls.MAX_OFFSETS:
+                hit['offsets'].append(offset)
+
+
+class PayloadHashIndex:
+    """SHA-256 index of known malicious payload files, such as the Shai-Hulud bundle.js
+
+    Entries come from malicious_indicators.payload_hashes. Only candidate files
+    are hashed, and the size prefilter rejects most of them with one stat: an
+    entry with an exact `size` or a `size_range` [min, max] (for payloads only
+    known by their approximate published size) matches files of that size
+    whatever their name. Entries without any size fall back to their own file
+    name and the names the payload is dropped under (drop_names, from
+    malicious_indicators.file_patterns), so renamed copies are still caught.
+    Digests are cached per (st_dev, st_ino), so hard-linked copies in a pnpm
+    store are hashed once.
+    """
+
+    HASH_BLOCK_SIZE = 1024 * 1024
+
+    def __init__(self, payload_hashes: List[Dict], drop_names: Iterable[str] = ()):
+        self.by_digest = {}
+        self.sizes = set()
+        self.size_ranges = []
+        self.names = set()  # Payload file names, also looked for in install scripts
+        self.drop_paths = list(drop_names)  # Package-relative paths, also checked in installed packages
+        self.candidate_names = set()  # Names hashed whatever their size, for entries listed without one
+        self.hash_all = False
+        for entry in payload_hashes:
+            digest = str(entry.get('sha256', '')).lower()
+            if len(digest) != 64:
+                continue
+            self.by_digest[digest] = entry
+            if entry.get('file'):
+                self.names.add(os.path.basename(entry['file']))
+            size_range = entry.get('size_range')
+            if entry.get('size'):
+                self.sizes.add(int(entry['size']))
+            elif isinstance(size_range, list) and len(size_range) == 2:
+                self.size_ranges.append((int(size_range[0]), int(size_range[1])))
+            elif entry.get('file'):
+                self.candidate_names.add(os.path.basename(entry['file']))
+                self.candidate_names.update(os.path.basename(path) for path in self.drop_paths)
+            else:
+                self.hash_all = True  # No prefilter possible for this entry
+        self._digests = {}
+
+    def __len__(self) -> int:
+        return len(self.by_digest)
+
+    @staticmethod
+    def describe(entry: Dict) -> str:
+        """Finding message for a matched payload entry"""
+        return f'Known malicious payload detected: {entry.get("description") or entry.get("file", "payload")}'
+
+    def is_candidate(self, file_path: str, size: int) -> bool:
+        """Size/name prefilter deciding whether a file is worth hashing"""
+        if self.hash_all or size in self.sizes:
+            return True
+        if any(low <= size <= high for low, high in self.size_ranges):
+            return True
+        return os.path.basename(file_path) in self.candidate_names
+
+    def sha256(self, file_path: str, stat: os.stat_result) -> str:
+        """Streaming SHA-256 of a file, reused for every hard link to the same inode"""
+        inode_key = (stat.st_dev, stat.st_ino) if stat.st_ino else None
+        if inode_key in self._digests:
+            return self._digests[inode_key]
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(self.HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        hex_digest = digest.hexdigest()
+        if inode_key is not None:
+            self._digests[inode_key] = hex_digest
+        return hex_digest
+
+    def match(self, file_path: str, stat: os.stat_result) -> Optional[Tuple[str, Dict]]:
+        """(sha256, entry) if the file is a known payload, else None"""
+        if not self.by_digest or not self.is_candidate(file_path, stat.st_size):
+            return None
+        digest = self.sha256(file_path, stat)
+        entry = self.by_digest.get(digest)
+        return (digest, entry) if entry else None
+
+    def scan_package_dir(self, package_dir: str, skip: Set[str] = frozenset()) -> List[Tuple[str, str, Dict, int]]:
+        """(file path, sha256, entry, size) of known payloads at the root or a drop path of an installed package
+
+        Payloads are dropped next to package.json or at one of drop_paths, so
+        only those files are looked at; paths in skip (already hashed by the
+        source scan) are left out.
+        """
+        try:
+            with os.scandir(package_dir) as it:
+                file_paths = [entry.path for entry in it if entry.is_file(follow_symlinks=False)]
+        except OSError:
+            return []
+        file_paths += [os.path.join(package_dir, *path.split('/')) for path in self.drop_paths if '/' in path]
+
+        matches = []
+        for file_path in file_paths:
+            if file_path in skip:
+                continue
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            payload = self.match(file_path, stat)
+            if payload:
+                matches.append((file_path, payload[0], payload[1], stat.st_size))
+        return matches
+
+
+class SourceScanner:
+    """Scans JavaScript/TypeScript sources with an IndicatorMatcher
+
+    Stateless after construction, so one instance is shared by a thread pool:
+    scan() returns finding entries instead of logging them. Small files are
+    read as bytes; files of at least mmap_threshold bytes are memory-mapped
+    and matched in place, one window at a time, with each window's pages
+    released once it is done so resident memory stays flat for any bundle
+    size. Windows and chunks overlap by `overlap` bytes, so indicators
+    spanning a boundary are still seen. Files above the size limit are
+    skipped and counted rather than read.
+    """
+
+    DEFAULT_MAX_FILE_SIZE = 64 * 1024 * 1024
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, matcher: IndicatorMatcher, chunk_size: int = CHUNK_SIZE, overlap: int = 4096,
+                 mmap_threshold: int = CHUNK_SIZE, payload_index: Optional[PayloadHashIndex] = None):
+        self.matcher = matcher
+        self.payload_index = payload_index
+        self.chunk_size = chunk_size
+        self.overlap = max(overlap, matcher.longest_literal)
+        self.mmap_threshold = mmap_threshold
+
+    def iter_chunks(self, f):
+        """Yield (offset, chunk) pairs of overlapping byte chunks from a binary file"""
+        offset = 0
+        tail = b''
+        while True:
+            block = f.read(self.chunk_size)
+            if not block:
+                break
+            chunk = tail + block
+            yield offset - len(tail), chunk
+            offset += len(block)
+            tail = chunk[-self.overlap:]
+
+    def scan_mapped(self, f, size: int) -> Optional[Dict[str, Dict[str, int]]]:
+        """Match a memory-mapped file window by window; None if the file cannot be mapped"""
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        hits = None
+        # madvise needs page-aligned ranges and Python 3.8+
+        can_release = (hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_DONTNEED')
+                       and self.chunk_size % mmap.PAGESIZE == 0)
+        with mapped:
+            for start in range(0, size, self.chunk_size):
+                end = min(size, start + self.chunk_size + self.overlap)
+                hits = self.matcher.all_hits(mapped, 0, hits, start, end)
+                # Drop pages that are fully matched so RSS does not grow with the file
+                if can_release:
+                    mapped.madvise(mmap.MADV_DONTNEED, start, min(self.chunk_size, size - start))
+        return hits
+
+    def scan(self, file_path: str, max_file_size: Optional[int] = DEFAULT_MAX_FILE_SIZE) -> Tuple[str, List[Dict]]:
+        """Scan one file; returns (status, entries) with status 'scanned', 'too_large' or 'unreadable'"""
+        hits = None
+        payload_entries = []
+
+        try:
+            stat = os.stat(file_path)
+            size = stat.st_size
+            # Exact payload match first; it applies even to files too large to match
+            payload = self.payload_index.match(file_path, stat) if self.payload_index else None
+            if payload:
+                digest, entry = payload
+                payload_entries.append({
+                    'type': 'known_payload',
+                    'severity': 'CRITICAL',
+                    'message': PayloadHashIndex.describe(entry),
+                    'details': {'sha256': digest, 'size': size}
+                })
+            if max_file_size and size > max_file_size:
+                return 'too_large', payload_entries
+            with open(file_path, 'rb') as f:
+                if size >= self.mmap_threshold:
+                    hits = self.scan_mapped(f, size)
+                if hits is None:
+                    for offset, chunk in self.iter_chunks(f):
+                        hits = self.matcher.all_hits(chunk, offset, hits)
+        except OSError as e:
+            return 'unreadable', [{
+                'severity': 'ERROR',
+                'message': f'Failed to scan source file {file_path}: {str(e)}',
+                'details': {}
+            }]
+        if hits is None:
+            return 'scanned', payload_entries
+
+        # Report matches in configuration order, as the per-file scan always has
+        entries = payload_entries + [
+            {
+                'type': 'malicious_url',
+                'severity': 'HIGH',
+                'message': f'Malicious URL detected: {url}',
+                # Context is read back from the offset only if the finding is reported
+                'details': {'url': url, 'offset': hits['malicious_url'][url]['offsets'][0],
+                            'hit_count': hits['malicious_url'][url]['count'],
+                            'offsets': hits['malicious_url'][url]['offsets']}
+            }
+            for url, _ in self.matcher.malicious_terms if url in hits['malicious_url']
+        ]
+        keywords = [term for term, _ in self.matcher.crypto_terms if term in hits['crypto_indicators']]
+        if keywords:
+            entries.append({
+                'type': 'crypto_indicators',
+                'severity': 'MEDIUM',
+                'message': f'Crypto-related keywords detected: {", ".join(keywords)}',
+                'details': {'keywords': keywords,
+                            'hit_counts': {term: hits['crypto_indicators'][term]['count'] for term in keywords},
+                            'offsets': {term: hits['crypto_indicators'][term]['offsets'] for term in keywords}}
+            })
+        browser_apis = [term for term, _ in self.matcher.browser_terms if term in hits['browser_apis']]
+        if browser_apis:
+            entries.append({
+                'type': 'browser_apis',
+                'severity': 'MEDIUM',
+                'message': f'Sensitive browser APIs referenced: {", ".join(browser_apis)}',
+                'details': {'browser_apis': browser_apis,
+                            'hit_counts': {term: hits['browser_apis'][term]['count'] for term in browser_apis},
+                            'offsets': {term: hits['browser_apis'][term]['offsets'] for term in browser_apis}}
+            })
+        patterns = [pattern for pattern, _ in self.matcher.patterns if pattern in hits['suspicious_patterns']]
+        if patterns:
+            entries.append({
+                'type': 'suspicious_patterns',
+                'severity': 'MEDIUM',
+                'message': f'Suspicious code patterns detected: {len(patterns)} patterns',
+                'details': {'patterns': patterns,
+                            'hit_counts': {term: hits['suspicious_patterns'][term]['count'] for term in patterns},
+                            'offsets': {term: hits['suspicious_patterns'][term]['offsets'] for term in patterns}}
+            })
+        return 'scanned', entries
+
+    def scan_many(self, file_paths: List[str], workers: int,
+                  max_file_size: Optional[int] = DEFAULT_MAX_FILE_SIZE):
+        """Yield (file_path, status, entries) in input order from a thread pool with a bounded queue"""
+        max_pending = workers * 4
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for file_path in file_paths:
+                pending.append((file_path, executor.submit(self.scan, file_path, max_file_size)))
+                if len(pending) >= max_pending:
+                    done_path, future = pending.popleft()
+                    yield (done_path,) + future.result()
+            while pending:
+                done_path, future = pending.popleft()
+                yield (done_path,) + future.result()
+
+
+class LifecycleScriptScanner:
+    """Finds install-time scripts in installed packages and matches them against the indicators
+
+    Enumerates node_modules/**/package.json with NodeModulesResolver and reads
+    them on a thread pool. A manifest is only JSON-decoded when its raw bytes
+    contain an `install"` key, so the vast majority of packages cost one read
+    and one substring search.
+    """
+
+    LIFECYCLE_SCRIPTS = ('preinstall', 'install', 'postinstall')
+    BATCH_SIZE = 512
+
+    def __init__(self, matcher: IndicatorMatcher, payload_names: Set[str], max_workers: int = 16):
+        self.matcher = matcher
+        self.payload_names = payload_names
+        self.max_workers = max_workers
+
+    def read_scripts(self, package_dir: str) -> Optional[Dict]:
+        """Name, version and lifecycle scripts of an installed package, or None if it has none"""
+        manifest_path = os.path.join(package_dir, 'package.json')
+        try:
+            with open(manifest_path, 'rb') as f:
+                raw = f.read()
+            if b'install"' not in raw:
+                return None
+            data = json.loads(raw)
+        except (OSError, ValueError):
+            return None
+        scripts = data.get('scripts') if isinstance(data, dict) else None
+        if not isinstance(scripts, dict):
+            return None
+        lifecycle = {name: str(scripts[name]) for name in self.LIFECYCLE_SCRIPTS if scripts.get(name)}
+        if not lifecycle:
+            return None
+        return {
+            'package': data.get('name') or os.path.basename(package_dir),
+            'version': data.get('version') or '',
+            'file': manifest_path,
+            'scripts': lifecycle,
+        }
+
+    def read_batch(self, package_dirs: List[str]) -> List[Dict]:
+        """read_scripts over package_dirs, keeping packages that have lifecycle scripts"""
+        return [info for info in map(self.read_scripts, package_dirs) if info]
+
+    def match_script(self, script_text: str) -> Tuple[str, List[str]]:
+        """(severity, indicators) for one script; severity is '' when nothing matches"""
+        hits = self.matcher.all_hits(script_text.encode('utf-8', errors='ignore'))
+        indicators = [term for category in IndicatorMatcher.CATEGORIES for term in hits[category]]
+        payload_refs = [name for name in self.payload_names if name in script_text]
+        if hits['malicious_url'] or payload_refs:
+            return 'HIGH', payload_refs + indicators
+        if indicators:
+            return 'MEDIUM', indicators
+        return '', []
+
+    def scan(self, project_dir: str, package_dirs: Optional[List[str]] = None) -> Tuple[int, List[Dict]]:
+        """(installed packages checked, packages with lifecycle scripts and their matches)"""
+        if package_dirs is None:
+            package_dirs = NodeModulesResolver.find_package_dirs(project_dir)
+        # Batched so per-future overhead does not dominate the ~1 KB reads
+        batches = [package_dirs[i:i + self.BATCH_SIZE] for i in range(0, len(package_dirs), self.BATCH_SIZE)]
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            packages = [
+                info for batch in executor.map(self.read_batch, batches) for info in batch
+            ]
+
+        for info in packages:
+            info['matches'] = {}
+            for script_name, script_text in info['scripts'].items():
+                severity, indicators = self.match_script(script_text)
+                if severity:
+                    info['matches'][script_name] = (severity, indicators)
+        return len(package_dirs), packages
+
+
+class ScanResult:
+    """Isolated, mergeable scan state produced by one worker
+
+    A worker scans a file into a freshly reset detector and captures the
+    resulting state here. merge() only concatenates lists and sums
+    counters, so merging is associative; deduplication happens once in
+    apply_to(), in task order, so parallel output matches a serial scan.
+    """
+
+    __slots__ = ('findings', 'scanned_packages', 'package_sources', 'safe_packages',
+                 'counters', 'lists')
+
+    def __init__(self):
+        self.findings = []
+        self.scanned_packages = []
+        self.package_sources = []
+        self.safe_packages = []
+        self.counters = {}
+        self.lists = {}
+
+    @classmethod
+    def capture(cls, detector) -> 'ScanResult':
+        """Snapshot the scan state of a detector"""
+        result = cls()
+        result.findings = list(detector.findings)
+        result.scanned_packages = list(detector.scanned_packages)
+        result.package_sources = [
+            (package_key, source) for package_key, sources in detector.package_sources.items() for source in sources
+        ]
+        result.safe_packages = list(detector.safe_packages)
+        result.counters = {name: dict(getattr(detector, name)) for name in detector.SCAN_STATE_COUNTERS}
+        result.lists = {name: list(getattr(detector, name)) for name in detector.SCAN_STATE_LISTS}
+        return result
+
+    def merge(self, other: 'ScanResult') -> 'ScanResult':
+        """Append other's state after this one"""
+        self.findings.extend(other.findings)
+        self.scanned_packages.extend(other.scanned_packages)
+        self.package_sources.extend(other.package_sources)
+        self.safe_packages.extend(other.safe_packages)
+        for name, counts in other.counters.items():
+            merged = self.counters.setdefault(name, {})
+            for key, value in counts.items():
+                merged[key] = merged.get(key, 0) + value
+        for name, values in other.lists.items():
+            self.lists.setdefault(name, []).extend(values)
+        return self
+
+    def apply_to(self, detector) -> None:
+        """Fold this result into a detector's state"""
+        for finding in self.findings:
+            detector.findings.append(finding)
+        for package_info in self.scanned_packages:
+            detector.scanned_packages.add(package_info)
+        for package_key, source in self.package_sources:
+            source_key = (package_key, source['source'], source['file_path'], source['depth'])
+            if source_key not in detector._package_source_keys:
+                detector._package_source_keys.add(source_key)
+                detector.package_sources.setdefault(package_key, []).append(source)
+        for safe_package_info in self.safe_packages:
+            detector.safe_packages.add(safe_package_info)
+        for name, counts in self.counters.items():
+            target = getattr(detector, name)
+            for key, value in counts.items():
+                target[key] = target.get(key, 0) + value
+        for name, values in self.lists.items():
+            getattr(detector, name).extend(values)
+
+
+# Per-process detector used by pool workers, built once by _init_scan_worker
+_WORKER_DETECTOR = None
+
+
+def _init_scan_worker(detector_factory, settings: Dict[str, Any]):
+    global _WORKER_DETECTOR
+    # Keep the per-process load banner out of the parent's output
+    with contextlib.redirect_stdout(io.StringIO()):
+        _WORKER_DETECTOR = detector_factory()
+    for name, value in settings.items():
+        setattr(_WORKER_DETECTOR, name, value)
+
+
+def _run_scan_task(task: Tuple[str, Tuple]) -> Tuple[Any, ScanResult]:
+    method_name, args = task
+    _WORKER_DETECTOR.reset_scan_state()
+    value = getattr(_WORKER_DETECTOR, method_name)(*args)
+    return value, ScanResult.capture(_WORKER_DETECTOR)
+
+
+def run_parallel_scan(detector, method_name: str, arg_tuples: List[Tuple], jobs: int) -> List[Any]:
+    """Call detector.<method_name>(*args) for each args on a process pool
+
+    Each call runs against an isolated worker detector. Results are merged
+    into detector in input order, and the method return values are returned
+    in the same order.
+    """
+    settings = {name: getattr(detector, name) for name in detector.WORKER_SETTINGS}
+    tasks = [(method_name, args) for args in arg_tuples]
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    values = []
+    merged = ScanResult()
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_scan_worker,
+                             initargs=(detector.worker_factory(), settings)) as executor:
+        for value, result in executor.map(_run_scan_task, tasks, chunksize=chunksize):
+            values.append(value)
+            merged.merge(result)
+
+    merged.apply_to(detector)
+    return values
+
+
+def isolated_scan(detector, method_name: str, args: Tuple) -> Tuple[Any, ScanResult]:
+    """Call detector.<method_name>(*args) against fresh scan state and capture what it produced
+
+    The detector's own scan state is put back afterwards, untouched; the
+    caller decides whether to apply the captured result.
+    """
+    saved = dict(vars(detector))
+    detector.reset_scan_state()
+    try:
+        value = getattr(detector, method_name)(*args)
+        return value, ScanResult.capture(detector)
+    finally:
+        # reset_scan_state only rebinds attributes, so restoring the bindings restores the state
+        vars(detector).update(saved)
+
+
+class ScanCache:
+    """SQLite cache of per-file scan results, keyed by file content and compromise database
+
+    An entry maps (SHA-256 of the file, scan key) to the method's return value
+    and its captured ScanResult. The scan key names the detector class, the
+    cache schema and CompromiseIndex.version, so unchanged files are served
+    from the cache until the database changes and are re-matched after.
+    Paths and timestamps are stored as placeholders and filled in on load,
+    so a lockfile cloned to a new directory every night still hits.
+    """
+
+    SCHEMA_VERSION = 2
+    DEFAULT_PATH = os.path.join('result', 'scan_cache.sqlite')
+    PATH_PLACEHOLDER = '\x00file\x00'
+    TIMESTAMP_PLACEHOLDER = '\x00now\x00'
+    TIMESTAMP_FIELDS = ('timestamp', 'first_seen', 'found_at')
+
+    def __init__(self, db_path: str = DEFAULT_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        # Pool workers open their own connections; wait out their writes instead of failing
+        self.connection = sqlite3.connect(db_path, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS scan_results ('
+            ' digest TEXT NOT NULL, scan_key TEXT NOT NULL, payload BLOB NOT NULL, created_at TEXT NOT NULL,'
+            ' PRIMARY KEY (digest, scan_key))'
+        )
+        self.connection.commit()
+
+    @staticmethod
+    def file_digest(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @classmethod
+    def scan_key(cls, detector, method_name: str) -> str:
+        return f"{type(detector).__name__}.{method_name}/v{cls.SCHEMA_VERSION}/{detector.compromise_index.version}"
+
+    @classmethod
+    def _to_placeholders(cls, value: Any, file_path: str) -> Any:
+        """Copy of value with file_path and timestamps swapped for placeholders"""
+        if isinstance(value, str):
+            return cls.PATH_PLACEHOLDER if value == file_path else value
+        if isinstance(value, dict):
+            return {
+                key: cls.TIMESTAMP_PLACEHOLDER if key in cls.TIMESTAMP_FIELDS else cls._to_placeholders(item, file_path)
+                for key, item in value.items()
+            }
+        if isinstance(value, (list, tuple)):
+            return [cls._to_placeholders(item, file_path) for item in value]
+        return value
+
+    @staticmethod
+    def _json_fragment(text: str) -> str:
+        """text as it appears inside a JSON string literal"""
+        return json.dumps(text)[1:-1]
+
+    def load(self, digest: str, scan_key: str, file_path: str) -> Optional[Tuple[Any, ScanResult]]:
+        row = self.connection.execute(
+            'SELECT payload FROM scan_results WHERE digest = ? AND scan_key = ?', (digest, scan_key)
+        ).fetchone()
+        if row is None:
+            return None
+        # Placeholders are filled in on the JSON text, which is far cheaper than walking the decoded tree
+        text = zlib.decompress(row[0]).decode('utf-8')
+        text = text.replace(self._json_fragment(self.PATH_PLACEHOLDER), self._json_fragment(file_path))
+        text = text.replace(self._json_fragment(self.TIMESTAMP_PLACEHOLDER), datetime.now().isoformat())
+        payload = json.loads(text)
+        result = ScanResult()
+        for field in ScanResult.__slots__:
+            setattr(result, field, payload['result'][field])
+        return payload['value'], result
+
+    def store(self, digest: str, scan_key: str, file_path: str, value: Any, result: ScanResult) -> None:
+        payload = {'value': value, 'result': {field: getattr(result, field) for field in ScanResult.__slots__}}
+        blob = zlib.compress(json.dumps(self._to_placeholders(payload, file_path)).encode('utf-8'))
+        self.connection.execute(
+            'INSERT OR REPLACE INTO scan_results (digest, scan_key, payload, created_at) VALUES (?, ?, ?, ?)',
+            (digest, scan_key, blob, datetime.now().isoformat())
+        )
+        self.connection.commit()
+
+    def scan(self, detector, method_name: str, file_path: str) -> Any:
+        """detector.<method_name>(file_path), served from the cache when the file and database are unchanged"""
+        stats = detector.scan_cache_stats
+        try:
+            digest = self.file_digest(file_path)
+        except OSError:
+            return getattr(detector, method_name)(file_path)
+
+        scan_key = self.scan_key(detector, method_name)
+        cached = self.load(digest, scan_key, file_path)
+        if cached is not None:
+            value, result = cached
+            result.apply_to(detector)
+            stats['hits'] += 1
+            return value
+
+        value, result = isolated_scan(detector, method_name, (file_path,))
+        result.apply_to(detector)
+        stats['misses'] += 1
+        # Failures carry the path in their message and may be transient, so they are not cached
+        if not any(finding['severity'] == 'ERROR' for finding in result.findings):
+            self.store(digest, scan_key, file_path, value, result)
+            stats['stored'] += 1
+        return value
+
+
+def format_scan_cache_stats(stats: Dict[str, int], db_path: str) -> str:
+    """One report line summarising scan cache use"""
+    lookups = stats['hits'] + stats['misses']
+    hit_rate = stats['hits'] / lookups * 100 if lookups else 0.0
+    return (f"Scan cache: {stats['hits']} hits, {stats['misses']} misses ({hit_rate:.0f}% hit rate), "
+            f"{stats['stored']} stored in {db_path}")
+
+
+class InventoryStore:
+    """SQLite inventory of every package occurrence a scan saw, for re-matching without rescanning
+
+    One row per (repo, file, package, version, depth, dependency type), plus
+    the declared range for direct dependencies. Saving a repository replaces
+    its previous rows, so the store always holds the latest scan of each
+    repository. Re-matching only reads rows whose package name is monitored,
+    and lookup()/lookup_prefix() answer "which repos contain X at version Y"
+    from the (package, version) index.
+    """
+
+    DEFAULT_PATH = os.path.join('result', 'inventory.sqlite')
+    COLUMNS = ('repo', 'file', 'package', 'version', 'declared', 'depth', 'dependency_type')
+
+    def __init__(self, db_path: str = DEFAULT_PATH):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        self.connection = sqlite3.connect(db_path, timeout=30)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute(
+            'CREATE TABLE IF NOT EXISTS inventory ('
+            ' repo TEXT NOT NULL, file TEXT NOT NULL, package TEXT NOT NULL, version TEXT NOT NULL,'
+            ' declared TEXT, depth INTEGER NOT NULL, dependency_type TEXT NOT NULL, scanned_at TEXT NOT NULL)'
+        )
+        self.connection.execute('CREATE INDEX IF NOT EXISTS inventory_repo ON inventory (repo)')
+        # (package, version) is the inverted index: exact and scope-prefix lookups are range scans on it
+        self.connection.execute('CREATE INDEX IF NOT EXISTS inventory_package_version ON inventory (package, version)')
+        self.connection.commit()
+
+    def replace_repository(self, repo: str, rows: Iterable[Tuple]) -> int:
+        """Replace repo's inventory with rows of (file, package, version, declared, depth, dependency_type)"""
+        scanned_at = datetime.now().isoformat()
+        with self.connection:
+            self.connection.execute('DELETE FROM inventory WHERE repo = ?', (repo,))
+            cursor = self.connection.executemany(
+                'INSERT INTO inventory (repo, file, package, version, declared, depth, dependency_type, scanned_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                ((repo,) + tuple(row) + (scanned_at,) for row in rows)
+            )
+        return cursor.rowcount
+
+    def iter_rows(self, package_names: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """Inventory rows as dicts, optionally only those for package_names"""
+        columns = ', '.join(f'inventory.{column}' for column in self.COLUMNS)
+        if package_names is None:
+            cursor = self.connection.execute(f'SELECT {columns} FROM inventory ORDER BY repo, file')
+        else:
+            # A temp table join lets SQLite use the package index for any number of names
+            self.connection.execute('CREATE TEMP TABLE IF NOT EXISTS wanted_packages (package TEXT PRIMARY KEY)')
+            self.connection.execute('DELETE FROM wanted_packages')
+            self.connection.executemany('INSERT OR IGNORE INTO wanted_packages VALUES (?)',
+                                        ((name,) for name in package_names))
+            cursor = self.connection.execute(
+                f'SELECT {columns} FROM wanted_packages JOIN inventory ON inventory.package = wanted_packages.package'
+                ' ORDER BY inventory.repo, inventory.file'
+            )
+        for row in cursor:
+            yield dict(zip(self.COLUMNS, row))
+
+    def lookup(self, package: str, version: str = None) -> Dict[str, Dict[str, List[Dict]]]:
+        """{package: {version: [locations]}} for one package, optionally one version"""
+        if version is None:
+            return self._locations('package = ?', (package,))
+        return self._locations('package = ? AND version = ?', (package, version))
+
+    def lookup_prefix(self, prefix: str) -> Dict[str, Dict[str, List[Dict]]]:
+        """{package: {version: [locations]}} for every package name starting with prefix, e.g. '@ctrl/'"""
+        if not prefix:
+            return self._locations('1', ())
+        # A half-open range instead of LIKE, so the index is used and '_'/'%' in names stay literal
+        upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return self._locations('package >= ? AND package < ?', (prefix, upper_bound))
+
+    def _locations(self, where: str, params: Tuple) -> Dict[str, Dict[str, List[Dict]]]:
+        index = {}
+        cursor = self.connection.execute(
+            f'SELECT package, version, repo, file, declared, depth, dependency_type FROM inventory WHERE {where}'
+            ' ORDER BY package, version, repo, file', params
+        )
+        for package, version, repo, file_path, declared, depth, dependency_type in cursor:
+            index.setdefault(package, {}).setdefault(version, []).append({
+                'repo': repo,
+                'file': file_path,
+                'declared': declared,
+                'depth': depth,
+                'dependency_type': dependency_type
+            })
+        return index
+
+    def counts(self) -> Tuple[int, int]:
+        """(rows, repositories) held in the store"""
+        return self.connection.execute('SELECT COUNT(*), COUNT(DISTINCT repo) FROM inventory').fetchone()
+
+
+def inventory_rows(detector, file_paths: Optional[Set[str]] = None) -> Iterator[Tuple]:
+    """(file, package, version, declared, depth, dependency_type) for every package occurrence a detector tracked"""
+    for package_key, sources in detector.package_sources.items():
+        package_info = detector.scanned_packages.get((package_key,))
+        if package_info is None:
+            continue
+        for source in sources:
+            if file_paths is not None and source['file_path'] not in file_paths:
+                continue
+            yield (source['file_path'], package_info['name'], package_info['version'],
+                   source.get('declared_version'), source['depth'], source['source'])
+
+
+def match_inventory(compromise_index: CompromiseIndex, range_engine: SemverRangeEngine,
+                    rows: Iterable[Dict]) -> Iterator[Tuple[Dict, str, List[str], List[str]]]:
+    """(row, severity, compromised_versions, admitted_versions) for each row the database has a verdict on
+
+    severity follows check_package_compromise; a declared range admitting a
+    compromised release is reported as HIGH with admitted_versions set, and
+    INFO means a monitored package at a safe version.
+    """
+    for row in rows:
+        is_compromised, severity, compromised_versions = compromise_index.check(row['package'], row['version'])
+        admitted_versions = []
+        if not is_compromised and row['declared']:
+            admitted_versions = range_engine.admitted_versions(row['package'], row['declared'])
+            if admitted_versions:
+                severity = 'HIGH'
+        if severity:
+            yield row, severity, compromised_versions, admitted_versions
+
+
+class PackageTracker:
+    """Package and safe-version bookkeeping shared by the local and Phoenix detectors
+
+    Subclasses call reset_package_tracking() when clearing scan state and
+    provide a dependency_stats dict with a 'safe_packages_found' counter.
+    """
+
+    def reset_package_tracking(self):
+        """Clear tracked packages, their sources and safe versions"""
+        self.scanned_packages = PackageRegistry(('key',))
+        self.package_sources = {}
+        self._package_source_keys = set()
+        self.safe_packages = PackageRegistry(('name', 'version', 'file_path', 'source'))
+
+    def track_package(self, package_name: str, version: str, source: str, file_path: str = None, depth: int = 0,
+                      declared_version: str = None):
+        """Track a scanned package for reporting purposes"""
+        package_key = f"{package_name}@{version}"
+
+        if (package_key,) not in self.scanned_packages:
+            package_info = {
+                'key': package_key,
+                'name': package_name,
+                'version': version,
+                'source': source,
+                'file_path': file_path,
+                'depth': depth,
+                'first_seen': datetime.now().isoformat()
+            }
+            self.scanned_packages.add(package_info)
+
+        if package_key not in self.package_sources:
+            self.package_sources[package_key] = []
+
+        source_key = (package_key, source, file_path, depth)
+        if source_key not in self._package_source_keys:
+            self._package_source_keys.add(source_key)
+            source_info = {
+                'source': source,
+                'file_path': file_path,
+                'depth': depth
+            }
+            if declared_version is not None:
+                source_info['declared_version'] = declared_version
+            self.package_sources[package_key].append(source_info)
+
+    def track_safe_package(self, package_name: str, version: str, compromised_versions: List[str], source: str, file_path: str = None, depth: int = 0):
+        """Track a package that is a safe version of a potentially compromised package"""
+        if (package_name, version, file_path, source) in self.safe_packages:
+            return
+
+        safe_package_info = {
+            'name': package_name,
+            'version': version,
+            'compromised_versions': compromised_versions,
+            'source': source,
+            'file_path': file_path,
+            'depth': depth,
+            'found_at': datetime.now().isoformat()
+        }
+        self.safe_packages.add(safe_package_info)
+        self.dependency_stats['safe_packages_found'] += 1
+
+
+class NPMCompromiseDetector2025(PackageTracker):
+    # Per-file scan state collected by ScanResult, and settings copied into pool workers
+    SCAN_STATE_LISTS = ('scanned_files',)
+    SCAN_STATE_COUNTERS = ('dependency_stats', 'source_scan_stats', 'scan_cache_stats')
+    SOURCE_BATCH_SIZE = 256  # Source files per pool task in --jobs mode
+    WORKER_SETTINGS = ('full_tree_analysis', 'npm_tree_fallback', 'include_node_modules',
+                       'max_depth', 'follow_symlinks', 'max_source_file_size', 'source_workers',
+                       'scan_cache_path', 'lock_baselines')
 
-class NPMCompromiseDetector2025:
     def __init__(self, config_file: str = None):
         """Initialize the detector with compromised package data"""
         self.config_file = config_file or "compromised_packages_2025.json"
         self.load_compromise_data()
         
-        self.findings = []
+        self.reset_scan_state()
+        self.full_tree_analysis = False
+        self.node_modules_resolver = NodeModulesResolver()
+        self.npm_tree_fallback = False  # Shell out to `npm list` when node_modules yields nothing
+        self.include_node_modules = False  # Installed-package mode: also walk into nested node_modules
+        self.max_depth = None  # Directory depth limit for the filesystem walker
+        self.follow_symlinks = False
+        self.jobs = 1  # Worker processes for per-file scanning
+        self.lifecycle_script_scan = True  # Check install scripts of packages in node_modules
+        self.max_source_file_size = SourceScanner.DEFAULT_MAX_FILE_SIZE  # Larger sources are skipped and counted
+        self.source_workers = min(32, (os.cpu_count() or 1) + 4)  # Threads reading source files
+        self.scan_cache_path = None  # SQLite lockfile scan cache, opened lazily per process
+        self._scan_cache = None
+        self.rematch_stats = None  # Set when findings come from a stored inventory instead of a scan
+        self.lock_baselines = {}  # Lock file path -> entry keys at the --since base; those entries are skipped
+        self.incremental_stats = None  # Set when only files changed since a git ref were scanned
+        
+    def reset_scan_state(self):
+        """Clear findings, tracked packages and counters"""
+        self.findings = FindingStore()
         self.scanned_files = []
-        self.scanned_packages = []
-        self.package_sources = {}
-        self.safe_packages = []
+        self.reset_package_tracking()
         self.dependency_stats = {
             'direct_dependencies': 0,
             'transitive_dependencies': 0,
@@ -39,9 +2012,22 @@ class NPMCompromiseDetector2025:
             'tree_resolved_packages': 0,
             'safe_packages_found': 0,
             'compromised_packages_found': 0,
-            'potentially_compromised_found': 0
+            'potentially_compromised_found': 0,
+            'range_admits_compromised_found': 0,
+            'installed_packages_checked': 0,
+            'lifecycle_scripts_found': 0,
+            'unchanged_lock_entries_skipped': 0
         }
-        self.full_tree_analysis = False
+        self.source_scan_stats = {
+            'scanned': 0,
+            'skipped_too_large': 0,
+            'skipped_unreadable': 0
+        }
+        self.scan_cache_stats = {'hits': 0, 'misses': 0, 'stored': 0}
+
+    def worker_factory(self):
+        """Picklable callable that builds an equivalent detector in a worker process"""
+        return partial(type(self), config_file=self.config_file)
         
     def load_compromise_data(self):
         """Load compromised package data from JSON configuration"""
@@ -53,13 +2039,18 @@ class NPMCompromiseDetector2025:
                 self.incident_metadata = data.get('incident_metadata', {})
                 self.compromised_packages = data.get('compromised_packages', {})
                 self.potentially_compromised = set(data.get('potentially_compromised_packages', []))
-                self.malicious_urls = data.get('malicious_indicators', {}).get('domains', [])
+                self.malicious_indicators = data.get('malicious_indicators', {})
+                self.malicious_urls = self.malicious_indicators.get('domains', [])
                 self.crypto_indicators = data.get('crypto_indicators', [])
+                self.browser_apis = data.get('browser_apis', [])
                 self.suspicious_patterns = data.get('suspicious_patterns', [])
                 self.safe_overrides = data.get('remediation', {}).get('safe_overrides', {})
                 
                 print(f"✅ Loaded compromise data: {len(self.compromised_packages)} packages with specific versions")
                 print(f"✅ Loaded {len(self.potentially_compromised)} potentially compromised packages")
+                payload_count = len(self.malicious_indicators.get('payload_hashes', []))
+                if payload_count:
+                    print(f"✅ Loaded {payload_count} known payload hashes")
             else:
                 print(f"⚠️  Configuration file {self.config_file} not found, using default data")
                 self._load_default_data()
@@ -68,6 +2059,18 @@ class NPMCompromiseDetector2025:
             print(f"❌ Error loading compromise data: {str(e)}")
             self._load_default_data()
             
+        # Compile the immutable lookup index used by check_package_compromise
+        self.compromise_index = CompromiseIndex(self.compromised_packages, self.potentially_compromised)
+        self.range_engine = SemverRangeEngine(self.compromise_index)
+        self.payload_index = PayloadHashIndex(
+            self.malicious_indicators.get('payload_hashes', []), self.malicious_indicators.get('file_patterns', [])
+        )
+        indicator_matcher = IndicatorMatcher(
+            self.malicious_indicators, self.crypto_indicators, self.browser_apis, self.suspicious_patterns
+        )
+        self.source_scanner = SourceScanner(indicator_matcher, payload_index=self.payload_index)
+        self.lifecycle_scanner = LifecycleScriptScanner(indicator_matcher, self.payload_index.names)
+            
     def _load_default_data(self):
         """Load default compromise data if config file is not available"""
         self.compromised_packages = {
@@ -84,7 +2087,9 @@ class NPMCompromiseDetector2025:
         }
         self.potentially_compromised = set([])  # All packages now have specific compromised versions
         self.malicious_urls = ["npmjs.help", "support@npmjs.help"]
+        self.malicious_indicators = {'domains': self.malicious_urls}
         self.crypto_indicators = ["cryptocurrency", "wallet", "private key", "bitcoin", "ethereum", "metamask", "web3", "blockchain"]
+        self.browser_apis = []
         self.suspicious_patterns = []
         self.safe_overrides = {
             "@ctrl/tinycolor": "4.1.0",
@@ -113,114 +2118,71 @@ class NPMCompromiseDetector2025:
     def enable_full_tree_analysis(self, enable: bool = True):
         """Enable or disable full dependency tree analysis"""
         self.full_tree_analysis = enable
-        
-    def track_package(self, package_name: str, version: str, source: str, file_path: str = None, depth: int = 0):
-        """Track a scanned package for reporting purposes"""
-        package_key = f"{package_name}@{version}"
-        
-        if package_key not in [p['key'] for p in self.scanned_packages]:
-            package_info = {
-                'key': package_key,
-                'name': package_name,
-                'version': version,
-                'source': source,
-                'file_path': file_path,
-                'depth': depth,
-                'first_seen': datetime.now().isoformat()
-            }
-            self.scanned_packages.append(package_info)
-            
-        if package_key not in self.package_sources:
-            self.package_sources[package_key] = []
-        
-        source_info = {
-            'source': source,
-            'file_path': file_path,
-            'depth': depth
-        }
-        
-        if source_info not in self.package_sources[package_key]:
-            self.package_sources[package_key].append(source_info)
-            
-    def track_safe_package(self, package_name: str, version: str, compromised_versions: List[str], source: str, file_path: str = None, depth: int = 0):
-        """Track a package that is a safe version of a potentially compromised package"""
-        safe_package_info = {
-            'name': package_name,
-            'version': version,
-            'compromised_versions': compromised_versions,
-            'source': source,
-            'file_path': file_path,
-            'depth': depth,
-            'found_at': datetime.now().isoformat()
-        }
-        
-        existing = any(
-            p['name'] == package_name and 
-            p['version'] == version and 
-            p['file_path'] == file_path and
-            p['source'] == source
-            for p in self.safe_packages
+
+    def enable_npm_tree_fallback(self, enable: bool = True):
+        """Enable or disable falling back to `npm list` when node_modules cannot be resolved"""
+        self.npm_tree_fallback = enable
+
+    def enable_lifecycle_script_scan(self, enable: bool = True):
+        """Enable or disable checking install scripts of packages in node_modules"""
+        self.lifecycle_script_scan = enable
+
+    def enable_scan_cache(self, enable: bool = True, db_path: str = ScanCache.DEFAULT_PATH):
+        """Enable or disable serving unchanged lock files from the on-disk scan cache"""
+        self.scan_cache_path = db_path if enable else None
+        self._scan_cache = None
+
+    def get_scan_cache(self) -> Optional[ScanCache]:
+        """The scan cache for this process, or None when caching is disabled"""
+        if self.scan_cache_path and self._scan_cache is None:
+            self._scan_cache = ScanCache(self.scan_cache_path)
+        return self._scan_cache
+
+    def enable_installed_package_scan(self, enable: bool = True):
+        """Enable or disable scanning node_modules nested inside node_modules (installed-package mode)"""
+        self.include_node_modules = enable
+
+    def get_file_walker(self, recursive: bool = True) -> FileWalker:
+        """Build a filesystem walker from the detector's prune settings"""
+        return FileWalker(
+            include_node_modules=self.include_node_modules,
+            max_depth=self.max_depth if recursive else 0,
+            follow_symlinks=self.follow_symlinks
         )
         
-        if not existing:
-            self.safe_packages.append(safe_package_info)
-            self.dependency_stats['safe_packages_found'] += 1
-            
     def normalize_version(self, version: str) -> str:
         """Normalize version string by removing prefixes like ^, ~, >=, etc."""
-        if not version:
-            return ""
-        # Remove common npm version prefixes
-        cleaned = re.sub(r'^[^\d]*', '', str(version))
-        # Handle version ranges like "1.0.0 - 2.0.0"
-        if ' - ' in cleaned:
-            cleaned = cleaned.split(' - ')[0]
-        # Handle || operators
-        if ' || ' in cleaned:
-            cleaned = cleaned.split(' || ')[0]
-        return cleaned.strip()
+        return normalize_version(version)
         
     def check_package_compromise(self, package_name: str, version: str) -> Tuple[bool, str, List[str]]:
         """
         Check if a package version is compromised
         Returns: (is_compromised, severity, compromised_versions_list)
         """
-        normalized_version = self.normalize_version(version)
-        
-        # Check exact compromised packages with versions
-        if package_name in self.compromised_packages:
-            pkg_data = self.compromised_packages[package_name]
-            compromised_versions = pkg_data.get('compromised_versions', [])
-            
-            if normalized_version in compromised_versions:
-                return True, 'CRITICAL', compromised_versions
-            else:
-                # Package is in our list but version is different - could be safe
-                return False, 'INFO', compromised_versions
-                
-        # Check potentially compromised packages (no specific version)
-        if package_name in self.potentially_compromised:
-            return True, 'HIGH', []
-            
-        return False, '', []
+        return self.compromise_index.check(package_name, version)
         
+    def get_dependency_tree(self, package_json_dir: str) -> Tuple[Dict, str]:
+        """Get the installed dependency tree and its source ('node_modules' or 'npm_list')"""
+        dep_tree = self.node_modules_resolver.resolve(package_json_dir)
+        if not dep_tree.get('dependencies') and self.npm_tree_fallback:
+            return self.get_npm_dependency_tree(package_json_dir), 'npm_list'
+        return dep_tree, 'node_modules'
+
     def get_npm_dependency_tree(self, package_json_dir: str) -> Dict:
         """Get full dependency tree using npm list"""
+        # Try different npm list commands for better compatibility
+        commands = [
+            ['npm', 'list', '--json', '--all', '--prod'],
+            ['npm', 'list', '--json', '--all'],
+            ['npm', 'list', '--json', '--depth=0']
+        ]
+        
         try:
-            original_cwd = os.getcwd()
-            os.chdir(package_json_dir)
-            
-            # Try different npm list commands for better compatibility
-            commands = [
-                ['npm', 'list', '--json', '--all', '--prod'],
-                ['npm', 'list', '--json', '--all'],
-                ['npm', 'list', '--json', '--depth=0']
-            ]
-            
             for cmd in commands:
                 try:
                     result = subprocess.run(
                         cmd,
+                        cwd=package_json_dir,
                         capture_output=True,
                         text=True,
                         timeout=60
@@ -228,23 +2190,18 @@ class NPMCompromiseDetector2025:
                     
                     if result.returncode == 0 or result.stdout:
                         # npm list can return non-zero even with valid output
-                        tree_data = json.loads(result.stdout)
-                        os.chdir(original_cwd)
-                        return tree_data
+                        return json.loads(result.stdout)
                         
                 except (json.JSONDecodeError, subprocess.TimeoutExpired):
                     continue
                     
-            os.chdir(original_cwd)
-                    
         except Exception as e:
-            if 'original_cwd' in locals():
-                os.chdir(original_cwd)
             self.log_finding('WARNING', f'Error getting npm dependency tree: {str(e)}', package_json_dir)
             
         return {}
         
-    def scan_dependency_tree_recursive(self, deps: Dict, file_path: str, depth: int = 0) -> List[Dict]:
+    def scan_dependency_tree_recursive(self, deps: Dict, file_path: str, depth: int = 0,
+                                       tree_source: str = 'npm_list') -> List[Dict]:
         """Recursively scan dependency tree for compromised packages"""
         findings = []
         
@@ -275,7 +2232,7 @@ class NPMCompromiseDetector2025:
                         'package': package_name, 
                         'version': version, 
                         'depth': depth,
-                        'tree_source': 'npm_list',
+                        'tree_source': tree_source,
                         'compromised_versions': compromised_versions
                     }
                 )
@@ -297,7 +2254,7 @@ class NPMCompromiseDetector2025:
                         'package': package_name,
                         'version': version,
                         'depth': depth,
-                        'tree_source': 'npm_list',
+                        'tree_source': tree_source,
                         'reason': 'Package name in potentially compromised list'
                     }
                 )
@@ -326,14 +2283,14 @@ class NPMCompromiseDetector2025:
                         'safe_version': version,
                         'compromised_versions': compromised_versions,
                         'depth': depth,
-                        'tree_source': 'npm_list'
+                        'tree_source': tree_source
                     }
                 )
                     
             # Recursively check nested dependencies
             if 'dependencies' in package_info and package_info['dependencies']:
                 findings.extend(self.scan_dependency_tree_recursive(
-                    package_info['dependencies'], file_path, depth + 1
+                    package_info['dependencies'], file_path, depth + 1, tree_source
                 ))
                 
         return findings
@@ -351,11 +2308,14 @@ class NPMCompromiseDetector2025:
                 if dep_type in package_data:
                     for package_name, version in package_data[dep_type].items():
                         clean_version = self.normalize_version(version)
-                        self.track_package(package_name, clean_version, f'direct_{dep_type}', file_path, depth=0)
+                        self.track_package(package_name, clean_version, f'direct_{dep_type}', file_path, depth=0,
+                                           declared_version=version)
                         self.dependency_stats['direct_dependencies'] += 1
                         
                         # Check if package is compromised
                         is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, clean_version)
+                        # Even when the range floor is safe, the range itself may admit a compromised release
+                        admitted_versions = [] if is_compromised else self.range_engine.admitted_versions(package_name, version)
                         
                         if is_compromised and severity == 'CRITICAL':
                             self.log_finding(
@@ -399,6 +2359,30 @@ class NPMCompromiseDetector2025:
                             })
                             self.dependency_stats['potentially_compromised_found'] += 1
                             
+                        elif admitted_versions:
+                            # Declared range could resolve to a compromised version on a fresh install
+                            self.log_finding(
+                                'HIGH',
+                                f'Declared range admits compromised version: {package_name}@{version} (admits: {", ".join(admitted_versions)})',
+                                file_path,
+                                {
+                                    'package': package_name,
+                                    'version': version,
+                                    'dependency_type': dep_type,
+                                    'admitted_compromised_versions': admitted_versions,
+                                    'compromised_versions': compromised_versions,
+                                    'reason': 'Version range admits a compromised release; pin to a safe version'
+                                }
+                            )
+                            findings.append({
+                                'package': package_name,
+                                'version': version,
+                                'type': dep_type,
+                                'file': file_path,
+                                'compromise_type': 'range_admits_compromised'
+                            })
+                            self.dependency_stats['range_admits_compromised_found'] += 1
+                            
                         elif package_name in self.compromised_packages and not is_compromised:
                             # Package is in our compromised list but using a different version
                             self.track_safe_package(
@@ -424,11 +2408,11 @@ class NPMCompromiseDetector2025:
                 if (os.path.exists(os.path.join(package_dir, 'package-lock.json')) or 
                     os.path.exists(os.path.join(package_dir, 'node_modules'))):
                     print(f"📦 Getting full dependency tree for {file_path}")
-                    dep_tree = self.get_npm_dependency_tree(package_dir)
+                    dep_tree, tree_source = self.get_dependency_tree(package_dir)
                     
                     if dep_tree and 'dependencies' in dep_tree:
                         tree_findings = self.scan_dependency_tree_recursive(
-                            dep_tree['dependencies'], file_path, depth=1
+                            dep_tree['dependencies'], file_path, depth=1, tree_source=tree_source
                         )
                         findings.extend(tree_findings)
                         
@@ -453,6 +2437,14 @@ class NPMCompromiseDetector2025:
         return findings
         
     def scan_lock_file(self, file_path: str) -> List[Dict]:
+        """Scan package-lock.json or yarn.lock for compromised packages, through the scan cache if enabled"""
+        scan_cache = self.get_scan_cache()
+        # Results filtered against a --since baseline are not the file's full results, so they bypass the cache
+        if scan_cache is None or file_path in self.lock_baselines:
+            return self._scan_lock_file(file_path)
+        return scan_cache.scan(self, '_scan_lock_file', file_path)
+
+    def _scan_lock_file(self, file_path: str) -> List[Dict]:
         """Scan package-lock.json or yarn.lock for compromised packages"""
         findings = []
         
@@ -468,27 +2460,24 @@ class NPMCompromiseDetector2025:
         return findings
         
     def _scan_package_lock(self, file_path: str) -> List[Dict]:
-        """Scan package-lock.json specifically"""
+        """Scan package-lock.json specifically, streaming entries with bounded memory"""
         findings = []
+        baseline = self.lock_baselines.get(file_path)
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            lock_data = json.load(f)
-            
-        # Check packages in lockfile v2/v3 format
-        if 'packages' in lock_data:
-            for package_path, package_info in lock_data['packages'].items():
+        for section, key, package_info, depth in iter_package_lock_entries(file_path):
+            if baseline is not None and lock_entry_key(section, key, package_info, depth) in baseline:
+                self.dependency_stats['unchanged_lock_entries_skipped'] += 1
+                continue
+            if section == 'packages':
+                # Check packages in lockfile v2/v3 format
+                package_path = key
                 if package_path.startswith('node_modules/'):
-                    # Handle scoped packages correctly
-                    path_parts = package_path.replace('node_modules/', '').split('/')
-                    if path_parts[0].startswith('@'):
-                        package_name = '/'.join(path_parts[:2])  # @scope/name
-                    else:
-                        package_name = path_parts[0]
+                    # Nested and scoped packages: name follows the last node_modules/
+                    package_name = package_name_from_lock_path(package_path)
                         
                     version = package_info.get('version', '')
                     
                     if version:
-                        depth = package_path.count('/') - 1
                         self.track_package(package_name, version, 'lock_file_v2_v3', file_path, depth)
                         self.dependency_stats['lock_file_packages'] += 1
                     
@@ -536,7 +2525,6 @@ class NPMCompromiseDetector2025:
                         
                     elif package_name in self.compromised_packages and not is_compromised:
                         # Package is in our compromised list but using a safe version
-                        depth = package_path.count('/') - 1
                         self.track_safe_package(
                             package_name, version, compromised_versions,
                             'safe_lock_file_v2_v3', file_path, depth
@@ -552,202 +2540,144 @@ class NPMCompromiseDetector2025:
                                 'path': package_path
                             }
                         )
+            else:
+                # Check dependencies in lockfile v1 format (nested entries arrive via an explicit stack)
+                package_name = key
+                version = package_info.get('version', '')
+                
+                if version:
+                    self.track_package(package_name, version, 'lock_file_dependency', file_path, depth)
+                    self.dependency_stats['lock_file_packages'] += 1
+                
+                # Check if package is compromised
+                is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, version)
+                
+                if is_compromised and severity in ['CRITICAL', 'HIGH']:
+                    self.log_finding(
+                        severity,
+                        f'{"Compromised" if severity == "CRITICAL" else "Potentially compromised"} package in dependencies: {package_name}@{version}',
+                        file_path,
+                        {
+                            'package': package_name, 
+                            'version': version,
+                            'compromised_versions': compromised_versions if severity == 'CRITICAL' else []
+                        }
+                    )
+                    findings.append({
+                        'package': package_name,
+                        'version': version,
+                        'file': file_path,
+                        'type': 'potentially_compromised' if severity == 'HIGH' else 'compromised'
+                    })
+                    
+                    if severity == 'CRITICAL':
+                        self.dependency_stats['compromised_packages_found'] += 1
+                    else:
+                        self.dependency_stats['potentially_compromised_found'] += 1
+                        
+                elif package_name in self.compromised_packages and not is_compromised:
+                    # Safe version
+                    self.track_safe_package(
+                        package_name, version, compromised_versions,
+                        'safe_lock_file_dependency', file_path, depth
+                    )
                             
-        # Check dependencies in lockfile v1 format
-        if 'dependencies' in lock_data:
-            findings.extend(self._scan_dependencies_recursive(lock_data['dependencies'], file_path))
-            
         return findings
         
-    def _scan_dependencies_recursive(self, deps: Dict, file_path: str, prefix: str = '') -> List[Dict]:
-        """Recursively scan dependencies in package-lock.json"""
+    def _scan_yarn_lock(self, file_path: str) -> List[Dict]:
+        """Scan yarn.lock file (v1 and Berry) in a single streaming pass"""
         findings = []
+        seen_entries = set()
+        baseline = self.lock_baselines.get(file_path)
         
-        for package_name, package_info in deps.items():
-            version = package_info.get('version', '')
+        for package_name, version in iter_yarn_lock_entries(file_path):
+            if (package_name, version) in seen_entries:
+                continue
+            seen_entries.add((package_name, version))
+            if baseline is not None and (package_name, version) in baseline:
+                self.dependency_stats['unchanged_lock_entries_skipped'] += 1
+                continue
             
-            if version:
-                depth = len(prefix.split('/')) - 1 if prefix else 0
-                self.track_package(package_name, version, 'lock_file_dependency', file_path, depth)
-                self.dependency_stats['lock_file_packages'] += 1
+            self.track_package(package_name, version, 'yarn_lock', file_path, depth=0)
+            self.dependency_stats['lock_file_packages'] += 1
             
             # Check if package is compromised
             is_compromised, severity, compromised_versions = self.check_package_compromise(package_name, version)
             
-            if is_compromised and severity in ['CRITICAL', 'HIGH']:
+            if is_compromised and severity == 'CRITICAL':
                 self.log_finding(
-                    severity,
-                    f'{"Compromised" if severity == "CRITICAL" else "Potentially compromised"} package in dependencies: {package_name}@{version}',
+                    'CRITICAL',
+                    f'Compromised package in yarn.lock: {package_name}@{version}',
                     file_path,
-                    {
-                        'package': package_name, 
-                        'version': version,
-                        'compromised_versions': compromised_versions if severity == 'CRITICAL' else []
-                    }
+                    {'package': package_name, 'version': version}
+                )
+                findings.append({
+                    'package': package_name,
+                    'version': version,
+                    'file': file_path
+                })
+                self.dependency_stats['compromised_packages_found'] += 1
+                
+            elif is_compromised and severity == 'HIGH':
+                self.log_finding(
+                    'HIGH',
+                    f'Potentially compromised package in yarn.lock: {package_name}@{version}',
+                    file_path,
+                    {'package': package_name, 'version': version}
                 )
                 findings.append({
                     'package': package_name,
                     'version': version,
                     'file': file_path,
-                    'type': 'potentially_compromised' if severity == 'HIGH' else 'compromised'
+                    'type': 'potentially_compromised'
                 })
+                self.dependency_stats['potentially_compromised_found'] += 1
                 
-                if severity == 'CRITICAL':
-                    self.dependency_stats['compromised_packages_found'] += 1
-                else:
-                    self.dependency_stats['potentially_compromised_found'] += 1
-                    
             elif package_name in self.compromised_packages and not is_compromised:
-                # Safe version
-                depth = len(prefix.split('/')) - 1 if prefix else 0
+                # Package is in our compromised list but using a safe version
                 self.track_safe_package(
                     package_name, version, compromised_versions,
-                    'safe_lock_file_dependency', file_path, depth
+                    'safe_yarn_lock', file_path, depth=0
+                )
+                self.log_finding(
+                    'INFO',
+                    f'Safe version in yarn.lock: {package_name}@{version} (compromised: {", ".join(compromised_versions)})',
+                    file_path,
+                    {
+                        'package': package_name,
+                        'safe_version': version,
+                        'compromised_versions': compromised_versions
+                    }
                 )
-                    
-            # Recursively check nested dependencies
-            if 'dependencies' in package_info:
-                findings.extend(self._scan_dependencies_recursive(
-                    package_info['dependencies'], file_path, f"{prefix}{package_name}/"
-                ))
-                
-        return findings
-        
-    def _scan_yarn_lock(self, file_path: str) -> List[Dict]:
-        """Scan yarn.lock file"""
-        findings = []
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        # Parse yarn.lock format for our compromised packages
-        all_packages = {**self.compromised_packages}
-        for pkg_name in self.potentially_compromised:
-            all_packages[pkg_name] = {"compromised_versions": [], "safe_version": "unknown"}
-            
-        for package_name, pkg_data in all_packages.items():
-            compromised_versions = pkg_data.get('compromised_versions', [])
-            
-            # Look for package entries in yarn.lock
-            escaped_name = re.escape(package_name)
-            
-            if compromised_versions:
-                # Check for specific compromised versions
-                for comp_version in compromised_versions:
-                    pattern = rf'^{escaped_name}@.*?:\s*\n(?:\s+.*\n)*?\s+version\s+"?{re.escape(comp_version)}"?'
-                    matches = re.findall(pattern, content, re.MULTILINE)
-                    
-                    if matches:
-                        self.log_finding(
-                            'CRITICAL',
-                            f'Compromised package in yarn.lock: {package_name}@{comp_version}',
-                            file_path,
-                            {'package': package_name, 'version': comp_version}
-                        )
-                        findings.append({
-                            'package': package_name,
-                            'version': comp_version,
-                            'file': file_path
-                        })
-                        self.dependency_stats['compromised_packages_found'] += 1
-            else:
-                # Check for potentially compromised packages (any version)
-                pattern = rf'^{escaped_name}@.*?:\s*\n(?:\s+.*\n)*?\s+version\s+"?([^"]+)"?'
-                matches = re.findall(pattern, content, re.MULTILINE)
-                
-                if matches:
-                    for version in matches:
-                        self.log_finding(
-                            'HIGH',
-                            f'Potentially compromised package in yarn.lock: {package_name}@{version}',
-                            file_path,
-                            {'package': package_name, 'version': version}
-                        )
-                        findings.append({
-                            'package': package_name,
-                            'version': version,
-                            'file': file_path,
-                            'type': 'potentially_compromised'
-                        })
-                        self.dependency_stats['potentially_compromised_found'] += 1
                 
         return findings
         
     def scan_source_files(self, file_path: str) -> List[Dict]:
         """Scan source files for malicious URLs and crypto-related indicators"""
-        findings = []
+        status, entries = self.source_scanner.scan(file_path, self.max_source_file_size)
+        return self._record_source_scan(file_path, status, entries)
         
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-                
-            # Check for malicious URLs
-            for url in self.malicious_urls:
-                if url in content:
-                    self.log_finding(
-                        'HIGH',
-                        f'Malicious URL detected: {url}',
-                        file_path,
-                        {'url': url, 'context': self._extract_context(content, url)}
-                    )
-                    findings.append({
-                        'type': 'malicious_url',
-                        'url': url,
-                        'file': file_path
-                    })
-                    
-            # Check for crypto-related indicators
-            crypto_matches = []
-            for indicator in self.crypto_indicators:
-                if indicator.lower() in content.lower():
-                    crypto_matches.append(indicator)
-                    
-            if crypto_matches:
-                self.log_finding(
-                    'MEDIUM',
-                    f'Crypto-related keywords detected: {", ".join(crypto_matches)}',
-                    file_path,
-                    {'keywords': crypto_matches}
-                )
-                findings.append({
-                    'type': 'crypto_indicators',
-                    'keywords': crypto_matches,
-                    'file': file_path
-                })
-                
-            # Check for suspicious patterns
-            suspicious_matches = []
-            for pattern in self.suspicious_patterns:
-                if re.search(pattern, content):
-                    suspicious_matches.append(pattern)
-                    
-            if suspicious_matches:
-                self.log_finding(
-                    'MEDIUM',
-                    f'Suspicious code patterns detected: {len(suspicious_matches)} patterns',
-                    file_path,
-                    {'patterns': suspicious_matches}
-                )
-                findings.append({
-                    'type': 'suspicious_patterns',
-                    'patterns': suspicious_matches,
-                    'file': file_path
-                })
-                
-        except Exception as e:
-            self.log_finding('ERROR', f'Failed to scan source file {file_path}: {str(e)}', file_path)
-            
+    def scan_source_batch(self, file_paths: List[str]) -> None:
+        """Scan many source files on a thread pool, recording results in input order"""
+        for file_path, status, entries in self.source_scanner.scan_many(
+                file_paths, self.source_workers, self.max_source_file_size):
+            self.scanned_files.append(file_path)
+            self._record_source_scan(file_path, status, entries)
+        
+    def _record_source_scan(self, file_path: str, status: str, entries: List[Dict]) -> List[Dict]:
+        """Log SourceScanner entries as findings and count the file as scanned or skipped"""
+        self.source_scan_stats['scanned' if status == 'scanned' else f'skipped_{status}'] += 1
+        findings = []
+        for entry in entries:
+            self.log_finding(entry['severity'], entry['message'], file_path, entry['details'])
+            if 'type' in entry:
+                findings.append(dict(entry['details'], type=entry['type'], file=file_path))
         return findings
         
     def _extract_context(self, content: str, search_term: str, context_lines: int = 2) -> str:
         """Extract context around a found term"""
-        lines = content.split('\n')
-        for i, line in enumerate(lines):
-            if search_term in line:
-                start = max(0, i - context_lines)
-                end = min(len(lines), i + context_lines + 1)
-                return '\n'.join(lines[start:end])
-        return ''
+        offset = content.find(search_term)
+        return context_around(content, offset, context_lines) if offset >= 0 else ''
         
     def scan_directory(self, directory: str, recursive: bool = True) -> None:
         """Scan a directory for compromised packages and malicious content"""
@@ -757,49 +2687,165 @@ class NPMCompromiseDetector2025:
             self.log_finding('ERROR', f'Directory does not exist: {directory}')
             return
             
-        # Find package.json files
-        package_files = []
-        if recursive:
-            package_files = list(directory_path.rglob('package.json'))
-        else:
-            package_files = list(directory_path.glob('package.json'))
-            
-        for package_file in package_files:
-            self.scanned_files.append(str(package_file))
-            self.scan_package_json(str(package_file))
+        # Classify every file in a single pruned walk
+        walked = self.get_file_walker(recursive).walk(str(directory_path))
+        tasks = [(package_file, 'package_json') for package_file in walked['package_json']]
+        tasks += [(lock_file, 'lock_file') for lock_file in walked['package_lock'] + walked['yarn_lock']]
             
-        # Find lock files
-        lock_files = []
-        if recursive:
-            lock_files.extend(directory_path.rglob('package-lock.json'))
-            lock_files.extend(directory_path.rglob('yarn.lock'))
+        # Scan JavaScript/TypeScript files for malicious content, in chunks of files
+        # so each pool task amortises its overhead over many small sources
+        source_files = walked['source']
+        source_batches = [
+            source_files[i:i + self.SOURCE_BATCH_SIZE] for i in range(0, len(source_files), self.SOURCE_BATCH_SIZE)
+        ]
+                
+        # Installed packages of every project found, not of packages inside node_modules
+        project_dirs = sorted({
+            os.path.dirname(package_file) for package_file in walked['package_json']
+            if 'node_modules' not in Path(package_file).parts
+        })
+        walked_sources = set(source_files)
+        for project_dir in project_dirs:
+            if not os.path.isdir(os.path.join(project_dir, 'node_modules')):
+                continue
+            package_dirs = NodeModulesResolver.find_package_dirs(project_dir)
+            if self.lifecycle_script_scan:
+                self.scan_lifecycle_scripts(project_dir, package_dirs)
+            if self.payload_index:
+                # Nested node_modules are not walked, so their payloads are only found here
+                self.scan_installed_payloads(package_dirs, walked_sources)
+                
+        if self.jobs > 1 and len(tasks) + len(source_batches) > 1:
+            print(f"⚙️  Scanning {len(tasks) + len(source_files)} files with {self.jobs} worker processes")
+            run_parallel_scan(self, 'scan_file', tasks, self.jobs)
+            run_parallel_scan(self, 'scan_source_batch', [(batch,) for batch in source_batches], self.jobs)
         else:
-            lock_files.extend(directory_path.glob('package-lock.json'))
-            lock_files.extend(directory_path.glob('yarn.lock'))
-            
-        for lock_file in lock_files:
-            self.scanned_files.append(str(lock_file))
-            self.scan_lock_file(str(lock_file))
+            for file_path, kind in tasks:
+                self.scan_file(file_path, kind)
+            self.scan_source_batch(source_files)
             
-        # Scan JavaScript/TypeScript files for malicious content
-        source_extensions = ['*.js', '*.ts', '*.jsx', '*.tsx', '*.mjs', '*.cjs']
-        source_files = []
+    def scan_changed_files(self, directory: str, since_ref: str) -> bool:
+        """Scan only npm manifests and lock files changed since since_ref; returns False when git cannot tell"""
+        changes = GitChangeSet(directory, since_ref)
+        error = changes.load(self.include_node_modules)
+        if error:
+            print(f"⚠️  Cannot diff {directory} against {since_ref}: {error}")
+            return False
+        self.lock_baselines.update(changes.baselines)
+        self.incremental_stats = {'ref': since_ref, 'base': changes.base, 'files': len(changes.changed_files)}
+        print(f"🔀 {len(changes.changed_files)} npm manifests and lock files changed since {since_ref} ({changes.base[:12]})")
+        
+        tasks = [
+            (file_path, 'package_json' if file_path.endswith('package.json') else 'lock_file')
+            for file_path in changes.changed_files
+        ]
+        if self.jobs > 1 and len(tasks) > 1:
+            print(f"⚙️  Scanning {len(tasks)} files with {self.jobs} worker processes")
+            run_parallel_scan(self, 'scan_file', tasks, self.jobs)
+        else:
+            for file_path, kind in tasks:
+                self.scan_file(file_path, kind)
+        return True
+
+    def save_inventory(self, inventory: InventoryStore, repo: str) -> int:
+        """Replace repo's stored inventory with every package occurrence seen by this scan"""
+        return inventory.replace_repository(repo, inventory_rows(self))
+
+    def rematch_inventory(self, inventory: InventoryStore) -> None:
+        """Re-run the matching stage over a stored inventory against the loaded compromise database"""
+        total_rows, repo_count = inventory.counts()
+        monitored_rows = 0
+        rows = inventory.iter_rows(self.compromise_index.monitored_names)
         
-        for ext in source_extensions:
-            if recursive:
-                source_files.extend(directory_path.rglob(ext))
+        for row, severity, compromised_versions, admitted_versions in match_inventory(
+                self.compromise_index, self.range_engine, rows):
+            monitored_rows += 1
+            package_name, version, dep_type = row['package'], row['version'], row['dependency_type']
+            self.track_package(package_name, version, dep_type, row['file'], row['depth'], row['declared'])
+            details = {
+                'package': package_name,
+                'version': version,
+                'repository': row['repo'],
+                'dependency_type': dep_type,
+                'depth': row['depth']
+            }
+            
+            if admitted_versions:
+                self.log_finding(
+                    'HIGH',
+                    f'Declared range admits compromised version: {package_name}@{row["declared"]} (admits: {", ".join(admitted_versions)})',
+                    row['file'],
+                    dict(details, version=row['declared'], admitted_compromised_versions=admitted_versions,
+                         compromised_versions=compromised_versions)
+                )
+                self.dependency_stats['range_admits_compromised_found'] += 1
+            elif severity == 'CRITICAL':
+                self.log_finding(
+                    'CRITICAL', f'Compromised package in inventory: {package_name}@{version}', row['file'],
+                    dict(details, compromised_versions=compromised_versions)
+                )
+                self.dependency_stats['compromised_packages_found'] += 1
+            elif severity == 'HIGH':
+                self.log_finding(
+                    'HIGH', f'Potentially compromised package in inventory: {package_name}@{version}', row['file'],
+                    dict(details, reason='Package name in potentially compromised list')
+                )
+                self.dependency_stats['potentially_compromised_found'] += 1
             else:
-                source_files.extend(directory_path.glob(ext))
-                
-        # Limit source file scanning for performance
-        max_source_files = 200
-        if len(source_files) > max_source_files:
-            print(f"⚠️  Found {len(source_files)} source files, scanning first {max_source_files} for performance")
-            source_files = source_files[:max_source_files]
+                self.track_safe_package(
+                    package_name, version, compromised_versions, f'safe_{dep_type}', row['file'], row['depth']
+                )
+                self.log_finding(
+                    'INFO',
+                    f'Safe version in inventory: {package_name}@{version} (compromised: {", ".join(compromised_versions)})',
+                    row['file'],
+                    dict(details, safe_version=details.pop('version'), compromised_versions=compromised_versions)
+                )
                 
-        for source_file in source_files:
-            self.scanned_files.append(str(source_file))
-            self.scan_source_files(str(source_file))
+        self.rematch_stats = {
+            'rows': total_rows,
+            'repositories': repo_count,
+            'monitored_rows': monitored_rows,
+            'path': inventory.db_path
+        }
+        
+    def scan_lifecycle_scripts(self, project_dir: str, package_dirs: Optional[List[str]] = None) -> None:
+        """Report preinstall/install/postinstall scripts in project_dir/node_modules that match indicators"""
+        checked, packages = self.lifecycle_scanner.scan(project_dir, package_dirs)
+        self.dependency_stats['installed_packages_checked'] += checked
+        self.dependency_stats['lifecycle_scripts_found'] += sum(len(info['scripts']) for info in packages)
+        
+        for info in packages:
+            for script_name, (severity, indicators) in info['matches'].items():
+                self.log_finding(
+                    severity,
+                    f"Suspicious {script_name} script in {info['package']}@{info['version']}: {', '.join(indicators)}",
+                    info['file'],
+                    {
+                        'package': info['package'],
+                        'version': info['version'],
+                        'script': script_name,
+                        'script_text': info['scripts'][script_name],
+                        'indicators': indicators
+                    }
+                )
+            
+    def scan_installed_payloads(self, package_dirs: List[str], skip: Set[str] = frozenset()) -> None:
+        """Report known payload files in installed packages, leaving out paths the source scan hashes"""
+        scan_package_dir = partial(self.payload_index.scan_package_dir, skip=skip)
+        with ThreadPoolExecutor(max_workers=self.source_workers) as executor:
+            for matches in executor.map(scan_package_dir, package_dirs):
+                for file_path, digest, entry, size in matches:
+                    self.log_finding('CRITICAL', PayloadHashIndex.describe(entry), file_path,
+                                     {'sha256': digest, 'size': size})
+            
+    def scan_file(self, file_path: str, kind: str) -> None:
+        """Scan one walked manifest or lock file; kind is 'package_json' or 'lock_file'"""
+        self.scanned_files.append(file_path)
+        if kind == 'package_json':
+            self.scan_package_json(file_path)
+        else:
+            self.scan_lock_file(file_path)
             
     def generate_report(self, output_file: str = None) -> str:
         """Generate a comprehensive security report"""
@@ -818,10 +2864,7 @@ class NPMCompromiseDetector2025:
         report_lines.append("")
         
         # Summary by severity
-        severity_counts = {}
-        for finding in self.findings:
-            severity = finding['severity']
-            severity_counts[severity] = severity_counts.get(severity, 0) + 1
+        severity_counts = self.findings.severity_counts
             
         # Package analysis summary
         report_lines.append("PACKAGE ANALYSIS SUMMARY:")
@@ -831,9 +2874,35 @@ class NPMCompromiseDetector2025:
         report_lines.append(f"Lock file packages: {self.dependency_stats['lock_file_packages']}")
         if self.full_tree_analysis:
             report_lines.append(f"Tree resolved packages: {self.dependency_stats['tree_resolved_packages']}")
+        if self.dependency_stats['installed_packages_checked']:
+            report_lines.append(
+                f"Lifecycle scripts: {self.dependency_stats['lifecycle_scripts_found']} in "
+                f"{self.dependency_stats['installed_packages_checked']} installed packages"
+            )
         report_lines.append(f"Compromised packages found: {self.dependency_stats['compromised_packages_found']}")
         report_lines.append(f"Potentially compromised found: {self.dependency_stats['potentially_compromised_found']}")
+        report_lines.append(f"Ranges admitting compromised versions: {self.dependency_stats['range_admits_compromised_found']}")
         report_lines.append(f"Safe versions found: {self.dependency_stats['safe_packages_found']}")
+        skipped_sources = self.source_scan_stats['skipped_too_large'] + self.source_scan_stats['skipped_unreadable']
+        report_lines.append(f"Source files scanned: {self.source_scan_stats['scanned']}")
+        report_lines.append(
+            f"Source files skipped: {skipped_sources} "
+            f"(over size limit: {self.source_scan_stats['skipped_too_large']}, "
+            f"unreadable: {self.source_scan_stats['skipped_unreadable']})"
+        )
+        cache_scope = " (main process only)" if self.jobs > 1 else ""
+        report_lines.append(f"Version cache{cache_scope}: {format_version_cache_stats(version_cache_stats(self.range_engine))}")
+        if self.scan_cache_path:
+            report_lines.append(format_scan_cache_stats(self.scan_cache_stats, self.scan_cache_path))
+        if self.rematch_stats:
+            report_lines.append(
+                f"Rematched inventory: {self.rematch_stats['rows']} entries from "
+                f"{self.rematch_stats['repositories']} repositories in {self.rematch_stats['path']} "
+                f"({self.rematch_stats['monitored_rows']} with a verdict, database {self.compromise_index.version})"
+            )
+        if self.incremental_stats:
+            report_lines.append(format_incremental_stats(
+                self.incremental_stats, self.dependency_stats['unchanged_lock_entries_skipped']))
         report_lines.append("")
         
         # Package source breakdown
@@ -873,10 +2942,18 @@ class NPMCompromiseDetector2025:
                             report_lines.append(f"   📦 Type: {value}")
                         elif key == 'compromised_versions' and value:
                             report_lines.append(f"   ⚠️  Compromised versions: {', '.join(value)}")
+                        elif key == 'admitted_compromised_versions':
+                            report_lines.append(f"   🎯 Range admits: {', '.join(value)}")
                         elif key in ['package', 'version', 'safe_version', 'normalized_version']:
                             report_lines.append(f"   {key}: {value}")
                         elif key == 'reason':
                             report_lines.append(f"   💡 Reason: {value}")
+                        elif key == 'offsets':
+                            continue  # Kept in the JSON report; 'offset' already renders the first hit's context
+                        elif key == 'offset' and finding['file']:
+                            # Source hits carry only a byte offset; read the context now that it is reported
+                            report_lines.append(f"   context: {extract_context_at(finding['file'], value)}")
+                            report_lines.append(f"   {key}: {value}")
                         else:
                             report_lines.append(f"   {key}: {value}")
                 report_lines.append("")
@@ -913,8 +2990,8 @@ class NPMCompromiseDetector2025:
         report_lines.append("RECOMMENDATIONS:")
         report_lines.append("-" * 20)
         
-        critical_findings = [f for f in self.findings if f['severity'] == 'CRITICAL']
-        high_findings = [f for f in self.findings if f['severity'] == 'HIGH']
+        critical_findings = self.findings.count('CRITICAL')
+        high_findings = self.findings.count('HIGH')
         
         if critical_findings:
             report_lines.append("🚨 IMMEDIATE ACTION REQUIRED:")
@@ -975,8 +3052,30 @@ def main():
                        help='Do not scan subdirectories')
     parser.add_argument('--full-tree', action='store_true',
                        help='Enable full dependency tree analysis (slower but comprehensive)')
+    parser.add_argument('--npm-fallback', action='store_true',
+                       help='With --full-tree, fall back to `npm list` when node_modules is not installed')
     parser.add_argument('--quiet', '-q', action='store_true',
                        help='Only show critical and high severity findings')
+    parser.add_argument('--include-node-modules', action='store_true',
+                       help='Installed-package mode: also walk into node_modules nested inside node_modules')
+    parser.add_argument('--max-depth', type=int,
+                       help='Maximum directory depth to walk (default: unlimited)')
+    parser.add_argument('--follow-symlinks', action='store_true',
+                       help='Follow symlinked directories while walking')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                       help='Scan files in N worker processes (default: 1)')
+    parser.add_argument('--scan-cache', nargs='?', const=ScanCache.DEFAULT_PATH, metavar='PATH',
+                       help=f'Reuse lock file results from a SQLite cache (default path: {ScanCache.DEFAULT_PATH})')
+    parser.add_argument('--inventory', nargs='?', const=InventoryStore.DEFAULT_PATH, metavar='PATH',
+                       help=f'Save every package seen to a SQLite inventory (default path: {InventoryStore.DEFAULT_PATH})')
+    parser.add_argument('--rematch', nargs='?', const=InventoryStore.DEFAULT_PATH, metavar='PATH',
+                       help='Match a stored inventory against the current database instead of scanning')
+    parser.add_argument('--since', metavar='REF',
+                       help='Only scan npm manifests and lock files changed since REF, matching only new lock file entries')
+    parser.add_argument('--no-lifecycle-scripts', action='store_true',
+                       help='Do not check install scripts of packages in node_modules')
+    parser.add_argument('--max-source-size', type=float, default=SourceScanner.DEFAULT_MAX_FILE_SIZE / (1024 * 1024),
+                       help='Skip source files larger than this many MB (default: 64, 0 = no limit)')
     
     args = parser.parse_args()
     
@@ -988,14 +3087,41 @@ def main():
     if args.full_tree:
         detector.enable_full_tree_analysis(True)
         print("🌳 Full dependency tree analysis enabled")
+    if args.npm_fallback:
+        detector.enable_npm_tree_fallback(True)
+        print("🧰 npm list fallback enabled for uninstalled projects")
+        
+    if args.include_node_modules:
+        detector.enable_installed_package_scan(True)
+        print("📦 Installed-package mode enabled (scanning nested node_modules)")
+    detector.max_depth = args.max_depth
+    detector.follow_symlinks = args.follow_symlinks
+    detector.jobs = max(1, args.jobs)
+    if args.scan_cache:
+        detector.enable_scan_cache(db_path=args.scan_cache)
+    detector.enable_lifecycle_script_scan(not args.no_lifecycle_scripts)
+    detector.max_source_file_size = int(args.max_source_size * 1024 * 1024)
     
-    print(f"📁 Scanning directory: {os.path.abspath(args.directory)}")
-    if args.full_tree:
-        print("⚠️  Full tree analysis may take longer but will find all transitive dependencies")
-    print()
-    
-    # Scan directory
-    detector.scan_directory(args.directory, recursive=not args.no_recursive)
+    if args.rematch:
+        # Matching stage only: no files are read, the stored inventory stands in for the scan
+        print(f"🔁 Rematching inventory: {os.path.abspath(args.rematch)}")
+        print()
+        detector.rematch_inventory(InventoryStore(args.rematch))
+    else:
+        print(f"📁 Scanning directory: {os.path.abspath(args.directory)}")
+        if args.full_tree:
+            print("⚠️  Full tree analysis may take longer but will find all transitive dependencies")
+        print()
+        
+        # Scan directory, or only what changed since --since when git can tell
+        if not args.since or not detector.scan_changed_files(args.directory, args.since):
+            detector.scan_directory(args.directory, recursive=not args.no_recursive)
+        
+        if args.inventory and detector.incremental_stats:
+            print("⚠️  Inventory not saved: a --since scan only covers changed files")
+        elif args.inventory:
+            saved_rows = detector.save_inventory(InventoryStore(args.inventory), os.path.abspath(args.directory))
+            print(f"🗃️  Saved {saved_rows} inventory entries to {args.inventory}")
     
     # Generate and display report
     report = detector.generate_report(args.output)
@@ -1003,8 +3129,8 @@ def main():
     if not args.quiet:
         print(report)
     else:
-        critical_findings = [f for f in detector.findings if f['severity'] == 'CRITICAL']
-        high_findings = [f for f in detector.findings if f['severity'] == 'HIGH']
+        critical_findings = detector.findings.by_severity('CRITICAL')
+        high_findings = detector.findings.by_severity('HIGH')
         
         if critical_findings:
             print("🚨 CRITICAL FINDINGS DETECTED!")
@@ -1024,7 +3150,7 @@ def main():
             print("✅ No critical or high priority findings detected")
     
     # Exit with error code if critical or high findings
-    critical_count = len([f for f in detector.findings if f['severity'] in ['CRITICAL', 'HIGH']])
+    critical_count = detector.findings.count('CRITICAL', 'HIGH')
     sys.exit(1 if critical_count > 0 else 0)
 
 
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Prune-rule tests for the single-pass FileWalker
+A project's own node_modules is walked; node_modules nested inside another
+node_modules only in installed-package mode; .git never by default
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from npm_package_compromise_detector_2025 import FileWalker, in_nested_node_modules
+
+
+TREE = [
+    'package.json',
+    'package-lock.json',
+    'src/index.ts',
+    '.git/hooks/post-checkout.js',
+    'node_modules/a/package.json',
+    'node_modules/a/index.js',
+    'node_modules/@ctrl/tinycolor/package.json',
+    'node_modules/a/node_modules/b/package.json',
+    'node_modules/a/node_modules/b/bundle.js',
+    'packages/web/package.json',
+    'packages/web/yarn.lock',
+    'packages/web/node_modules/c/package.json',
+]
+
+NESTED = {'node_modules/a/node_modules/b/package.json', 'node_modules/a/node_modules/b/bundle.js'}
+
+
+class FileWalkerPruneTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        for path in TREE:
+            full_path = os.path.join(self.root, *path.split('/'))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'w', encoding='utf-8') as f:
+                f.write('{}')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def walk(self, **options) -> set:
+        walked = FileWalker(**options).walk(self.root)
+        return {os.path.relpath(path, self.root).replace(os.sep, '/') for paths in walked.values() for path in paths}
+
+    def test_top_level_node_modules_walked_nested_pruned(self):
+        expected = set(TREE) - NESTED - {'.git/hooks/post-checkout.js'}
+        self.assertEqual(self.walk(), expected)
+
+    def test_installed_package_mode_walks_nested_node_modules(self):
+        self.assertEqual(self.walk(include_node_modules=True), set(TREE) - {'.git/hooks/post-checkout.js'})
+
+    def test_max_depth_zero_walks_root_only(self):
+        self.assertEqual(self.walk(max_depth=0), {'package.json', 'package-lock.json'})
+
+    def test_git_paths_follow_the_same_rule(self):
+        for path in TREE:
+            with self.subTest(path=path):
+                self.assertEqual(in_nested_node_modules(path.split('/')), path in NESTED)
+
+
+if __name__ == '__main__':
+    unittest.main()
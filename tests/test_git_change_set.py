@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for --since incremental scans driven by GitChangeSet
+A temporary git repository with two npm projects: only projects whose npm
+files changed since the ref are rescanned, only new lock file entries are
+matched, and an unknown ref falls back cleanly instead of crashing
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from npm_package_compromise_detector_2025 import GitChangeSet, NPMCompromiseDetector2025
+
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='Test', GIT_AUTHOR_EMAIL='test@example.com',
+               GIT_COMMITTER_NAME='Test', GIT_COMMITTER_EMAIL='test@example.com')
+CLEAN_PACKAGES = {'left-pad': '1.3.0', 'lodash': '4.17.21', 'chalk': '5.3.0'}
+
+
+def lockfile(name: str, packages: dict) -> dict:
+    entries = {'': {'name': name, 'version': '1.0.0'}}
+    entries.update({f'node_modules/{package}': {'version': version} for package, version in packages.items()})
+    return {'name': name, 'lockfileVersion': 3, 'requires': True, 'packages': entries}
+
+
+@unittest.skipUnless(shutil.which('git'), 'git is not installed')
+class GitChangeSetTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.realpath(self.temp_dir.name)
+        self.git('init', '--quiet')
+        self.git('checkout', '--quiet', '-b', 'main')
+        for project in ('web', 'api'):
+            self.write(f'{project}/package.json', {'name': project, 'version': '1.0.0', 'dependencies': CLEAN_PACKAGES})
+            self.write(f'{project}/package-lock.json', lockfile(project, CLEAN_PACKAGES))
+        self.write('docs/README.md', 'docs')
+        self.commit('base')
+        self.git('tag', 'base')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def git(self, *args: str) -> str:
+        return subprocess.run(['git', '-C', self.root, *args], capture_output=True, text=True,
+                              check=True, env=GIT_ENV).stdout.strip()
+
+    def write(self, path: str, content):
+        full_path = os.path.join(self.root, *path.split('/'))
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, 'w', encoding='utf-8') as f:
+            f.write(content if isinstance(content, str) else json.dumps(content, indent=2))
+
+    def commit(self, message: str):
+        self.git('add', '-A')
+        self.git('commit', '--quiet', '-m', message)
+
+    def scan_since(self, ref: str):
+        with contextlib.redirect_stdout(io.StringIO()):
+            detector = NPMCompromiseDetector2025(os.path.join(REPO_DIR, 'compromised_packages_2025.json'))
+            scanned = detector.scan_changed_files(self.root, ref)
+        return detector, scanned
+
+    def test_only_changed_projects_rescanned(self):
+        self.write('web/package-lock.json', lockfile('web', dict(CLEAN_PACKAGES, **{'@ctrl/tinycolor': '4.1.1'})))
+        self.write('docs/README.md', 'docs, edited')
+        self.write('api/src/index.js', 'module.exports = 1;')
+        self.commit('change web lock file and non-npm files')
+
+        detector, scanned = self.scan_since('base')
+        self.assertTrue(scanned)
+        self.assertEqual(detector.scanned_files, [os.path.join(self.root, 'web', 'package-lock.json')])
+        self.assertEqual(detector.incremental_stats['files'], 1)
+        # The root entry and the three unchanged packages are skipped; only the new one is matched
+        self.assertEqual(detector.dependency_stats['unchanged_lock_entries_skipped'], 1 + len(CLEAN_PACKAGES))
+        messages = [finding['message'] for finding in detector.findings if finding['severity'] == 'CRITICAL']
+        self.assertTrue(messages)
+        self.assertTrue(all('@ctrl/tinycolor' in message for message in messages))
+
+    def test_uncommitted_and_new_files_count(self):
+        self.write('api/package.json', {'name': 'api', 'version': '1.0.1', 'dependencies': CLEAN_PACKAGES})
+        self.write('worker/yarn.lock', '# yarn lockfile v1\n')
+        self.git('add', 'worker/yarn.lock')
+
+        changes = GitChangeSet(self.root, 'base')
+        self.assertIsNone(changes.load())
+        self.assertEqual(sorted(changes.changed_files), [os.path.join(self.root, 'api', 'package.json'),
+                                                         os.path.join(self.root, 'worker', 'yarn.lock')])
+        self.assertEqual(changes.baselines, {os.path.join(self.root, 'worker', 'yarn.lock'): frozenset()})
+
+    def test_target_branch_commits_after_fork_are_ignored(self):
+        self.git('checkout', '--quiet', '-b', 'feature')
+        self.write('web/package.json', {'name': 'web', 'version': '1.1.0', 'dependencies': CLEAN_PACKAGES})
+        self.commit('feature change')
+        self.git('checkout', '--quiet', 'main')
+        self.write('api/package-lock.json', lockfile('api', dict(CLEAN_PACKAGES, extra='1.0.0')))
+        self.commit('main moved on')
+        self.git('checkout', '--quiet', 'feature')
+
+        changes = GitChangeSet(self.root, 'main')
+        self.assertIsNone(changes.load())
+        self.assertEqual(changes.base, self.git('rev-parse', 'base'))
+        self.assertEqual(changes.changed_files, [os.path.join(self.root, 'web', 'package.json')])
+
+    def test_unknown_ref_fails_cleanly(self):
+        changes = GitChangeSet(self.root, 'no-such-ref')
+        self.assertTrue(changes.load())
+        self.assertEqual(changes.changed_files, [])
+
+        detector, scanned = self.scan_since('no-such-ref')
+        self.assertFalse(scanned)
+        self.assertEqual(detector.scanned_files, [])
+        self.assertIsNone(detector.incremental_stats)
+
+    def test_cli_falls_back_to_full_scan_on_unknown_ref(self):
+        result = subprocess.run(
+            [sys.executable, os.path.join(REPO_DIR, 'npm_package_compromise_detector_2025.py'), self.root,
+             '--since', 'no-such-ref', '--output', os.path.join(self.root, 'report.txt')],
+            cwd=REPO_DIR, capture_output=True, text=True, timeout=120)
+        self.assertNotIn('Traceback', result.stderr)
+        self.assertIn('Cannot diff', result.stdout)
+        with open(os.path.join(self.root, 'report.txt'), 'r', encoding='utf-8') as f:
+            report = f.read()
+        self.assertIn('Files scanned: 4', report)
+        self.assertNotIn('Incremental scan', report)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent git mirrors used by the Phoenix repository scanner
+A `git init --bare` repository under a temporary directory stands in for the
+remote: mirrors are cloned and fetched from it, refs and files resolved from
+the mirror's objects, and failed clones and deleted worktrees cleaned up
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from git_mirror_store import GitBlobReader, GitMirrorStore
+
+
+GIT_ENV = dict(os.environ, GIT_AUTHOR_NAME='Test', GIT_AUTHOR_EMAIL='test@example.com',
+               GIT_COMMITTER_NAME='Test', GIT_COMMITTER_EMAIL='test@example.com')
+MANIFEST_NAMES = ('package.json', 'package-lock.json', 'yarn.lock')
+
+
+def git(*args: str) -> str:
+    return subprocess.run(['git', *args], capture_output=True, text=True, check=True, env=GIT_ENV).stdout.strip()
+
+
+@unittest.skipUnless(shutil.which('git'), 'git is not installed')
+class GitMirrorStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = self.temp_dir.name
+        self.remote = os.path.join(root, 'remote.git')
+        self.work = os.path.join(root, 'work')
+        git('init', '--quiet', '--bare', self.remote)
+        git('-C', self.remote, 'config', 'uploadpack.allowFilter', 'true')
+        git('-C', self.remote, 'config', 'uploadpack.allowAnySHA1InWant', 'true')
+        git('init', '--quiet', self.work)
+        git('-C', self.work, 'checkout', '--quiet', '-b', 'main')
+        self.commit({'package.json': {'name': 'app', 'version': '1.0.0'},
+                     'packages/web/package-lock.json': {'lockfileVersion': 3, 'packages': {}},
+                     'node_modules/a/node_modules/b/package.json': {'name': 'b'},
+                     'README.md': 'readme'})
+        git('-C', self.work, 'remote', 'add', 'origin', self.remote)
+        git('-C', self.work, 'push', '--quiet', 'origin', 'main')
+        git('-C', self.remote, 'symbolic-ref', 'HEAD', 'refs/heads/main')
+        self.url = 'file://' + self.remote
+        self.store = GitMirrorStore(os.path.join(root, 'mirrors'))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def commit(self, files: dict, message: str = 'update'):
+        for path, content in files.items():
+            full_path = os.path.join(self.work, *path.split('/'))
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, 'w', encoding='utf-8') as f:
+                f.write(content if isinstance(content, str) else json.dumps(content))
+        git('-C', self.work, 'add', '-A')
+        git('-C', self.work, 'commit', '--quiet', '-m', message)
+
+    def test_clone_then_fetch_new_and_deleted_refs(self):
+        mirror_path, action = self.store.update(self.url)
+        self.assertEqual(action, 'cloned')
+        self.assertEqual(mirror_path, self.store.mirror_path(self.url))
+        self.assertEqual([ref for ref, _ in self.store.list_refs(mirror_path)], ['heads/main'])
+
+        git('-C', self.work, 'checkout', '--quiet', '-b', 'feature')
+        self.commit({'package.json': {'name': 'app', 'version': '2.0.0'}})
+        git('-C', self.work, 'push', '--quiet', 'origin', 'feature')
+        git('-C', self.work, 'tag', 'v2')
+        git('-C', self.work, 'push', '--quiet', 'origin', 'v2')
+        self.assertEqual(self.store.update(self.url), (mirror_path, 'fetched'))
+        self.assertEqual(sorted(ref for ref, _ in self.store.list_refs(mirror_path)),
+                         ['heads/feature', 'heads/main', 'tags/v2'])
+
+        git('-C', self.work, 'push', '--quiet', 'origin', '--delete', 'feature')
+        self.store.update(self.url)
+        self.assertEqual(sorted(ref for ref, _ in self.store.list_refs(mirror_path)), ['heads/main', 'tags/v2'])
+
+    def test_unreachable_remote_is_stale_not_lost(self):
+        mirror_path, _ = self.store.update(self.url)
+        shutil.rmtree(self.remote)
+        self.assertEqual(self.store.update(self.url), (mirror_path, 'stale'))
+        self.assertTrue(self.store.list_files(mirror_path, 'HEAD', MANIFEST_NAMES))
+
+    def test_list_files_resolves_refs_and_blobs(self):
+        mirror_path, _ = self.store.update(self.url, blobless=False)
+        files = dict((path, object_id) for object_id, path in self.store.list_files(mirror_path, 'HEAD', MANIFEST_NAMES))
+        self.assertEqual(sorted(files), ['package.json', 'packages/web/package-lock.json'])
+        with_nested = self.store.list_files(mirror_path, 'heads/main', MANIFEST_NAMES, include_node_modules=True)
+        self.assertIn('node_modules/a/node_modules/b/package.json', [path for _, path in with_nested])
+
+        with GitBlobReader(mirror_path) as reader:
+            self.assertEqual(json.loads(reader.read(files['package.json'])), {'name': 'app', 'version': '1.0.0'})
+            self.assertEqual(reader.read('main:package.json'), reader.read(files['package.json']))
+            self.assertIsNone(reader.read('main:missing.json'))
+            self.assertIsNone(reader.read('0' * 40))
+
+    def test_blobless_mirror_fetches_missing_blobs_once(self):
+        mirror_path, _ = self.store.update(self.url, blobless=True)
+        files = self.store.list_files(mirror_path, 'HEAD', MANIFEST_NAMES)
+        object_ids = [object_id for object_id, _ in files]
+        self.assertEqual(self.store.fetch_missing_blobs(mirror_path, ['HEAD'], object_ids), len(object_ids))
+        self.assertEqual(self.store.fetch_missing_blobs(mirror_path, ['HEAD'], object_ids), 0)
+        with GitBlobReader(mirror_path) as reader:
+            self.assertIsNotNone(reader.read(object_ids[0]))
+
+    def test_failed_clone_leaves_nothing_behind(self):
+        missing_url = 'file://' + os.path.join(self.temp_dir.name, 'missing.git')
+        mirror_path, error = self.store.update(missing_url)
+        self.assertIsNone(mirror_path)
+        self.assertTrue(error)
+        self.assertEqual(os.listdir(self.store.root), [])
+
+    def test_deleted_worktree_is_pruned_on_next_checkout(self):
+        mirror_path, _ = self.store.update(self.url, blobless=False)
+        first = os.path.join(self.temp_dir.name, 'checkout-1')
+        self.assertEqual(self.store.add_worktree(mirror_path, first, ('/package.json',)).returncode, 0)
+        self.assertEqual(sorted(os.listdir(first)), ['.git', 'package.json'])
+
+        shutil.rmtree(first)
+        second = os.path.join(self.temp_dir.name, 'checkout-2')
+        self.assertEqual(self.store.add_worktree(mirror_path, second).returncode, 0)
+        worktrees = git('-C', mirror_path, 'worktree', 'list', '--porcelain')
+        self.assertNotIn(first, worktrees)
+        self.assertIn(second, worktrees)
+        self.assertTrue(os.path.exists(os.path.join(second, 'packages', 'web', 'package-lock.json')))
+
+
+if __name__ == '__main__':
+    unittest.main()
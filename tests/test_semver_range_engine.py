@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Table-driven tests for SemverRangeEngine
+npm range semantics (caret/tilde on 0.x, hyphen ranges, ||, x-ranges and
+prerelease handling) over a synthetic version list, and agreement with the
+baseline exact-match check for every version in the compromise database
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import json
+import os
+import sys
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from npm_package_compromise_detector_2025 import CompromiseIndex, SemverRangeEngine, encode_version
+
+
+VERSIONS = ['0.0.1', '0.0.2', '0.1.0', '0.1.5', '0.2.0', '1.0.0', '1.2.3', '1.2.4-beta.1', '1.2.4', '1.3.0',
+            '2.0.0-rc.1', '2.0.0', '3.1.4']
+RELEASES = [version for version in VERSIONS if '-' not in version]
+ZERO_X = ['0.0.1', '0.0.2', '0.1.0', '0.1.5', '0.2.0']
+
+# (range, compromised versions it admits)
+RANGE_TABLE = [
+    # Caret: the first non-zero component is fixed, so 0.x ranges are much narrower
+    ('^0.0.1', ['0.0.1']),
+    ('^0.0', ['0.0.1', '0.0.2']),
+    ('^0.1.0', ['0.1.0', '0.1.5']),
+    ('^0', ZERO_X),
+    ('^1.2.3', ['1.2.3', '1.2.4', '1.3.0']),
+    # Tilde: patch-level changes, or minor-level when only the major is given
+    ('~0.0.1', ['0.0.1', '0.0.2']),
+    ('~0.1.2', ['0.1.5']),
+    ('~1.2', ['1.2.3', '1.2.4']),
+    ('~1', ['1.0.0', '1.2.3', '1.2.4', '1.3.0']),
+    ('~>1.2.3', ['1.2.3', '1.2.4']),
+    # Hyphen ranges: inclusive, a partial upper bound admits the whole of it
+    ('1.2.3 - 2.0.0', ['1.2.3', '1.2.4', '1.3.0', '2.0.0']),
+    ('1.2 - 2', ['1.2.3', '1.2.4', '1.3.0', '2.0.0']),
+    ('0.1.0 - 0.1.5', ['0.1.0', '0.1.5']),
+    # Unions
+    ('<0.1.0 || >=3.0.0', ['0.0.1', '0.0.2', '3.1.4']),
+    ('0.0.2 || 1.3.0', ['0.0.2', '1.3.0']),
+    ('0.x || 3', ZERO_X + ['3.1.4']),
+    ('^0.0.1 || ~1.2', ['0.0.1', '1.2.3', '1.2.4']),
+    # Prereleases only match a range naming a prerelease on the same major.minor.patch
+    ('1.2.4-beta.1', ['1.2.4-beta.1']),
+    ('>=1.2.4-beta.0 <1.3.0', ['1.2.4-beta.1', '1.2.4']),
+    ('^1.2.4-beta.0', ['1.2.4-beta.1', '1.2.4', '1.3.0']),
+    ('>=2.0.0-rc.0', ['2.0.0-rc.1', '2.0.0', '3.1.4']),
+    ('1.0.0 - 1.2.4-beta.1', ['1.0.0', '1.2.3', '1.2.4-beta.1']),
+    ('>1.3.0', ['2.0.0', '3.1.4']),
+    ('^1.0.0', ['1.0.0', '1.2.3', '1.2.4', '1.3.0']),
+    # X-ranges and partial versions
+    ('*', RELEASES),
+    ('', RELEASES),
+    ('x', RELEASES),
+    ('1.x', ['1.0.0', '1.2.3', '1.2.4', '1.3.0']),
+    ('1.2.x', ['1.2.3', '1.2.4']),
+    ('1.X.3', ['1.0.0', '1.2.3', '1.2.4', '1.3.0']),
+    ('2', ['2.0.0']),
+    ('<=1.2', ZERO_X + ['1.0.0', '1.2.3', '1.2.4']),
+    ('>1.2', ['1.3.0', '2.0.0', '3.1.4']),
+    ('<1', ZERO_X),
+    # Exact versions and spacing
+    ('1.0.0', ['1.0.0']),
+    ('=1.0.0', ['1.0.0']),
+    ('= 1.0.0', ['1.0.0']),
+    ('v1.0.0', ['1.0.0']),
+    ('>= 1.2.3 < 1.3.0', ['1.2.3', '1.2.4']),
+    ('1.2.5', []),
+    # Not semver ranges: tags, aliases, git and file specs
+    ('latest', []),
+    ('npm:other@1.0.0', []),
+    ('github:owner/repo', []),
+    ('file:../local', []),
+]
+
+
+def baseline_exact_match(version_list, version: str) -> list:
+    """What the pre-engine detector reported: the version if it is listed verbatim"""
+    return [version] if version in version_list else []
+
+
+class SemverRangeEngineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = SemverRangeEngine(CompromiseIndex({'pkg': {'compromised_versions': VERSIONS}}, set()))
+
+    def test_range_table(self):
+        for range_spec, expected in RANGE_TABLE:
+            with self.subTest(range_spec=range_spec):
+                self.assertEqual(self.engine.admitted_versions('pkg', range_spec), expected)
+
+    def test_unmonitored_package_admits_nothing(self):
+        self.assertEqual(self.engine.admitted_versions('other', '*'), [])
+
+    def test_parse_cache_reused(self):
+        self.engine.admitted_versions('pkg', '^1.2.3')
+        self.engine.admitted_versions('pkg', '^1.2.3')
+        self.assertEqual(self.engine.cache_info().hits, 1)
+
+
+class DatabaseExactMatchTest(unittest.TestCase):
+    """Exact versions must give the same answer as the baseline string comparison"""
+
+    @classmethod
+    def setUpClass(cls):
+        with open(os.path.join(REPO_DIR, 'compromised_packages_2025.json'), 'r', encoding='utf-8') as f:
+            cls.compromised = json.load(f)['compromised_packages']
+        cls.engine = SemverRangeEngine(CompromiseIndex(cls.compromised, set()))
+
+    def test_every_database_version_matches_itself_only(self):
+        for package_name, data in self.compromised.items():
+            versions = data.get('compromised_versions', [])
+            for version in versions:
+                if encode_version(version) is None:
+                    continue
+                with self.subTest(package=package_name, version=version):
+                    self.assertEqual(self.engine.admitted_versions(package_name, version),
+                                     baseline_exact_match(versions, version))
+                    self.assertEqual(self.engine.admitted_versions(package_name, '=' + version), [version])
+
+    def test_neighbouring_versions_match_nothing(self):
+        for package_name, data in self.compromised.items():
+            versions = data.get('compromised_versions', [])
+            for version in versions:
+                encoded = encode_version(version)
+                if encoded is None or encoded[3] != (1,):
+                    continue
+                neighbour = f"{encoded[0]}.{encoded[1]}.{encoded[2] + 1000}"
+                with self.subTest(package=package_name, version=neighbour):
+                    self.assertEqual(self.engine.admitted_versions(package_name, neighbour),
+                                     baseline_exact_match(versions, neighbour))
+
+
+if __name__ == '__main__':
+    unittest.main()
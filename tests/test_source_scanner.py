@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the byte-level source scanner on large, hit-dense bundles
+Hits are counted with a bounded number of offsets kept, each hit is counted
+once across overlapping chunks, and peak RSS does not grow with file size
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from npm_package_compromise_detector_2025 import IndicatorMatcher, SourceScanner
+
+
+HIT_DENSE_LINE = b'var a=fetch(x);eval(y);localStorage.getItem("wallet");"npmjs.help";\n'
+
+# Scans one file in a fresh interpreter and prints its peak RSS in KB
+RSS_PROBE = """
+import resource, sys
+sys.path.insert(0, sys.argv[1])
+from npm_package_compromise_detector_2025 import IndicatorMatcher, SourceScanner
+matcher = IndicatorMatcher({'domains': ['npmjs.help']}, ['wallet'], ['localStorage'], [r'eval\\s*\\('])
+status, entries = SourceScanner(matcher).scan(sys.argv[2], None)
+assert status == 'scanned' and entries, status
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def make_matcher() -> IndicatorMatcher:
+    return IndicatorMatcher({'domains': ['npmjs.help']}, ['wallet'], ['localStorage'], [r'eval\s*\('])
+
+
+def write_bundle(directory: str, name: str, lines: int) -> str:
+    """Write a minified-style bundle of lines hit-dense lines, in blocks"""
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        for block_start in range(0, lines, 10000):
+            f.write(HIT_DENSE_LINE * min(10000, lines - block_start))
+    return path
+
+
+class IndicatorMatcherHitsTest(unittest.TestCase):
+
+    def test_hits_are_counted_with_capped_offsets(self):
+        hits = make_matcher().all_hits(HIT_DENSE_LINE * 1000)
+        wallet = hits['crypto_indicators']['wallet']
+        self.assertEqual(wallet['count'], 1000)
+        self.assertEqual(len(wallet['offsets']), IndicatorMatcher.MAX_OFFSETS)
+        first = HIT_DENSE_LINE.find(b'wallet')
+        self.assertEqual(wallet['offsets'][:2], [first, first + len(HIT_DENSE_LINE)])
+
+    def test_overlapping_chunks_count_each_hit_once(self):
+        matcher = make_matcher()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = write_bundle(temp_dir, 'bundle.js', 5000)
+            expected = SourceScanner(matcher, mmap_threshold=1 << 40).scan(path, None)
+            for chunk_size, mmap_threshold in ((4096, 1 << 40), (4096, 0), (65536, 0)):
+                with self.subTest(chunk_size=chunk_size, mmap=mmap_threshold == 0):
+                    scanner = SourceScanner(matcher, chunk_size=chunk_size, mmap_threshold=mmap_threshold)
+                    self.assertEqual(scanner.scan(path, None), expected)
+        url_entry = expected[1][0]
+        self.assertEqual(url_entry['details']['hit_count'], 5000)
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), 'ru_maxrss is reported in KB on Linux')
+class SourceScannerMemoryTest(unittest.TestCase):
+
+    def peak_rss_kb(self, path: str) -> int:
+        result = subprocess.run([sys.executable, '-c', RSS_PROBE, REPO_DIR, path],
+                                capture_output=True, text=True, check=True)
+        return int(result.stdout.strip())
+
+    def test_peak_rss_flat_across_bundle_sizes(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            small = self.peak_rss_kb(write_bundle(temp_dir, 'small.js', 30000))   # ~2 MB
+            large = self.peak_rss_kb(write_bundle(temp_dir, 'large.js', 360000))  # ~25 MB, ~1.4M hits
+        # Storing every hit offset grew this by about 40 MB
+        self.assertLess(large - small, 16 * 1024, f'peak RSS {small} KB -> {large} KB')
+
+
+if __name__ == '__main__':
+    unittest.main()
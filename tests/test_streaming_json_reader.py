@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Chunk-boundary tests for the streaming package-lock.json reader
+Every chunk size splits numbers, strings and keys at a different place;
+the entries read back must match a plain json.load of the same file
+
+Author: DevSecOps Security Team
+Date: September 2025
+"""
+
+import io
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from npm_package_compromise_detector_2025 import StreamingJSONReader, iter_package_lock_entries
+
+
+LOCKFILE = {
+    "name": "boundary",
+    "lockfileVersion": 3,
+    "requires": True,
+    "score": 1.5,
+    "weights": [-2.5e10, 3e-7, 0.125, 10, -0.0],
+    "packages": {
+        "": {"name": "boundary", "version": "1.0.0"},
+        "node_modules/@ctrl/tinycolor": {"version": "4.1.1", "size": 12345.75, "ratio": 1e+21},
+        "node_modules/a": {"version": "1.0.0", "engines": {"node": ">=18"}, "rank": -17},
+        "node_modules/a/node_modules/b": {"version": "2.0.0", "weight": 6.02e23, "optional": False}
+    }
+}
+
+
+def read_object(text: str, chunk_size: int) -> dict:
+    """Decode a top-level object member by member through StreamingJSONReader"""
+    reader = StreamingJSONReader(io.StringIO(text), chunk_size=chunk_size)
+    return {key: reader.read_value() for key in reader.iter_object()}
+
+
+class StreamingJSONReaderBoundaryTest(unittest.TestCase):
+
+    def test_numbers_split_at_every_chunk_size(self):
+        text = json.dumps({"a": 1.5, "b": 2, "c": -2.5e10, "d": 1e-7, "e": 123456789})
+        for chunk_size in range(1, len(text) + 2):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(read_object(text, chunk_size), json.loads(text))
+
+    def test_lockfile_entries_match_at_every_chunk_size(self):
+        text = json.dumps(LOCKFILE)
+        expected = [
+            ('packages', key, info, key.count('/') - 1)
+            for key, info in LOCKFILE['packages'].items()
+        ]
+        for chunk_size in range(1, len(text) + 2):
+            with self.subTest(chunk_size=chunk_size):
+                entries = list(iter_package_lock_entries('package-lock.json', _ChunkedText(text, chunk_size)))
+                self.assertEqual(entries, expected)
+
+
+class _ChunkedText(io.StringIO):
+    """Text stream that never returns more than chunk_size characters per read"""
+
+    def __init__(self, text: str, chunk_size: int):
+        super().__init__(text)
+        self.chunk_size = chunk_size
+
+    def read(self, size: int = -1) -> str:
+        return super().read(self.chunk_size if size < 0 else min(size, self.chunk_size))
+
+
+if __name__ == '__main__':
+    unittest.main()